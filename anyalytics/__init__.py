@@ -0,0 +1,16 @@
+"""
+號碼分析套件
+
+各腳本從專案根目錄以 python -m anyalytics.<腳本> 執行，
+開獎資料預設讀取專案根目錄的 lottery_data.json，報告預設寫在本目錄。
+"""
+
+import os
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_FILE = os.path.join(os.path.dirname(PACKAGE_DIR), 'lottery_data.json')
+
+
+def output_path(filename):
+    """報告等輸出檔案的預設位置"""
+    return os.path.join(PACKAGE_DIR, filename)
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+回測驅動程式
+
+策略只實作 pick(state)（見 strategies.py），其餘由這裡統一處理：
+載入資料、移動滑動視窗、計算中獎與獎金（依 games.py 的投注方式）、輸出報告與 CSV。
+各策略腳本（ito_539_strategy_*.py、lotto_39_strategy_*.py）只是以 iter_strategy / iter_vectorized
+取得逐期結果、再以各自格式輸出報告的命令列介面。
+整段歷史只走過一次：統計期數相同的策略共用同一組號碼 / 組合視窗，只維護策略用得到的視窗；
+每個投注期的日期與開獎號碼只查一次，每期的前 k 名也只排序一次，由共用視窗的策略共用，
+各策略的結果並列輸出在 comparison.csv 與 summary.csv。
+
+用法：
+    python -m anyalytics.backtest                       # 執行全部策略
+    python -m anyalytics.backtest --strategies ito_539_strategy_1,lotto_39_strategy_2 --lookback 20
+"""
+
+import argparse
+import csv
+import os
+from functools import lru_cache
+
+from . import output_path
+from .bitmask import number_mask
+from .draw_store import add_data_arguments, load_store
+from .games import BET_TYPES
+from .occurrence_index import OccurrenceIndex
+from .profiler import add_profile_argument, lap, start_profiling
+from .report_writer import ReportWriter
+from .result_table import SUMMARY_COLUMNS, ResultTable
+from .strategies import STRATEGY_NAMES, ClearTopKStrategy, TopKStrategy, create_strategies
+from .vectorized_backtest import VectorizedBacktest
+from .window_engine import ComboWindow, NumberWindow, PairWindow, combination_ranks
+
+# 視窗與投注期的對應方式
+ALIGNMENTS = {
+    # 與 ito_539_strategy_1/2、lotto_39_strategy_1 相同：資料最新到最舊，第 i 期使用 [i-1, i-1+lookback) 的統計，
+    # 換成時間序就是第 t 期使用 [t+2-lookback, t+2) 的統計，同次數時以最近出現者優先
+    'legacy': '上期起往前統計',
+    # 第 t 期（從舊到新）只使用 [t-lookback, t) 的統計，前 lookback 期不投注
+    'chronological': '只使用投注期之前的開獎',
+}
+
+
+class WindowState:
+    """回測時所有策略共用的視窗狀態"""
+
+    def __init__(self, store, uses_numbers=True, combo_sizes=()):
+        self.store = store
+        self.numbers = NumberWindow() if uses_numbers else None
+        self.combos = {k: PairWindow() if k == 2 else ComboWindow(k) for k in combo_sizes}
+        self.target = None  # 投注期在 store 中的索引（最新到最舊）
+        self.position = None  # 投注期的時間序位置（第 0 期為最早一期）
+        self.size = 0  # 視窗內的期數
+        self._occurrences = None
+        self._top_k = {}  # 本期號碼視窗的前 k 名：(k, newest_first) -> 號碼
+        self._overdue = None  # (投注期位置, 各號碼的未開出期數與平均間隔)
+
+    @property
+    def occurrences(self):
+        if self._occurrences is None:
+            self._occurrences = OccurrenceIndex.from_store(self.store)
+        return self._occurrences
+
+    def __len__(self):
+        return self.size
+
+    def top_k(self, k, newest_first=False):
+        """號碼視窗的前 k 名，同一期內重複查詢時直接取用（共用視窗的策略不必各自排序）"""
+        key = (k, newest_first)
+        numbers = self._top_k.get(key)
+        if numbers is None:
+            numbers = self._top_k[key] = self.numbers.top_k(k, newest_first)
+        return numbers
+
+    def overdue(self):
+        """投注期之前各號碼的 (連續未開出期數, 平均開出間隔)，同一期內由冷門號碼策略共用"""
+        if self._overdue is None or self._overdue[0] != self.position:
+            self._overdue = (self.position, self.occurrences.overdue(self.position))
+        return self._overdue[1]
+
+    def push(self, number_slots, combo_slots):
+        """加入一期；槽位由 walk 事先一次算好，各統計期數的視窗共用"""
+        if self.numbers is not None:
+            self.numbers.push_slots(number_slots)
+        for k, window in self.combos.items():
+            window.push_slots(combo_slots[k])
+        self.size += 1
+        self._top_k.clear()
+
+    def pop(self):
+        if self.numbers is not None:
+            self.numbers.pop()
+        for window in self.combos.values():
+            window.pop()
+        self.size -= 1
+        self._top_k.clear()
+
+
+def walk(store, windows, start=0):
+    """由舊到新走過歷史一次（從時間序第 start 期開始），每加入一期 yield (end, {統計期數: WindowState})
+
+    windows 為 {統計期數: (是否需要號碼視窗, 組合視窗大小)}，每種統計期數只維護一組視窗，
+    視窗內容為時間序的 [max(end - lookback, start), end)。
+    """
+    numbers = store.chronological().numbers[start:]
+    # 每期的號碼槽位與各組合大小的組合排名只算一次（整段歷史一次陣列運算），不再每個視窗逐期重算
+    number_slots = (numbers - 1).tolist()
+    sizes = {k for _, combo_sizes in windows.values() for k in combo_sizes}
+    combo_slots = {k: combination_ranks(numbers, k).tolist() for k in sizes}
+    states = {lookback: WindowState(store, uses_numbers, combo_sizes)
+              for lookback, (uses_numbers, combo_sizes) in windows.items()}
+    for end in range(start + 1, len(store) + 1):
+        index = end - 1 - start
+        slots = {k: rows[index] for k, rows in combo_slots.items()}
+        for lookback, state in states.items():
+            state.push(number_slots[index], slots)
+            if len(state) > lookback:
+                state.pop()
+        lap('window update')
+        yield end, states
+
+
+def target_position(alignment, end, lookback, total):
+    """視窗為 [end - lookback, end) 時，依 alignment 對應的投注期（時間序位置），沒有時回傳 None"""
+    if alignment == 'legacy':
+        position = end - 2
+        return position if position >= 0 else None
+    if alignment == 'chronological':
+        return end if lookback <= end < total else None
+    raise ValueError(f"未知的視窗定義：{alignment}")
+
+
+@lru_cache(maxsize=None)
+def wheel(bet_type, size):
+    """以 size 個號碼投注 bet_type 時的 (中 0~size 個號碼的總獎金, 總成本)"""
+    game = BET_TYPES[bet_type]
+    return game.payout_table(size), game.tickets(size) * game.cost
+
+
+def draw_info(store, target):
+    """投注期的 (期數, 日期, 開獎號碼, 開獎號碼遮罩)"""
+    return len(store) - target, store.date(target), store.draw(target), int(store.masks[target])
+
+
+def score(strategy, state, draw, bet_numbers, matched=None):
+    """計算策略投注 bet_numbers（pick 的結果，None 表示跳過）的中獎結果（draw 為 draw_info 的結果）
+
+    matched 為同一投注期共用的 {投注號碼: 中獎號碼數}，選出相同號碼的策略只比對一次。
+    """
+    if bet_numbers is None:
+        return skipped_result(draw, strategy.skip_reason(state))
+    matches = None
+    if matched is not None:
+        key = tuple(bet_numbers)
+        matches = matched.get(key)
+        if matches is None:
+            matches = matched[key] = (number_mask(bet_numbers) & draw[3]).bit_count()
+    result = placed_result(strategy, draw, bet_numbers, matches)
+    strategy.annotate(state, result)
+    return result
+
+
+def placed_result(strategy, draw, bet_numbers, matches=None):
+    """投注 bet_numbers 的中獎結果（matches 為已算好的中獎號碼數）"""
+    period, date, winning_numbers, winning_mask = draw
+    payouts, cost = wheel(strategy.bet_type, len(bet_numbers))
+    if matches is None:
+        matches = (number_mask(bet_numbers) & winning_mask).bit_count()
+    prize = payouts[matches]
+    return {'period': period, 'date': date, 'bet_numbers': bet_numbers, 'winning_numbers': winning_numbers,
+            'matches': matches, 'prize': prize, 'cost': cost, 'net_gain': prize - cost}
+
+
+def skipped_result(draw, status):
+    """跳過投注的結果，status 為報告中說明跳過原因的文字"""
+    period, date, winning_numbers, _ = draw
+    return {'period': period, 'date': date, 'bet_numbers': None, 'winning_numbers': winning_numbers,
+            'matches': None, 'prize': 0, 'cost': 0, 'net_gain': 0, 'status': status}
+
+
+def iter_backtest(store, strategies, covered=0):
+    """只走過歷史一次，所有策略共用同一組視窗，依投注期由舊到新 yield (策略, 結果)
+
+    covered 為先前已回測過的期數（增量更新用）：只產生投注期或視窗含有之後新增開獎的結果，
+    並從這些投注期最早的視窗起點開始走，不必走過整段歷史。
+    """
+    total = len(store)
+    windows = {}
+    groups = {}
+    for strategy in strategies:
+        uses_numbers, sizes = windows.setdefault(strategy.lookback, (False, set()))
+        windows[strategy.lookback] = (uses_numbers or strategy.uses_numbers, sizes | set(strategy.combo_sizes))
+        groups.setdefault((strategy.lookback, strategy.alignment), []).append(strategy)
+
+    draws = [None] * total  # 投注期的 draw_info，不同視窗定義的策略在不同時間走到同一期，只查一次
+    windows = {lookback: (uses_numbers, sorted(sizes)) for lookback, (uses_numbers, sizes) in windows.items()}
+    start = max(covered - max(windows, default=0), 0)
+    for end, states in walk(store, windows, start):
+        # 本期要投注的策略群組：(視窗狀態, 投注期位置, 投注期索引, draw_info, 策略)
+        steps = []
+        for (lookback, alignment), group in groups.items():
+            position = target_position(alignment, end, lookback, total)
+            if position is None or (position < covered and end <= covered):
+                continue
+            target = total - 1 - position
+            draw = draws[target]
+            if draw is None:
+                draw = draws[target] = draw_info(store, target)
+            steps.append((states[lookback], position, target, draw, group))
+        if not steps:
+            continue
+
+        # 每期依階段處理所有策略（選號、計分、交給呼叫端寫報告），每個階段只呼叫一次 lap；
+        # 同一統計期數、不同視窗定義的群組共用視窗狀態，每個階段開始前重新指定投注期
+        picks = []
+        for state, position, target, draw, group in steps:
+            state.position, state.target = position, target
+            picks.append([strategy.pick(state) for strategy in group])
+        lap('pick')
+        results = []
+        matched = {}  # 投注期 -> {投注號碼: 中獎號碼數}
+        for (state, position, target, draw, group), bets in zip(steps, picks):
+            state.position, state.target = position, target
+            step_matched = matched.setdefault(target, {})
+            results.extend((strategy, score(strategy, state, draw, bet_numbers, step_matched))
+                           for strategy, bet_numbers in zip(group, bets))
+        lap('score')
+        yield from results
+        lap('report write')
+
+
+def iter_strategy(store, strategy, covered=0):
+    """單一策略的逐期結果（投注期由舊到新），covered 同 iter_backtest"""
+    for _, result in iter_backtest(store, [strategy], covered):
+        yield result
+
+
+def iter_vectorized(store, strategy):
+    """以 VectorizedBacktest 一次算完號碼視窗前 k 名的策略，產生與 iter_strategy 相同的逐期結果（由舊到新）"""
+    if not isinstance(strategy, TopKStrategy) or strategy.alignment != 'legacy':
+        raise ValueError(f"{strategy.name} 不支援向量化回測")
+    game = strategy.game
+    backtest = VectorizedBacktest(store).run(strategy.lookback, strategy.k, game.payout_table(strategy.k),
+                                             game.tickets(strategy.k) * game.cost,
+                                             clear_only=isinstance(strategy, ClearTopKStrategy))
+    lap('simulate')
+    # 向量化回測的列為最新到最舊，反向逐列產生結果
+    rows = zip(backtest['targets'].tolist(), backtest['bets'].tolist(),
+               backtest['placed'].tolist(), backtest['kth_count'].tolist())
+    for target, bets, placed, kth_count in reversed(list(rows)):
+        draw = draw_info(store, target)
+        if placed:
+            yield placed_result(strategy, draw, [number for number in bets if number])
+        else:
+            yield skipped_result(draw, strategy.skip_message(kth_count))
+
+
+def run_backtest(store, strategies):
+    """只走過歷史一次，所有策略共用同一組視窗，回傳 {策略名稱: 逐期結果（最新到最舊）}"""
+    results = {strategy.name: [] for strategy in strategies}
+    for strategy, result in iter_backtest(store, strategies):
+        results[strategy.name].append(result)
+    for strategy_results in results.values():
+        strategy_results.reverse()
+    return results
+
+
+def write_report(filename, strategy, results):
+    """逐期串流寫出獲獎統計報告，回傳 ResultTable 摘要"""
+    game = strategy.game
+    table = ResultTable()
+    match_stats = {}
+    skipped_periods = 0
+
+    with ReportWriter(filename) as writer:
+        for result in table.collect(results):
+            record = [f"第{result['period']}期 ({result['date']})"]
+            if result['bet_numbers'] is None:
+                skipped_periods += 1
+                record.append(f"  {result['status']}")
+                record.append(f"  開獎號碼：{result['winning_numbers']}")
+            else:
+                match_stats[result['matches']] = match_stats.get(result['matches'], 0) + 1
+                record.append(f"  投注號碼：{result['bet_numbers']}")
+                record.append(f"  開獎號碼：{result['winning_numbers']}")
+                record.append(f"  中獎數量：{result['matches']}個")
+            record.append(f"  獲得獎金：{result['prize']:,}元")
+            record.append(f"  淨損益：{result['net_gain']:,}元")
+            record.append("")
+            writer.write_record(record)
+
+        summary = table.summary()
+        report_lines = []
+        report_lines.append(f"{game.name}投注策略獲獎統計報告（{strategy.name}）")
+        report_lines.append("=" * 60)
+        report_lines.append(f"策略：{strategy.description}")
+        report_lines.append(f"統計期數：{strategy.lookback}期（{ALIGNMENTS[strategy.alignment]}）")
+        report_lines.append("")
+        report_lines.append("獎金標準：")
+        for matches, prize in sorted(game.prizes.items(), reverse=True):
+            report_lines.append(f"  每注中{matches}個號碼：{prize:,}元")
+        report_lines.append(f"  每注：{game.cost}元")
+        report_lines.append("")
+
+        report_lines.append("中獎統計（僅計算有投注的期數）：")
+        for matches in sorted(match_stats.keys(), reverse=True):
+            report_lines.append(f"  中{matches}個號碼：{match_stats[matches]}次")
+        report_lines.append("")
+
+        report_lines.append("財務統計：")
+        report_lines.append(f"  總期數：{summary['periods']}期")
+        report_lines.append(f"  實際投注期數：{summary['bets']}期")
+        report_lines.append(f"  跳過投注期數：{skipped_periods}期")
+        report_lines.append(f"  總投注成本：{summary['total_cost']:,}元")
+        report_lines.append(f"  總獲得獎金：{summary['total_winnings']:,}元")
+        report_lines.append(f"  總淨損益：{summary['net_gain']:,}元")
+        if summary['total_cost'] > 0:
+            report_lines.append(f"  投資報酬率：{summary['roi']:.2f}%")
+        report_lines.append("")
+
+        report_lines.append("詳細投注記錄：")
+        report_lines.append("-" * 60)
+
+        writer.finish(report_lines)
+
+    table.write(filename[:-4] + '.csv')
+    return summary
+
+
+def write_comparison(output_dir, strategies, results, summaries):
+    """並列輸出各策略的結果
+
+    - comparison.csv：每期一列（最新到最舊），每個策略一組 <策略>_bet / _prize / _cost 欄位，該期未回測時留空
+    - summary.csv：每個策略一列摘要
+    """
+    rows = {}
+    for strategy in strategies:
+        for result in results[strategy.name]:
+            row = rows.setdefault(result['period'], {'period': result['period'], 'date': result['date']})
+            bet_numbers = result['bet_numbers'] or []
+            row[f"{strategy.name}_bet"] = ' '.join(str(number) for number in bet_numbers)
+            row[f"{strategy.name}_prize"] = result['prize']
+            row[f"{strategy.name}_cost"] = result['cost']
+
+    fields = ['period', 'date']
+    for strategy in strategies:
+        fields += [f"{strategy.name}_bet", f"{strategy.name}_prize", f"{strategy.name}_cost"]
+    with open(os.path.join(output_dir, 'comparison.csv'), 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows[period] for period in sorted(rows, reverse=True))
+
+    with open(os.path.join(output_dir, 'summary.csv'), 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['strategy'] + SUMMARY_COLUMNS)
+        writer.writeheader()
+        for strategy in strategies:
+            writer.writerow(dict(summaries[strategy.name], strategy=strategy.name))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='策略回測')
+    parser.add_argument('--strategies', default=','.join(STRATEGY_NAMES), help='策略名稱，以逗號分隔')
+    parser.add_argument('--lookback', type=int, default=30, help='統計期數')
+    add_data_arguments(parser)
+    parser.add_argument('--output-dir', default=output_path('backtest_results'), help='報告輸出目錄')
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    start_profiling(args.profile)
+
+    store = load_store(args)
+    lap('load')
+    strategies = create_strategies(args.strategies.split(','), args.lookback)
+    print(f"載入了 {len(store)} 期彩票數據，共 {len(strategies)} 個策略")
+
+    results = run_backtest(store, strategies)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    summaries = {}
+    print(f"\n{'策略':<26} {'投注期數':>8} {'總成本':>10} {'總獎金':>10} {'淨損益':>10} {'報酬率':>9}")
+    for strategy in strategies:
+        filename = os.path.join(args.output_dir, f"{strategy.name}.txt")
+        summary = summaries[strategy.name] = write_report(filename, strategy, results[strategy.name])
+        print(f"{strategy.name:<26} {summary['bets']:>8} {summary['total_cost']:>10,} "
+              f"{summary['total_winnings']:>10,} {summary['net_gain']:>10,} {summary['roi']:>8.2f}%")
+    write_comparison(args.output_dir, strategies, results, summaries)
+    lap('report write')
+    print(f"\n報告已儲存至：{args.output_dir}/（並列比較：comparison.csv、summary.csv）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+號碼的位元遮罩表示
+
+號碼只有 1~39，一期的 5 個號碼（或一注的投注號碼）可以放進一個 64 位元整數：號碼 n 對應第 n 個位元。
+- 中獎號碼數：popcount(投注 & 開獎)，不必每次建立兩個 set 再取交集
+- 二合 / 三合 / 四合是否全中：(投注 & 開獎) == 投注
+- DrawStore.masks 為整段歷史的 uint64 欄位，向量化回測直接以陣列運算計算每期的中獎號碼數
+"""
+
+import numpy as np
+
+NUMBER_BITS = [1 << number for number in range(40)]
+_number_bit = NUMBER_BITS.__getitem__
+
+# numpy 2.0 起才有 bitwise_count，較舊版本以每個位元組查表
+_BYTE_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+
+def number_mask(numbers):
+    """號碼列表的遮罩"""
+    return sum(map(_number_bit, numbers))
+
+
+def draw_masks(numbers):
+    """(N, k) 號碼陣列（0 表示空位）的 uint64 遮罩；號碼 0 對應第 0 個位元，不會與任何開獎號碼重疊"""
+    numbers = np.asarray(numbers, dtype=np.uint64)
+    if numbers.size == 0:
+        return np.zeros(len(numbers), dtype=np.uint64)
+    return np.bitwise_or.reduce(np.left_shift(np.uint64(1), numbers), axis=1)
+
+
+def popcount(masks):
+    """uint64 陣列每個元素的 1 位元數"""
+    masks = np.ascontiguousarray(masks, dtype=np.uint64)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(masks).astype(np.int32)
+    return _BYTE_POPCOUNT[masks.view(np.uint8)].reshape(masks.shape + (8,)).sum(axis=-1, dtype=np.int32)
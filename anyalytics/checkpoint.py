@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量回測檢查點
+
+每日只新增一期開獎，重跑回測卻要逐期重新模擬整段歷史、重新產生整份報告。
+這裡把回測的累計狀態（總成本、獎金、中獎次數分佈、月度統計…）存成檢查點：
+- 檢查點記錄已處理的期數 T 與前 T 期內容的雜湊（window_cache.prefix_digest），
+  目前資料的前 T 期相同時只需模擬新增的期數，再累加到狀態上
+- 報告最新的記錄在最前面：新記錄插在摘要與舊記錄之間，摘要依累計狀態重寫，
+  舊記錄直接以位元組複製，不再逐期產生
+- 檢查點不存在、歷史被修改或報告檔與檢查點記錄的大小不同時視為無效，由呼叫端重跑完整回測
+"""
+
+import json
+import os
+import shutil
+
+from .window_cache import prefix_digest
+
+CHECKPOINT_VERSION = 1
+BUFFER_SIZE = 1 << 16
+
+
+def load_checkpoint(filename, store, files):
+    """讀取檢查點並檢查是否仍適用於 store 與 files，無效時回傳 None
+
+    files 為檢查點涵蓋的輸出檔案（報告、CSV，依檔名記錄大小），任一檔案被改動或刪除都會使檢查點失效。
+    """
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if checkpoint.get('version') != CHECKPOINT_VERSION or checkpoint.get('covered', 0) > len(store):
+        return None
+    sizes = checkpoint.get('files', {})
+    for name in files:
+        if not os.path.exists(name) or os.path.getsize(name) != sizes.get(os.path.basename(name)):
+            return None
+    if checkpoint.get('digest') != prefix_digest(store, checkpoint['covered']).hex():
+        return None
+    return checkpoint
+
+
+def save_checkpoint(filename, store, state, files):
+    """以 store 目前的期數與 files 目前的大小寫入檢查點"""
+    checkpoint = {
+        'version': CHECKPOINT_VERSION,
+        'covered': len(store),
+        'digest': prefix_digest(store, len(store)).hex(),
+        'files': {os.path.basename(name): os.path.getsize(name) for name in files},
+        'state': state,
+    }
+    temp_file = filename + '.tmp'
+    try:
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f, ensure_ascii=False)
+        os.replace(temp_file, filename)
+    except OSError as e:
+        print(f"無法寫入檢查點 {filename}: {e}")
+
+
+def patch_report(filename, header_lines, records, header_size):
+    """以新的摘要取代舊摘要（前 header_size bytes），新的逐期記錄接在摘要之後、舊記錄之前
+
+    records 為依輸出順序排列的記錄（每筆為多行），格式與 ReportWriter 相同。
+    回傳新摘要的位元組數。
+    """
+    header = '\n'.join(header_lines).encode('utf-8')
+    body = ''.join('\n' + line for lines in records for line in lines).encode('utf-8')
+    temp_file = filename + '.tmp'
+    with open(filename, 'rb') as old, open(temp_file, 'wb', buffering=BUFFER_SIZE) as f:
+        f.write(header)
+        f.write(body)
+        old.seek(header_size)
+        shutil.copyfileobj(old, f, BUFFER_SIZE)
+    os.replace(temp_file, filename)
+    return len(header)
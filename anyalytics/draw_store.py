@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+開獎資料的欄位式儲存
+
+lottery_data.json 只在這裡解析一次，之後所有策略都共用同一份陣列：
+- numbers：(N, 5) uint8，每期開獎號碼（保留官方公布順序）
+- incidence：(N, 39) bool，incidence[i, n-1] 表示第 i 期是否開出號碼 n
+- ordinals：(N,) int32，開獎日期的 date.toordinal()
+- masks：(N,) uint64，每期開獎號碼的位元遮罩（號碼 n 為第 n 個位元，見 bitmask.py）
+
+資料順序與 JSON 相同（最新到最舊），chronological() 可取得從舊到新的視圖。
+
+載入時會在 JSON 旁邊建立二進位快取（lottery_data.json.cache），
+每期固定 9 bytes（日期序數 + 5 個號碼），以 memmap 直接映射，
+只有在 JSON 的修改時間 / 大小改變且內容雜湊也不同時才重新解析 JSON。
+
+也可以直接讀取 scraper 的 SQLite 資料庫（lottery_data.db），
+並以日期區間或最近 N 期限制範圍，只讀取需要的期數。
+分析腳本以 add_data_arguments / load_store 提供 --data、--start、--end、--limit，
+JSON 與資料庫的範圍相同（資料庫走主鍵查詢，JSON 載入後再選取）。
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+import sys
+from datetime import date, datetime
+
+import numpy as np
+
+from . import DATA_FILE
+from .bitmask import draw_masks
+
+CACHE_SUFFIX = '.cache'
+CACHE_MAGIC = b'LTO539C1'
+# 檔頭：magic、JSON 修改時間(ns)、JSON 大小、JSON sha256、期數，共 64 bytes
+CACHE_HEADER = struct.Struct('<8sqq32sq')
+CACHE_RECORD = np.dtype([('ordinal', '<i4'), ('numbers', 'u1', (5,))])
+
+
+class DrawStore:
+    def __init__(self, ordinals, numbers):
+        self.ordinals = np.asarray(ordinals, dtype=np.int32)
+        self.numbers = np.asarray(numbers, dtype=np.uint8).reshape(-1, 5)
+        self.incidence = np.zeros((len(self.numbers), 39), dtype=bool)
+        rows = np.arange(len(self.numbers))[:, None]
+        self.incidence[rows, self.numbers.astype(np.intp) - 1] = True
+        self.masks = draw_masks(self.numbers)
+
+    @classmethod
+    def from_records(cls, records):
+        """由 data-format.md 格式的開獎記錄建立"""
+        ordinals = [datetime.strptime(record['date'], '%Y/%m/%d').toordinal() for record in records]
+        numbers = [record['numbers'] for record in records]
+        return cls(ordinals, numbers)
+
+    @classmethod
+    def load(cls, filename, use_cache=True, start_date=None, end_date=None, limit=None):
+        """載入 lottery_data.json，優先使用二進位快取；副檔名為 .db 時讀取 SQLite 資料庫
+
+        start_date / end_date（YYYY/MM/DD，含）與 limit（最近幾期）限制載入的範圍，見 select()。
+        """
+        if filename.endswith('.db'):
+            return cls.from_database(filename, start_date, end_date, limit)
+        return cls._load_json(filename, use_cache).select(start_date, end_date, limit)
+
+    @classmethod
+    def _load_json(cls, filename, use_cache):
+        if not use_cache:
+            with open(filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return cls.from_records(data['data'])
+
+        cache_file = filename + CACHE_SUFFIX
+        stat = os.stat(filename)
+        header = _read_cache_header(cache_file)
+        if header and header[1] == stat.st_mtime_ns and header[2] == stat.st_size:
+            return cls._from_cache(cache_file, header[4])
+
+        with open(filename, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).digest()
+
+        if header and header[3] == digest:
+            # 內容沒變（例如 git checkout 只更新了修改時間），只需更新檔頭
+            _write_cache_header(cache_file, stat, digest, header[4])
+            return cls._from_cache(cache_file, header[4])
+
+        store = cls.from_records(json.loads(raw.decode('utf-8'))['data'])
+        store.save_cache(cache_file, stat, digest)
+        return store
+
+    @classmethod
+    def from_database(cls, filename, start_date=None, end_date=None, limit=None):
+        """由 SQLite 資料庫載入（最新到最舊），可限制日期區間（含）與最近 limit 期"""
+        if not os.path.exists(filename):
+            raise FileNotFoundError(filename)
+        query = "SELECT date FROM draws WHERE date BETWEEN ? AND ? ORDER BY date DESC"
+        params = [start_date or '', end_date or '9999/99/99']
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        connection = sqlite3.connect(filename)
+        try:
+            rows = connection.execute(
+                "SELECT n.date, n.number FROM draw_numbers n "
+                f"WHERE n.date IN ({query}) ORDER BY n.date DESC, n.position", params).fetchall()
+        finally:
+            connection.close()
+        dates = [row[0] for row in rows[::5]]
+        ordinals = [datetime.strptime(date_str, '%Y/%m/%d').toordinal() for date_str in dates]
+        return cls(ordinals, [row[1] for row in rows])
+
+    @classmethod
+    def _from_cache(cls, cache_file, count):
+        if count == 0:
+            records = np.empty(0, dtype=CACHE_RECORD)
+        else:
+            records = np.memmap(cache_file, dtype=CACHE_RECORD, mode='r',
+                                offset=CACHE_HEADER.size, shape=(count,))
+        return cls(records['ordinal'], records['numbers'])
+
+    def save_cache(self, cache_file, stat, digest):
+        """寫入二進位快取（先寫暫存檔再取代，避免讀到寫一半的檔案）"""
+        records = np.empty(len(self), dtype=CACHE_RECORD)
+        records['ordinal'] = self.ordinals
+        records['numbers'] = self.numbers
+
+        temp_file = cache_file + '.tmp'
+        try:
+            with open(temp_file, 'wb') as f:
+                f.write(CACHE_HEADER.pack(CACHE_MAGIC, stat.st_mtime_ns, stat.st_size, digest, len(self)))
+                f.write(records.tobytes())
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            print(f"無法寫入快取 {cache_file}: {e}")
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def chronological(self):
+        """從舊到新排列的視圖（不複製陣列）"""
+        if len(self) > 1 and self.ordinals[0] > self.ordinals[-1]:
+            return self._view(slice(None, None, -1))
+        return self
+
+    def _view(self, index):
+        view = DrawStore.__new__(DrawStore)
+        view.ordinals = self.ordinals[index]
+        view.numbers = self.numbers[index]
+        view.incidence = self.incidence[index]
+        view.masks = self.masks[index]
+        return view
+
+    def date(self, index):
+        """第 index 期的開獎日期（YYYY/MM/DD）"""
+        return date.fromordinal(int(self.ordinals[index])).strftime('%Y/%m/%d')
+
+    def draw(self, index):
+        """第 index 期的開獎號碼"""
+        return self.numbers[index].tolist()
+
+    def draws(self):
+        """所有期的開獎號碼（list of list），供逐期迴圈使用"""
+        return self.numbers.tolist()
+
+    def bitmasks(self):
+        """所有期的開獎號碼遮罩（Python int 列表），供逐期迴圈計算中獎號碼數"""
+        return self.masks.tolist()
+
+    def select(self, start_date=None, end_date=None, limit=None):
+        """開獎日期介於 start_date ~ end_date（含）的最近 limit 期，與 from_database 的範圍相同"""
+        if start_date is None and end_date is None and limit is None:
+            return self
+        keep = np.ones(len(self), dtype=bool)
+        if start_date is not None:
+            keep &= self.ordinals >= _ordinal(start_date)
+        if end_date is not None:
+            keep &= self.ordinals <= _ordinal(end_date)
+        # 由新到舊取前 limit 期，選取後維持原本的順序
+        indices = np.flatnonzero(keep)
+        if limit is not None:
+            newest_first = np.argsort(-self.ordinals[indices], kind='stable')
+            indices = np.sort(indices[newest_first[:limit]])
+        return self._view(indices)
+
+    def index_of(self, date_str):
+        """以二分搜尋找出日期所在的索引，找不到時回傳 -1"""
+        ordinal = _ordinal(date_str)
+        total = len(self)
+        if total > 1 and self.ordinals[0] > self.ordinals[-1]:
+            position = total - 1 - int(np.searchsorted(self.ordinals[::-1], ordinal))
+        else:
+            position = int(np.searchsorted(self.ordinals, ordinal))
+        if 0 <= position < total and self.ordinals[position] == ordinal:
+            return position
+        return -1
+
+
+def add_data_arguments(parser):
+    """加入開獎資料與範圍的命令列參數（--data、--start、--end、--limit）"""
+    parser.add_argument('--data', default=DATA_FILE, help='開獎資料（lottery_data.json 或 SQLite 資料庫 .db）')
+    parser.add_argument('--start', type=_date_argument, help='只使用此日期（YYYY/MM/DD，含）之後的開獎')
+    parser.add_argument('--end', type=_date_argument, help='只使用此日期（YYYY/MM/DD，含）之前的開獎')
+    parser.add_argument('--limit', type=int, help='只使用最近 N 期（在 --start / --end 的範圍內）')
+
+
+def load_store(args):
+    """依 add_data_arguments 的參數載入開獎資料，範圍內沒有開獎時結束程式"""
+    store = DrawStore.load(args.data, start_date=args.start, end_date=args.end, limit=args.limit)
+    if not len(store):
+        print(f"{args.data} 在指定範圍內沒有開獎資料")
+        sys.exit(1)
+    return store
+
+
+def _date_argument(text):
+    """命令列日期統一為 YYYY/MM/DD（資料庫以字串比較日期）"""
+    try:
+        return datetime.strptime(text, '%Y/%m/%d').strftime('%Y/%m/%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"日期格式應為 YYYY/MM/DD：{text}")
+
+
+def _ordinal(date_str):
+    return datetime.strptime(date_str, '%Y/%m/%d').toordinal()
+
+
+def _read_cache_header(cache_file):
+    """讀取快取檔頭，檔案不存在或格式不符時回傳 None"""
+    try:
+        with open(cache_file, 'rb') as f:
+            header = CACHE_HEADER.unpack(f.read(CACHE_HEADER.size))
+    except (OSError, struct.error):
+        return None
+    if header[0] != CACHE_MAGIC:
+        return None
+    expected_size = CACHE_HEADER.size + header[4] * CACHE_RECORD.itemsize
+    if os.path.getsize(cache_file) != expected_size:
+        return None
+    return header
+
+
+def _write_cache_header(cache_file, stat, digest, count):
+    try:
+        with open(cache_file, 'r+b') as f:
+            f.write(CACHE_HEADER.pack(CACHE_MAGIC, stat.st_mtime_ns, stat.st_size, digest, count))
+    except OSError as e:
+        print(f"無法更新快取 {cache_file}: {e}")
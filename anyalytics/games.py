@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+投注方式與獎金表
+
+今彩539 每注選 5 個號碼，依中獎號碼數給獎；39樂合彩 二合/三合/四合
+每注選 2~4 個號碼，必須全中才有獎金。
+
+策略選出 k 個號碼時以包牌方式投注：買下這 k 個號碼所有 C(k, pick) 種組合，
+中 m 個號碼時，中 j 個號碼的注數為 C(m, j) * C(k-m, pick-j)。
+"""
+
+from math import comb
+
+
+class BetType:
+    def __init__(self, name, pick, cost, prizes):
+        self.name = name
+        self.pick = pick  # 每注號碼數
+        self.cost = cost  # 每注金額
+        self.prizes = prizes  # 每注中 j 個號碼的獎金
+
+    def tickets(self, k):
+        """以 k 個號碼包牌需要的注數"""
+        return comb(k, self.pick)
+
+    def prize(self, matches, k=None):
+        """k 個號碼包牌、中 matches 個號碼時的總獎金"""
+        k = self.pick if k is None else k
+        return sum(comb(matches, j) * comb(k - matches, self.pick - j) * prize
+                   for j, prize in self.prizes.items())
+
+    def payout_table(self, k=None):
+        """中 0~k 個號碼時的總獎金，供向量化回測查表"""
+        k = self.pick if k is None else k
+        return [self.prize(matches, k) for matches in range(k + 1)]
+
+
+BET_TYPES = {
+    '539': BetType('今彩539', 5, 50, {5: 8000000, 4: 20000, 3: 300, 2: 50}),
+    '二合': BetType('39樂合彩二合', 2, 25, {2: 1125}),
+    '三合': BetType('39樂合彩三合', 3, 25, {3: 11250}),
+    '四合': BetType('39樂合彩四合', 4, 25, {4: 212500}),
+}
@@ -1,140 +1,38 @@
-import json
-from collections import Counter
-
-def load_lottery_data(filename):
-    """載入彩票數據"""
-    with open(filename, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    return data['data']
-
-def calculate_top_numbers_for_period_with_check(lottery_data, period_index, lookback_periods=30):
-    """計算特定期數往後30期的最高頻率前5名數字，並檢查是否有明確的前5名"""
-    start_index = period_index
-    end_index = min(period_index + lookback_periods, len(lottery_data))
-
-    actual_periods = end_index - start_index
-
-    # 收集這段期間內所有的數字
-    all_numbers = []
-    for i in range(start_index, end_index):
-        all_numbers.extend(lottery_data[i]['numbers'])
-
-    # 統計數字出現頻率
-    number_counter = Counter(all_numbers)
-
-    # 取得所有數字及其出現次數，依次數排序
-    all_numbers_sorted = number_counter.most_common()
-
-    # 檢查是否有明確的前5名
-    if len(all_numbers_sorted) < 5:
-        return None, "數字種類不足5個"
-
-    # 取得前5名的次數
-    top_5_counts = [count for num, count in all_numbers_sorted[:5]]
-
-    # 檢查是否有第6名及以後的數字與第5名次數相同
-    if len(all_numbers_sorted) > 5:
-        fifth_count = top_5_counts[4]  # 第5名的次數
-        # 檢查第6名開始是否有相同次數
-        for i in range(5, len(all_numbers_sorted)):
-            if all_numbers_sorted[i][1] == fifth_count:
-                return None, f"第5名與其他號碼次數相同({fifth_count}次)，無法確定唯一的前5名"
-
-    # 如果前5名內部有相同次數，也需要檢查
-    unique_counts = set(top_5_counts)
-    if len(unique_counts) < 5:
-        # 檢查是否會影響前5名的唯一性
-        # 找出重複的次數
-        count_frequency = Counter(top_5_counts)
-        for count_val, frequency in count_frequency.items():
-            if frequency > 1:
-                # 檢查這個次數是否也出現在第6名之後
-                sixth_and_later = [count for num, count in all_numbers_sorted[5:]]
-                if count_val in sixth_and_later:
-                    return None, f"前5名內有重複次數({count_val})且第6名後也有相同次數，無法確定唯一的前5名"
-
-    # 如果通過所有檢查，返回前5名數字
-    top_5_numbers = [num for num, count in all_numbers_sorted[:5]]
-    return top_5_numbers, "明確的前5名"
-
-def calculate_matches(bet_numbers, winning_numbers):
-    """計算中獎號碼數量"""
-    return len(set(bet_numbers) & set(winning_numbers))
-
-def calculate_prize(matches):
-    """根據中獎號碼數量計算獎金"""
-    prize_table = {
-        5: 8000000,  # 800萬
-        4: 20000,    # 2萬
-        3: 300,      # 300元
-        2: 50,       # 50元
-        1: 0,        # 無獎金
-        0: 0         # 無獎金
-    }
-    return prize_table.get(matches, 0)
-
-def simulate_lottery_strategy_best(lottery_data):
-    """模擬使用明確前5名高頻數字投注策略（只在有明確前5名時投注）"""
-    results = []
-    total_cost = 0
-    total_winnings = 0
-    skipped_periods = 0
+import argparse
+from . import output_path
+from .backtest import iter_strategy, iter_vectorized
+from .checkpoint import load_checkpoint, save_checkpoint, patch_report
+from .draw_store import add_data_arguments, load_store
+from .games import BET_TYPES
+from .profiler import add_profile_argument, lap, start_profiling
+from .report_writer import ReportWriter
+from .result_table import ResultTable, summary_filename
+from .strategies import create_strategies
+
+CHECKPOINT_FILE = output_path('ito_539_strategy_2.checkpoint.json')
+
+def record_lines_best(result):
+    """一期的報告記錄（多行）"""
+    record = [f"第{result['period']}期 ({result['date']})"]
+    if result['bet_numbers'] is None:
+        record.append(f"  {result['status']}")
+        record.append(f"  開獎號碼：{result['winning_numbers']}")
+        record.append(f"  投注成本：0元")
+        record.append(f"  獲得獎金：0元")
+        record.append(f"  淨損益：0元")
+    else:
+        record.append(f"  投注號碼：{result['bet_numbers']}")
+        record.append(f"  開獎號碼：{result['winning_numbers']}")
+        record.append(f"  中獎數量：{result['matches']}個")
+        record.append(f"  獲得獎金：{result['prize']:,}元")
+        record.append(f"  淨損益：{result['net_gain']:,}元")
+    record.append("")
+    return record
+
+def summary_lines_best(match_stats, periods, skipped_periods, total_cost, total_winnings):
+    """報告開頭的摘要"""
+    bet_periods = periods - skipped_periods
 
-    # 從第2期開始（因為第1期沒有上期數據）
-    for i in range(1, len(lottery_data)):
-        # 取得上一期的前5名高頻數字作為投注號碼
-        previous_period_index = i - 1
-        bet_numbers, status = calculate_top_numbers_for_period_with_check(lottery_data, previous_period_index)
-
-        # 當期開獎號碼
-        current_period = lottery_data[i]
-        winning_numbers = current_period['numbers']
-
-        # 期數計算（數據是倒序的，第一個是第582期）
-        period_number = len(lottery_data) - i
-
-        if bet_numbers is None:
-            # 跳過投注
-            skipped_periods += 1
-            result = {
-                'period': period_number,
-                'date': current_period['date'],
-                'bet_numbers': None,
-                'winning_numbers': winning_numbers,
-                'matches': None,
-                'prize': 0,
-                'cost': 0,
-                'net_gain': 0,
-                'status': f"跳過投注 - {status}"
-            }
-        else:
-            # 計算中獎情況
-            matches = calculate_matches(bet_numbers, winning_numbers)
-            prize = calculate_prize(matches)
-
-            # 投注成本
-            cost = 50  # 每張彩票50元
-            total_cost += cost
-            total_winnings += prize
-
-            result = {
-                'period': period_number,
-                'date': current_period['date'],
-                'bet_numbers': bet_numbers,
-                'winning_numbers': winning_numbers,
-                'matches': matches,
-                'prize': prize,
-                'cost': cost,
-                'net_gain': prize - cost,
-                'status': "正常投注"
-            }
-
-        results.append(result)
-
-    return results, total_cost, total_winnings, skipped_periods
-
-def generate_winnings_report_best(results, total_cost, total_winnings, skipped_periods):
-    """生成優化策略獲獎統計報告"""
     report_lines = []
     report_lines.append("彩票投注策略獲獎統計報告（優化版）")
     report_lines.append("=" * 60)
@@ -149,30 +47,19 @@ def generate_winnings_report_best(results, total_cost, total_winnings, skipped_p
     report_lines.append("  每張彩票：50元")
     report_lines.append("")
 
-    # 只統計有投注的期數
-    bet_results = [r for r in results if r['bet_numbers'] is not None]
-
-    # 統計中獎情況
-    match_stats = {}
-    for result in bet_results:
-        matches = result['matches']
-        if matches not in match_stats:
-            match_stats[matches] = 0
-        match_stats[matches] += 1
-
     report_lines.append("中獎統計（僅計算有投注的期數）：")
     for matches in sorted(match_stats.keys(), reverse=True):
         count = match_stats[matches]
         if matches >= 2:  # 只顯示有獎金的情況
-            prize = calculate_prize(matches)
+            prize = BET_TYPES['539'].prize(matches)
             report_lines.append(f"  中{matches}個號碼：{count}次，每次獎金{prize:,}元")
         else:
             report_lines.append(f"  中{matches}個號碼：{count}次，無獎金")
 
     report_lines.append("")
     report_lines.append("財務統計：")
-    report_lines.append(f"  總期數：{len(results)}期")
-    report_lines.append(f"  實際投注期數：{len(bet_results)}期")
+    report_lines.append(f"  總期數：{periods}期")
+    report_lines.append(f"  實際投注期數：{bet_periods}期")
     report_lines.append(f"  跳過投注期數：{skipped_periods}期")
     report_lines.append(f"  總投注成本：{total_cost:,}元")
     report_lines.append(f"  總獲得獎金：{total_winnings:,}元")
@@ -182,52 +69,131 @@ def generate_winnings_report_best(results, total_cost, total_winnings, skipped_p
         report_lines.append(f"  投資報酬率：{roi:.2f}%")
 
     # 計算投注率
-    bet_rate = (len(bet_results) / len(results)) * 100
+    bet_rate = (bet_periods / periods) * 100
     report_lines.append(f"  投注率：{bet_rate:.2f}%")
     report_lines.append("")
 
     report_lines.append("詳細投注記錄：")
     report_lines.append("-" * 60)
+    return report_lines
 
-    for result in results:  # 顯示所有期數的詳細記錄
-        report_lines.append(f"第{result['period']}期 ({result['date']})")
-        if result['bet_numbers'] is None:
-            report_lines.append(f"  {result['status']}")
-            report_lines.append(f"  開獎號碼：{result['winning_numbers']}")
-            report_lines.append(f"  投注成本：0元")
-            report_lines.append(f"  獲得獎金：0元")
-            report_lines.append(f"  淨損益：0元")
-        else:
-            report_lines.append(f"  投注號碼：{result['bet_numbers']}")
-            report_lines.append(f"  開獎號碼：{result['winning_numbers']}")
-            report_lines.append(f"  中獎數量：{result['matches']}個")
-            report_lines.append(f"  獲得獎金：{result['prize']:,}元")
-            report_lines.append(f"  淨損益：{result['net_gain']:,}元")
-        report_lines.append("")
+def write_winnings_report_best(filename, results, reverse=False):
+    """逐期串流寫出優化策略獲獎統計報告，回傳 (總期數, 跳過投注期數, 總投注成本, 總獲得獎金)
+
+    results 從舊到新產生時以 reverse=True 寫出最新到最舊的報告。
+    """
+    match_stats = {}
+    periods = 0
+    skipped_periods = 0
+    total_cost = 0
+    total_winnings = 0
 
-    return "\n".join(report_lines)
+    with ReportWriter(filename) as writer:
+        for result in results:  # 顯示所有期數的詳細記錄
+            periods += 1
+            if result['bet_numbers'] is None:
+                skipped_periods += 1
+            else:
+                # 只統計有投注的期數
+                matches = result['matches']
+                if matches not in match_stats:
+                    match_stats[matches] = 0
+                match_stats[matches] += 1
+                total_cost += result['cost']
+                total_winnings += result['prize']
+            writer.write_record(record_lines_best(result))
+
+        writer.finish(summary_lines_best(match_stats, periods, skipped_periods, total_cost, total_winnings),
+                      reverse=reverse)
+
+    return periods, skipped_periods, total_cost, total_winnings
+
+def checkpoint_state_best(table):
+    """由欄位式結果整理出檢查點狀態（欄位與 summary_lines_best 的參數相同）"""
+    placed = table.column('cost') > 0
+    match_stats = {}
+    for matches in table.column('matches')[placed].tolist():
+        match_stats[matches] = match_stats.get(matches, 0) + 1
+    summary = table.summary()
+    return {
+        'match_stats': match_stats,
+        'periods': summary['periods'],
+        'skipped_periods': summary['periods'] - summary['bets'],
+        'total_cost': summary['total_cost'],
+        'total_winnings': summary['total_winnings'],
+    }
+
+def update_lottery_strategy_best(store, checkpoint, report_filename, csv_filename, lookback=30):
+    """只模擬檢查點之後新增的期數，把新記錄插入報告與 CSV 並更新摘要，回傳新的檢查點狀態
+
+    資料為最新到最舊，新增 n 期後第 1~n 期是新的投注期；
+    舊投注期的視窗內容不變（legacy 視窗只往較舊的方向延伸），結果不必重算。
+    """
+    strategy = create_strategies(['ito_539_strategy_2'], lookback)[0]
+    state = checkpoint['state']
+    state['match_stats'] = {int(matches): count for matches, count in state['match_stats'].items()}
+    old_header = '\n'.join(summary_lines_best(**state)).encode('utf-8')
+
+    table = ResultTable()
+    results = list(table.collect(iter_strategy(store, strategy, checkpoint['covered'])))
+    new_state = checkpoint_state_best(table)
+    for matches, count in state['match_stats'].items():
+        new_state['match_stats'][matches] = new_state['match_stats'].get(matches, 0) + count
+    for name in ('periods', 'skipped_periods', 'total_cost', 'total_winnings'):
+        new_state[name] += state[name]
+
+    patch_report(report_filename, summary_lines_best(**new_state),
+                 [record_lines_best(result) for result in reversed(results)], len(old_header))
+    table.prepend(csv_filename, reverse=True)
+    return new_state
 
 def main():
+    parser = argparse.ArgumentParser(description='今彩539 Strategy 2 回測')
+    parser.add_argument('--vectorized', action='store_true', help='以向量化方式一次計算整段歷史')
+    add_data_arguments(parser)
+    parser.add_argument('--incremental', action='store_true',
+                        help=f'由檢查點（{CHECKPOINT_FILE}）接續，只模擬新增的期數並更新報告')
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    start_profiling(args.profile)
+
     # 載入數據
-    lottery_data = load_lottery_data('../lottery_data.json')
+    store = load_store(args)
+    lap('load')
 
-    print(f"載入了 {len(lottery_data)} 期彩票數據")
+    print(f"載入了 {len(store)} 期彩票數據")
     print("開始模擬優化投注策略...")
 
-    # 模擬投注策略
-    results, total_cost, total_winnings, skipped_periods = simulate_lottery_strategy_best(lottery_data)
-
-    # 生成報告
-    report = generate_winnings_report_best(results, total_cost, total_winnings, skipped_periods)
-
-    # 寫入檔案
-    output_filename = 'ito_539_strategy_2.txt'
-    with open(output_filename, 'w', encoding='utf-8') as f:
-        f.write(report)
-
-    bet_periods = len(results) - skipped_periods
+    output_filename = output_path('ito_539_strategy_2.txt')
+    csv_filename = output_path('ito_539_strategy_2.csv')
+    output_files = [output_filename, csv_filename, summary_filename(csv_filename)]
+    checkpoint = load_checkpoint(CHECKPOINT_FILE, store, output_files) if args.incremental else None
+
+    if checkpoint is not None:
+        print(f"由檢查點接續：新增 {len(store) - checkpoint['covered']} 期")
+        state = update_lottery_strategy_best(store, checkpoint, output_filename, csv_filename)
+        periods, skipped_periods = state['periods'], state['skipped_periods']
+        total_cost, total_winnings = state['total_cost'], state['total_winnings']
+        lap('report write')
+    else:
+        # 回測交給 backtest.py 的驅動程式，逐期結果從舊到新串流寫入，報告與 CSV 結束時再反轉為最新到最舊
+        strategy = create_strategies(['ito_539_strategy_2'])[0]
+        results = iter_vectorized(store, strategy) if args.vectorized else iter_strategy(store, strategy)
+
+        table = ResultTable()
+        periods, skipped_periods, total_cost, total_winnings = write_winnings_report_best(
+            output_filename, table.collect(results), reverse=True)
+        table.write(csv_filename, reverse=True)
+        lap('report write')
+        state = checkpoint_state_best(table)
+
+    if args.incremental:
+        save_checkpoint(CHECKPOINT_FILE, store, state, output_files)
+
+    bet_periods = periods - skipped_periods
     print(f"獲獎統計報告已生成：{output_filename}")
-    print(f"總期數：{len(results)}期")
+    print(f"欄位式結果已儲存至：{csv_filename}")
+    print(f"總期數：{periods}期")
     print(f"實際投注：{bet_periods}期，成本{total_cost:,}元")
     print(f"跳過投注：{skipped_periods}期")
     print(f"總獎金：{total_winnings:,}元")
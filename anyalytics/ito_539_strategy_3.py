@@ -0,0 +1,119 @@
+import argparse
+from . import output_path
+from .backtest import iter_strategy
+from .draw_store import add_data_arguments, load_store
+from .games import BET_TYPES
+from .profiler import add_profile_argument, lap, start_profiling
+from .report_writer import ReportWriter
+from .result_table import ResultTable
+from .strategies import OVERDUE_MODES, create_strategies
+
+# 冷門號碼的排序方式 -> 策略名稱
+MODE_STRATEGIES = {
+    'gap': 'ito_539_strategy_3',
+    'ratio': 'ito_539_strategy_3_ratio',
+}
+
+def write_overdue_report(filename, results, mode='gap', reverse=False):
+    """逐期串流寫出獲獎統計報告，回傳 (總期數, 總投注成本, 總獲得獎金)
+
+    results 從舊到新產生時以 reverse=True 寫出最新到最舊的報告。
+    """
+    match_stats = {}
+    periods = 0
+    total_cost = 0
+    total_winnings = 0
+
+    with ReportWriter(filename) as writer:
+        for result in results:
+            matches = result['matches']
+            match_stats[matches] = match_stats.get(matches, 0) + 1
+            periods += 1
+            total_cost += result['cost']
+            total_winnings += result['prize']
+
+            writer.write_record([
+                f"第{result['period']}期 ({result['date']})",
+                f"  投注號碼：{result['bet_numbers']}",
+                f"  開獎號碼：{result['winning_numbers']}",
+                f"  中獎數量：{result['matches']}個",
+                f"  獲得獎金：{result['prize']:,}元",
+                f"  淨損益：{result['net_gain']:,}元",
+                ""
+            ])
+
+        report_lines = []
+        report_lines.append("彩票投注策略獲獎統計報告（冷門號碼）")
+        report_lines.append("=" * 60)
+        report_lines.append(f"策略：投注{OVERDUE_MODES[mode]}的5個號碼")
+        report_lines.append("")
+        report_lines.append("獎金標準：")
+        report_lines.append("  中5個號碼：800萬元")
+        report_lines.append("  中4個號碼：2萬元")
+        report_lines.append("  中3個號碼：300元")
+        report_lines.append("  中2個號碼：50元")
+        report_lines.append("  每張彩票：50元")
+        report_lines.append("")
+
+        report_lines.append("中獎統計：")
+        for matches in sorted(match_stats.keys(), reverse=True):
+            count = match_stats[matches]
+            if matches >= 2:  # 只顯示有獎金的情況
+                prize = BET_TYPES['539'].prize(matches)
+                report_lines.append(f"  中{matches}個號碼：{count}次，每次獎金{prize:,}元")
+            else:
+                report_lines.append(f"  中{matches}個號碼：{count}次，無獎金")
+
+        report_lines.append("")
+        report_lines.append("財務統計：")
+        report_lines.append(f"  總投注期數：{periods}期")
+        report_lines.append(f"  總投注成本：{total_cost:,}元")
+        report_lines.append(f"  總獲得獎金：{total_winnings:,}元")
+        report_lines.append(f"  總淨損益：{total_winnings - total_cost:,}元")
+        if total_cost > 0:
+            roi = ((total_winnings - total_cost) / total_cost) * 100
+            report_lines.append(f"  投資報酬率：{roi:.2f}%")
+        report_lines.append("")
+
+        report_lines.append("詳細投注記錄：")
+        report_lines.append("-" * 60)
+
+        writer.finish(report_lines, reverse=reverse)
+
+    return periods, total_cost, total_winnings
+
+def main():
+    parser = argparse.ArgumentParser(description='今彩539 Strategy 3（冷門號碼）回測')
+    parser.add_argument('--mode', choices=list(OVERDUE_MODES), default='gap',
+                        help='gap：未開出期數最多；ratio：未開出期數 / 平均開出間隔最大')
+    add_data_arguments(parser)
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    start_profiling(args.profile)
+
+    # 載入數據
+    store = load_store(args)
+    lap('load')
+
+    print(f"載入了 {len(store)} 期彩票數據")
+    print(f"開始模擬冷門號碼投注策略（{OVERDUE_MODES[args.mode]}）...")
+
+    # 回測交給 backtest.py 的驅動程式，逐期結果從舊到新串流寫入，報告與 CSV 結束時再反轉為最新到最舊
+    strategy = create_strategies([MODE_STRATEGIES[args.mode]])[0]
+
+    table = ResultTable()
+    output_filename = output_path('ito_539_strategy_3.txt' if args.mode == 'gap' else f'ito_539_strategy_3_{args.mode}.txt')
+    csv_filename = output_filename[:-4] + '.csv'
+    periods, total_cost, total_winnings = write_overdue_report(
+        output_filename, table.collect(iter_strategy(store, strategy)), args.mode, reverse=True)
+    table.write(csv_filename, reverse=True)
+    lap('report write')
+
+    print(f"獲獎統計報告已生成：{output_filename}")
+    print(f"欄位式結果已儲存至：{csv_filename}")
+    print(f"總投注：{periods}期，成本{total_cost:,}元")
+    print(f"總獎金：{total_winnings:,}元")
+    print(f"淨損益：{total_winnings - total_cost:,}元")
+
+if __name__ == "__main__":
+    main()
@@ -7,141 +7,177 @@ Strategy 2 規則：
 - 將 1~39 數字分成兩兩一組，總共 741 組
 - 根據過去三十期出現次數最多的組合來投注本期二合
 - 投注金額 25 元，二合中獎金額 1,125 元
+
+--incremental 時由檢查點（checkpoint.py）接續，只分析上次之後新增的期數。
 """
 
-import json
+import argparse
 import sys
 import os
-from datetime import datetime
-from collections import defaultdict, Counter
-from itertools import combinations
+from . import output_path
+from .backtest import iter_strategy
+from .checkpoint import load_checkpoint, patch_report, save_checkpoint
+from .draw_store import add_data_arguments, load_store
+from .profiler import add_profile_argument, lap, start_profiling
+from .report_writer import ReportWriter
+from .result_table import ResultTable, summary_filename
+from .strategies import create_strategies
+
+CHECKPOINT_FILE = output_path("lotto_39_strategy_2.checkpoint.json")
+REPORT_FILE = output_path("lotto_39_strategy_2.txt")
+CSV_FILE = output_path("lotto_39_strategy_2.csv")
+OUTPUT_FILES = [REPORT_FILE, CSV_FILE, summary_filename(CSV_FILE)]
 
 class Lotto39Strategy2Analyzer:
-    def __init__(self, data_file):
-        self.data_file = data_file
-        self.lottery_data = []
+    def __init__(self, store, report_file=REPORT_FILE, csv_file=CSV_FILE):
+        # 逐期模擬交給 backtest.py 的驅動程式（組合視窗、選號與中獎計算），這裡只累計統計與輸出報告
+        self.store = store
+        self.report_file = report_file
+        self.csv_file = csv_file
+        self.strategy = create_strategies(['lotto_39_strategy_2'])[0]
         self.bet_amount = 25  # 投注金額
         self.win_amount = 1125  # 二合中獎金額
-        self.results = []
-
-    def load_data(self):
-        """載入彩券資料"""
-        try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # 資料是倒序排列，需要反轉為正序（從舊到新）
-                self.lottery_data = list(reversed(data['data']))
-            print(f"成功載入 {len(self.lottery_data)} 期開獎資料")
-            print(f"資料期間: {self.lottery_data[0]['date']} ~ {self.lottery_data[-1]['date']}")
-            return True
-        except Exception as e:
-            print(f"載入資料失敗: {e}")
-            return False
-
-    def generate_all_pairs(self):
-        """生成所有可能的兩數組合 (1-39)"""
-        return list(combinations(range(1, 40), 2))
-
-    def get_pairs_from_numbers(self, numbers):
-        """從一期的開獎號碼中提取所有可能的組合"""
-        return list(combinations(sorted(numbers), 2))
-
-    def count_pair_frequency(self, recent_periods):
-        """統計最近期數中各組合的出現頻率"""
-        pair_counter = Counter()
-
-        for period in recent_periods:
-            pairs = self.get_pairs_from_numbers(period['numbers'])
-            for pair in pairs:
-                pair_counter[pair] += 1
-
-        return pair_counter
-
-    def get_most_frequent_pair(self, pair_counter):
-        """獲取出現次數最多的組合"""
-        if not pair_counter:
-            return None
-
-        max_count = max(pair_counter.values())
-        most_frequent_pairs = [pair for pair, count in pair_counter.items() if count == max_count]
-
-        # 如果有多個組合並列最高，隨機選擇第一個
-        return most_frequent_pairs[0] if most_frequent_pairs else None
-
-    def check_win(self, bet_pair, winning_numbers):
-        """檢查投注組合是否中獎"""
-        if not bet_pair:
-            return False
-        return all(num in winning_numbers for num in bet_pair)
-
-    def run_analysis(self):
-        """執行策略分析"""
-        if not self.load_data():
-            return False
-
+        self.table = ResultTable()  # 本次分析的欄位式逐期結果（接續檢查點時只有新增的期數）
+        self.checkpoint = None
+        # 累計統計狀態，可存成檢查點供下次接續
+        self.state = {
+            'periods': 0,
+            'wins': 0,
+            'total_cost': 0,
+            'total_profit': 0,
+            'first_date': None,
+            'pairs': {},  # 投注組合 -> [投注次數, 中獎次數]，依第一次投注的順序
+            'monthly': {},  # YYYY/MM -> 月度統計
+            'recent': [],  # 最近20次投注
+            'record_lines': 0,  # 報告逐期記錄的總行數
+        }
+
+    def run_analysis(self, checkpoint=None):
+        """執行策略分析；指定檢查點時只分析檢查點之後新增的期數，累加到檢查點的狀態上"""
         print("\n開始進行 39樂合彩 Strategy 2 分析...")
         print("="*60)
 
         # 需要至少31期資料才能開始分析（前30期用於統計）
-        if len(self.lottery_data) < 31:
+        if len(self.store) < 31:
             print("資料不足，需要至少31期資料")
             return False
 
-        total_periods = len(self.lottery_data)
-        analysis_periods = total_periods - 30  # 可分析的期數
+        covered = 0
+        if checkpoint is not None:
+            self.checkpoint = checkpoint
+            self.restore_state(checkpoint['state'])
+            covered = checkpoint['covered']
+            print(f"由檢查點接續：新增 {len(self.store) - covered} 期")
 
-        wins = 0
-        total_cost = 0
-        total_profit = 0
+        # 驅動程式以滑動視窗維護前30期的組合頻率（並列最高時選擇最先出現的組合），
+        # 接續檢查點時只從新增期數前30期開始走
+        results = iter_strategy(self.store, self.strategy, covered)
+        try:
+            if self.checkpoint is not None:
+                self.update_report(results)
+            else:
+                self.write_report(results)
+        except OSError as e:
+            print(f"儲存詳細報告失敗: {e}")
+            return False
 
-        for i in range(30, total_periods):
-            current_period = self.lottery_data[i]
-            recent_30_periods = self.lottery_data[i-30:i]
+        # 計算統計數據
+        state = self.state
+        analysis_periods = state['periods']
+        win_rate = (state['wins'] / analysis_periods) * 100 if analysis_periods > 0 else 0
 
-            # 統計前30期的組合頻率
-            pair_counter = self.count_pair_frequency(recent_30_periods)
+        print(f"\n分析結果摘要：")
+        print(f"分析期數: {analysis_periods}")
+        print(f"中獎次數: {state['wins']}")
+        print(f"勝率: {win_rate:.2f}%")
+        print(f"總投注成本: ${state['total_cost']}")
+        print(f"總獲利: ${state['total_profit']}")
+        print(f"投資報酬率: {(state['total_profit'] / state['total_cost'] * 100):.2f}%" if state['total_cost'] > 0 else "N/A")
 
-            # 選擇最常出現的組合
-            bet_pair = self.get_most_frequent_pair(pair_counter)
+        return True
 
-            # 檢查是否中獎
-            is_win = self.check_win(bet_pair, current_period['numbers'])
+    def analyze(self, results):
+        """把驅動程式的逐期結果（由舊到新）累加到統計狀態，逐期產生報告記錄"""
+        for backtest_result in self.table.collect(results):
+            bet_pair = tuple(backtest_result['bet_numbers']) if backtest_result['bet_numbers'] else None
+            is_win = backtest_result['prize'] > 0
 
             # 記錄結果
             result = {
-                'period': i + 1,
-                'date': current_period['date'],
-                'winning_numbers': current_period['numbers'],
+                'period': backtest_result['period'],
+                'date': backtest_result['date'],
+                'winning_numbers': backtest_result['winning_numbers'],
                 'bet_pair': bet_pair,
                 'is_win': is_win,
                 'cost': self.bet_amount,
                 'profit': self.win_amount - self.bet_amount if is_win else -self.bet_amount
             }
 
-            self.results.append(result)
-
-            if is_win:
-                wins += 1
-
-            total_cost += self.bet_amount
-            total_profit += result['profit']
-
-        # 計算統計數據
-        win_rate = (wins / analysis_periods) * 100 if analysis_periods > 0 else 0
-
-        print(f"\n分析結果摘要：")
-        print(f"分析期數: {analysis_periods}")
-        print(f"中獎次數: {wins}")
-        print(f"勝率: {win_rate:.2f}%")
-        print(f"總投注成本: ${total_cost}")
-        print(f"總獲利: ${total_profit}")
-        print(f"投資報酬率: {(total_profit / total_cost * 100):.2f}%" if total_cost > 0 else "N/A")
-
-        return True
+            self.record_result(result)
+            yield self.record_lines(result)
+
+    def write_report(self, results):
+        """完整分析：逐期記錄產生時就串流寫入報告，跑完後寫入摘要並倒序（最新的在前面）"""
+        with ReportWriter(self.report_file) as writer:
+            for record in self.analyze(results):
+                writer.write_record(record)
+            self.state['record_lines'] = writer.line_count
+            writer.finish(self.summary_lines(self.state), reverse=True)
+
+    def update_report(self, results):
+        """接續檢查點：新增期數的記錄插在摘要之後（最新的在前面），舊記錄直接複製"""
+        records = list(self.analyze(results))
+        old_header = '\n'.join(self.summary_lines(self.checkpoint['state'])).encode('utf-8')
+        patch_report(self.report_file, self.summary_lines(self.state), reversed(records), len(old_header))
+        self.state['record_lines'] += sum(len(record) for record in records)
+
+    def record_result(self, result):
+        """把一期結果累加到統計狀態（基本統計、各組合投注 / 中獎次數、月度統計、最近20次投注）"""
+        state = self.state
+        state['periods'] += 1
+        if result['is_win']:
+            state['wins'] += 1
+        state['total_cost'] += result['cost']
+        state['total_profit'] += result['profit']
+        if state['first_date'] is None:
+            state['first_date'] = result['date']
+
+        if result['bet_pair']:
+            pair_stats = state['pairs'].setdefault(result['bet_pair'], [0, 0])
+            pair_stats[0] += 1
+            if result['is_win']:
+                pair_stats[1] += 1
+
+        date_parts = result['date'].split('/')
+        year_month = f"{date_parts[0]}/{date_parts[1]:0>2}"
+        month_stats = state['monthly'].setdefault(year_month, {'bets': 0, 'wins': 0, 'cost': 0, 'profit': 0})
+        month_stats['bets'] += 1
+        if result['is_win']:
+            month_stats['wins'] += 1
+        month_stats['cost'] += result['cost']
+        month_stats['profit'] += result['profit']
+
+        state['recent'].append(result)
+        del state['recent'][:-20]
+
+    def checkpoint_state(self):
+        """可存成 JSON 的統計狀態"""
+        state = dict(self.state)
+        state['pairs'] = [[list(pair), bets, wins] for pair, (bets, wins) in self.state['pairs'].items()]
+        state['recent'] = [dict(result, bet_pair=list(result['bet_pair']) if result['bet_pair'] else None)
+                           for result in self.state['recent']]
+        return state
+
+    def restore_state(self, state):
+        """由檢查點還原統計狀態（組合維持第一次投注的順序，排名並列時才與完整分析一致）"""
+        self.state = dict(state)
+        self.state['pairs'] = {tuple(pair): [bets, wins] for pair, bets, wins in state['pairs']}
+        self.state['recent'] = [dict(result, bet_pair=tuple(result['bet_pair']) if result['bet_pair'] else None)
+                                for result in state['recent']]
 
     def generate_detailed_report(self):
         """生成詳細分析報表"""
-        if not self.results:
+        if not self.state['periods']:
             print("沒有分析結果可供報告")
             return
 
@@ -150,15 +186,15 @@ class Lotto39Strategy2Analyzer:
         print("="*80)
 
         # 基本統計
-        total_bets = len(self.results)
-        wins = sum(1 for r in self.results if r['is_win'])
+        total_bets = self.state['periods']
+        wins = self.state['wins']
         win_rate = (wins / total_bets) * 100 if total_bets > 0 else 0
-        total_cost = sum(r['cost'] for r in self.results)
-        total_profit = sum(r['profit'] for r in self.results)
+        total_cost = self.state['total_cost']
+        total_profit = self.state['total_profit']
         roi = (total_profit / total_cost * 100) if total_cost > 0 else 0
 
         print(f"\n【基本統計】")
-        print(f"分析期間: {self.results[0]['date']} ~ {self.results[-1]['date']}")
+        print(f"分析期間: {self.state['first_date']} ~ {self.state['recent'][-1]['date']}")
         print(f"總投注次數: {total_bets}")
         print(f"中獎次數: {wins}")
         print(f"未中獎次數: {total_bets - wins}")
@@ -167,28 +203,16 @@ class Lotto39Strategy2Analyzer:
         print(f"總獲利: ${total_profit:,}")
         print(f"投資報酬率: {roi:.2f}%")
 
-        # 最常投注的組合
-        bet_pairs = [r['bet_pair'] for r in self.results if r['bet_pair']]
-        pair_counter = Counter(bet_pairs)
+        # 最常投注的組合（並列時依第一次投注的順序，與 Counter.most_common 相同）
+        pair_stats = sorted(self.state['pairs'].items(), key=lambda item: item[1][0], reverse=True)
 
         print(f"\n【最常投注的組合 (前10名)】")
-        for i, (pair, count) in enumerate(pair_counter.most_common(10), 1):
-            win_count = sum(1 for r in self.results if r['bet_pair'] == pair and r['is_win'])
+        for i, (pair, (count, win_count)) in enumerate(pair_stats[:10], 1):
             pair_win_rate = (win_count / count * 100) if count > 0 else 0
             print(f"{i:2d}. {pair}: 投注{count}次, 中獎{win_count}次, 勝率{pair_win_rate:.1f}%")
 
         # 月度統計
-        monthly_stats = defaultdict(lambda: {'bets': 0, 'wins': 0, 'cost': 0, 'profit': 0})
-
-        for result in self.results:
-            date_parts = result['date'].split('/')
-            year_month = f"{date_parts[0]}/{date_parts[1]:0>2}"
-
-            monthly_stats[year_month]['bets'] += 1
-            if result['is_win']:
-                monthly_stats[year_month]['wins'] += 1
-            monthly_stats[year_month]['cost'] += result['cost']
-            monthly_stats[year_month]['profit'] += result['profit']
+        monthly_stats = self.state['monthly']
 
         print(f"\n【月度統計】")
         print(f"{'月份':<10} {'投注次數':<8} {'中獎次數':<8} {'勝率':<8} {'獲利':<10}")
@@ -204,7 +228,7 @@ class Lotto39Strategy2Analyzer:
         print(f"{'期數':<6} {'日期':<12} {'開獎號碼':<20} {'投注組合':<12} {'結果':<6} {'獲利':<8}")
         print("-" * 70)
 
-        for result in self.results[-20:]:
+        for result in self.state['recent']:
             numbers_str = str(result['winning_numbers'])
             bet_str = str(result['bet_pair']) if result['bet_pair'] else "None"
             win_str = "中獎" if result['is_win'] else "未中"
@@ -214,24 +238,47 @@ class Lotto39Strategy2Analyzer:
 
         # 直接生成最終報告
         self.generate_final_report()
+        self.write_result_table()
 
         print(f"\n分析完成！詳細報告已儲存。")
 
-    def generate_final_report(self):
-        """生成格式化的詳細報告"""
-        if not self.results:
-            print("沒有分析結果可供報告")
-            return
+    def record_lines(self, result):
+        """一期的報告記錄（多行）"""
+        bet_pair = result['bet_pair']
+        record = [f"第{result['period']}期 ({result['date']})"]
+        if bet_pair:
+            record.append(f"  投注號碼：{list(bet_pair)}")
+        else:
+            record.append(f"  投注號碼：無 (跳過本期)")
+        record.append(f"  開獎號碼：{result['winning_numbers']}")
+
+        if bet_pair is None:
+            record.append("  中獎情況：跳過投注")
+            record.append("  獲得獎金：0元")
+            record.append("  淨損益：0元")
+        elif result['is_win']:
+            record.append("  中獎情況：中2個號碼")
+            record.append("  獲得獎金：1,125元")
+            record.append(f"  淨損益：{result['profit']}元")
+        else:
+            record.append("  中獎情況：未中獎")
+            record.append("  獲得獎金：0元")
+            record.append(f"  淨損益：{result['profit']}元")
+
+        record.append("")
+        return record
+
+    def summary_lines(self, state):
+        """報告開頭的摘要"""
+        total_periods = state['periods']
+        wins = state['wins']
+        total_cost = state['total_cost']
+        total_profit = state['total_profit']
 
         # 計算統計數據
-        total_periods = len(self.results)
-        total_cost = sum(r['cost'] for r in self.results)
-        wins = sum(1 for r in self.results if r['is_win'])
         total_winnings = wins * 1125  # 每次中獎1125元
-        total_profit = sum(r['profit'] for r in self.results)
         roi = (total_profit / total_cost * 100) if total_cost > 0 else 0
 
-        # 開始生成報告
         report = []
         report.append("39樂合彩投注策略獲獎統計報告")
         report.append("=" * 60)
@@ -254,74 +301,68 @@ class Lotto39Strategy2Analyzer:
         report.append("")
         report.append("詳細投注記錄：")
         report.append("-" * 60)
+        return report
 
-        # 按期數倒序顯示（最新的在前面）
-        for result in reversed(self.results):
-            period = result['period']
-            date = result['date']
-            bet_pair = result['bet_pair']
-            winning_numbers = result['winning_numbers']
-            is_win = result['is_win']
-            profit = result['profit']
-
-            report.append(f"第{period}期 ({date})")
-            if bet_pair:
-                report.append(f"  投注號碼：{list(bet_pair)}")
-            else:
-                report.append(f"  投注號碼：無 (跳過本期)")
-            report.append(f"  開獎號碼：{winning_numbers}")
-
-            if bet_pair is None:
-                report.append("  中獎情況：跳過投注")
-                report.append("  獲得獎金：0元")
-                report.append("  淨損益：0元")
-            elif is_win:
-                report.append("  中獎情況：中2個號碼")
-                report.append("  獲得獎金：1,125元")
-                report.append(f"  淨損益：{profit}元")
-            else:
-                report.append("  中獎情況：未中獎")
-                report.append("  獲得獎金：0元")
-                report.append(f"  淨損益：{profit}元")
-
-            report.append("")
-
-        # 儲存詳細報告
-        try:
-            report_filename = "lotto_39_strategy_2.txt"
-
-            with open(report_filename, 'w', encoding='utf-8') as f:
-                f.write("\n".join(report))
-
-            print(f"詳細報告已儲存至: {report_filename}")
-
-            # 同時輸出到控制台（前50行）
-            print("\n詳細報告預覽（前50行）：")
-            print("=" * 60)
-            for line in report[:50]:
-                print(line)
-            if len(report) > 50:
-                print("...")
-                print(f"完整報告共 {len(report)} 行，已儲存至檔案")
+    def generate_final_report(self):
+        """印出詳細報告的位置與預覽（報告在分析時已串流寫入檔案）"""
+        if not self.state['periods']:
+            print("沒有分析結果可供報告")
+            return
 
-        except Exception as e:
-            print(f"儲存詳細報告失敗: {e}")
+        line_count = self.state['record_lines'] + len(self.summary_lines(self.state))
+        print(f"詳細報告已儲存至: {self.report_file}")
+
+        # 同時輸出到控制台（前50行）
+        print("\n詳細報告預覽（前50行）：")
+        print("=" * 60)
+        for line in ReportWriter.read_lines(self.report_file, 50):
+            print(line)
+        if line_count > 50:
+            print("...")
+            print(f"完整報告共 {line_count} 行，已儲存至檔案")
+
+    def write_result_table(self):
+        """輸出欄位式逐期結果（最新的在前面，與文字報告相同）"""
+        if self.checkpoint is not None:
+            self.table.prepend(self.csv_file, reverse=True)
+        else:
+            self.table.write(self.csv_file, reverse=True)
+        print(f"欄位式結果已儲存至：{self.csv_file}")
 
 def main():
-    # 資料檔案路徑
-    data_file = "../lottery_data.json"
-
-    if not os.path.exists(data_file):
-        print(f"找不到資料檔案: {data_file}")
+    parser = argparse.ArgumentParser(description='39樂合彩 Strategy 2 回測')
+    add_data_arguments(parser)
+    parser.add_argument('--incremental', action='store_true',
+                        help=f'由檢查點（{CHECKPOINT_FILE}）接續，只分析新增的期數並更新報告')
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    start_profiling(args.profile)
+
+    if not os.path.exists(args.data):
+        print(f"找不到資料檔案: {args.data}")
         print("請確認檔案路徑是否正確")
         sys.exit(1)
 
+    # 載入彩券資料
+    try:
+        store = load_store(args)
+        lap('load')
+        print(f"成功載入 {len(store)} 期開獎資料")
+        print(f"資料期間: {store.date(-1)} ~ {store.date(0)}")
+    except Exception as e:
+        print(f"載入資料失敗: {e}")
+        sys.exit(1)
+
     # 建立分析器
-    analyzer = Lotto39Strategy2Analyzer(data_file)
+    analyzer = Lotto39Strategy2Analyzer(store)
 
     # 執行分析
-    if analyzer.run_analysis():
+    checkpoint = load_checkpoint(CHECKPOINT_FILE, store, OUTPUT_FILES) if args.incremental else None
+    if analyzer.run_analysis(checkpoint):
         analyzer.generate_detailed_report()
+        lap('report write')
+        if args.incremental:
+            save_checkpoint(CHECKPOINT_FILE, store, analyzer.checkpoint_state(), OUTPUT_FILES)
     else:
         print("分析執行失敗")
         sys.exit(1)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+39樂合彩 Strategy 3 回測（三合 / 四合）
+
+Strategy 3 規則：
+- 三合：統計過去三十期所有三數組合（9,139 組）的出現次數，投注最常出現的組合
+- 四合：統計過去三十期所有四數組合（82,251 組）的出現次數，投注最常出現的組合
+- 並列最高時選擇視窗內最先出現的組合，並在報告中標註並列組數
+- 投注金額 25 元，三合中獎 11,250 元，四合中獎 212,500 元
+"""
+
+import argparse
+from . import output_path
+from .backtest import iter_strategy
+from .draw_store import add_data_arguments, load_store
+from .profiler import add_profile_argument, lap, start_profiling
+from .games import BET_TYPES
+from .report_writer import ReportWriter
+from .result_table import ResultTable
+from .strategies import create_strategies
+
+# 每注號碼數 -> 投注方式
+PICK_BET_TYPES = {3: '三合', 4: '四合'}
+
+def write_combo_report(filename, results, pick=3, reverse=False):
+    """逐期串流寫出獲獎統計報告，回傳 (總期數, 中獎次數, 總投注成本, 總獲得獎金)
+
+    results 從舊到新產生時以 reverse=True 寫出最新到最舊的報告，不必先收集成列表再反轉。
+    """
+    bet_type = BET_TYPES[PICK_BET_TYPES[pick]]
+    win_prize = bet_type.prizes[pick]
+    periods = 0
+    wins = 0
+    total_cost = 0
+    total_winnings = 0
+
+    with ReportWriter(filename) as writer:
+        for result in results:
+            periods += 1
+            total_cost += result['cost']
+            total_winnings += result['prize']
+
+            record = [f"第{result['period']}期 ({result['date']})"]
+            if result['bet_numbers'] is None:
+                record.append("  投注號碼：無 (跳過本期)")
+                record.append(f"  開獎號碼：{result['winning_numbers']}")
+                record.append("  中獎情況：跳過投注")
+            else:
+                record.append(f"  投注號碼：{result['bet_numbers']}")
+                if result['tied'] > 1:
+                    record.append(f"  並列最高：{result['tied']}組（各出現{result['frequency']}次，取最先出現者）")
+                record.append(f"  開獎號碼：{result['winning_numbers']}")
+                if result['prize'] > 0:
+                    wins += 1
+                    record.append(f"  中獎情況：中{pick}個號碼（{PICK_BET_TYPES[pick]}）")
+                else:
+                    record.append(f"  中獎情況：中{result['matches']}個號碼，未中獎")
+            record.append(f"  獲得獎金：{result['prize']:,}元")
+            record.append(f"  淨損益：{result['net_gain']:,}元")
+            record.append("")
+            writer.write_record(record)
+
+        bet_periods = total_cost // bet_type.cost
+
+        report_lines = []
+        report_lines.append(f"39樂合彩投注策略獲獎統計報告（{PICK_BET_TYPES[pick]}）")
+        report_lines.append("=" * 60)
+        report_lines.append(f"策略：根據過去30期出現次數最多的{pick}數組合投注{PICK_BET_TYPES[pick]}")
+        report_lines.append("")
+        report_lines.append("獎金標準：")
+        report_lines.append(f"  投注{pick}個號碼全中：{win_prize:,}元")
+        report_lines.append(f"  每張彩票：{bet_type.cost}元")
+        report_lines.append("")
+        report_lines.append("中獎統計：")
+        report_lines.append(f"  中{pick}個號碼：{wins}次，每次獎金{win_prize:,}元")
+        report_lines.append(f"  未中獎：{bet_periods - wins}次")
+        report_lines.append("")
+        report_lines.append("財務統計：")
+        report_lines.append(f"  總投注期數：{bet_periods}期")
+        report_lines.append(f"  總投注成本：{total_cost:,}元")
+        report_lines.append(f"  總獲得獎金：{total_winnings:,}元")
+        report_lines.append(f"  總淨損益：{total_winnings - total_cost:,}元")
+        if total_cost > 0:
+            roi = ((total_winnings - total_cost) / total_cost) * 100
+            report_lines.append(f"  投資報酬率：{roi:.2f}%")
+        report_lines.append("")
+        report_lines.append("詳細投注記錄：")
+        report_lines.append("-" * 60)
+
+        writer.finish(report_lines, reverse=reverse)
+
+    return periods, wins, total_cost, total_winnings
+
+def main():
+    parser = argparse.ArgumentParser(description='39樂合彩 Strategy 3（三合 / 四合）回測')
+    parser.add_argument('--pick', type=int, choices=sorted(PICK_BET_TYPES), default=3, help='3：三合；4：四合')
+    add_data_arguments(parser)
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    start_profiling(args.profile)
+
+    # 載入數據
+    store = load_store(args)
+    lap('load')
+
+    print(f"載入了 {len(store)} 期彩票數據")
+    print(f"開始模擬{PICK_BET_TYPES[args.pick]}組合投注策略...")
+
+    # 回測交給 backtest.py 的驅動程式，逐期結果從舊到新串流寫入，報告與 CSV 結束時再反轉為最新到最舊
+    strategy = create_strategies([f'lotto_39_strategy_3_{args.pick}'])[0]
+    results = iter_strategy(store, strategy)
+
+    table = ResultTable()
+    output_filename = output_path(f'lotto_39_strategy_3_{args.pick}.txt')
+    csv_filename = output_path(f'lotto_39_strategy_3_{args.pick}.csv')
+    periods, wins, total_cost, total_winnings = write_combo_report(output_filename, table.collect(results), args.pick,
+                                                                   reverse=True)
+    table.write(csv_filename, reverse=True)
+    lap('report write')
+
+    print(f"獲獎統計報告已生成：{output_filename}")
+    print(f"欄位式結果已儲存至：{csv_filename}")
+    print(f"總期數：{periods}期，中獎{wins}次")
+    print(f"總投注成本：{total_cost:,}元")
+    print(f"總獎金：{total_winnings:,}元")
+    print(f"淨損益：{total_winnings - total_cost:,}元")
+
+if __name__ == "__main__":
+    main()
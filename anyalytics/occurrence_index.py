@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+號碼出現位置索引
+
+每個號碼一個由小到大排列的期數陣列（從舊到新編號，第 0 期為最早一期），
+由 DrawStore 的 incidence 一次建立（每次執行重建，只需一次 numpy 走訪，不另外存檔）。
+
+冷門號碼策略每一期要問的「各號碼已經幾期沒開、平均幾期開一次」（overdue）
+都是對陣列做二分搜尋，不必再從頭掃描歷史。
+"""
+
+from array import array
+from bisect import bisect_left
+
+import numpy as np
+
+
+class OccurrenceIndex:
+    def __init__(self):
+        self.positions = [array('i') for _ in range(39)]
+        self.total = 0
+
+    @classmethod
+    def from_store(cls, store):
+        index = cls()
+        index.update(store)
+        return index
+
+    def update(self, store):
+        """把 store 中尚未加入索引的期數（由舊到新）附加到索引，回傳新增的期數"""
+        incidence = store.chronological().incidence[self.total:]
+        if not len(incidence):
+            return 0
+        numbers, rows = np.nonzero(incidence.T)
+        boundaries = np.searchsorted(numbers, np.arange(40))
+        rows = (rows + self.total).tolist()
+        for number in range(39):
+            self.positions[number].extend(rows[boundaries[number]:boundaries[number + 1]])
+        self.total += len(incidence)
+        return len(incidence)
+
+    def overdue(self, before=None):
+        """第 before 期之前每個號碼（1~39）的 (連續未開出期數, 平均開出間隔)
+
+        連續未開出期數在從未開出時為 before，平均開出間隔在開出不到兩次時為 None。
+        """
+        before = self.total if before is None else before
+        result = []
+        for positions in self.positions:
+            index = bisect_left(positions, before)
+            if not index:
+                result.append((before, None))
+                continue
+            last = positions[index - 1]
+            result.append((before - last - 1, (last - positions[0]) / (index - 1) if index >= 2 else None))
+        return result
+
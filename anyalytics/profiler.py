@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+各階段耗時與記憶體配置的剖析
+
+以 --profile 或環境變數 ITO539_PROFILE=1 啟用，程式結束時印出每個階段
+（載入、視窗更新、選號、計分、寫報告…）的耗時、次數與淨配置區塊數（sys.getallocatedblocks 的差值）。
+--profile 後面接檔名（或 ITO539_PROFILE=檔名）時另以 cProfile 記錄，存成 pstats 檔：
+    python -m anyalytics.ito_539_strategy_1 --profile ito_539_strategy_1.pstats
+    python -m pstats ito_539_strategy_1.pstats
+
+階段以 lap(stage) 切分：上一次 lap 之後到這一次之間的時間都算在 stage，
+所以逐期迴圈只需在每個階段結束時呼叫一次；未啟用時 lap 只做一次判斷就返回。
+sweep.py / significance.py / walk_forward.py 的行程池工作行程不在記錄範圍內，只記錄主行程。
+"""
+
+import atexit
+import cProfile
+import os
+import sys
+import time
+
+PROFILE_ENV = 'ITO539_PROFILE'
+
+
+class StageProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.stages = {}  # 階段 -> [耗時秒數, 次數, 淨配置區塊數]，依第一次出現的順序
+        self.pstats_file = None
+        self._profile = None
+        self._started = None
+        self._last_time = None
+        self._last_blocks = None
+
+    def start(self, pstats_file=None):
+        self.stages = {}
+        self.pstats_file = pstats_file
+        if pstats_file:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self.enabled = True
+        self._last_blocks = sys.getallocatedblocks()
+        self._started = self._last_time = time.perf_counter()
+
+    def lap(self, stage):
+        """把上一次 lap 之後的耗時與配置計入 stage"""
+        if not self.enabled:
+            return
+        elapsed = time.perf_counter() - self._last_time
+        blocks = sys.getallocatedblocks()
+        entry = self.stages.get(stage)
+        if entry is None:
+            entry = self.stages[stage] = [0.0, 0, 0]
+        entry[0] += elapsed
+        entry[1] += 1
+        entry[2] += blocks - self._last_blocks
+        # lap 本身的耗時不計入下一個階段
+        self._last_blocks = sys.getallocatedblocks()
+        self._last_time = time.perf_counter()
+
+    def stop(self):
+        """停止記錄，回傳總耗時（秒）"""
+        total = time.perf_counter() - self._started
+        self.enabled = False
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(self.pstats_file)
+            self._profile = None
+        return total
+
+    def report_lines(self, total):
+        lines = [f"各階段耗時（總耗時 {total * 1000:,.1f} ms）",
+                 f"  {'階段':<16} {'耗時(ms)':>12} {'比例':>7} {'次數':>9} {'平均(µs)':>10} {'淨配置區塊':>12}"]
+        for stage, (seconds, calls, blocks) in self.stages.items():
+            share = seconds / total * 100 if total > 0 else 0.0
+            lines.append(f"  {stage:<16} {seconds * 1000:>12,.1f} {share:>6.1f}% {calls:>9,} "
+                         f"{seconds / calls * 1e6:>10,.1f} {blocks:>12,}")
+        return lines
+
+
+PROFILER = StageProfiler()
+lap = PROFILER.lap
+
+
+def add_profile_argument(parser):
+    parser.add_argument('--profile', nargs='?', const='', default=None, metavar='PSTATS',
+                        help=f'印出各階段耗時與配置；指定檔名時另存 cProfile 結果（也可設定環境變數 {PROFILE_ENV}）')
+
+
+def start_profiling(option=None):
+    """依 --profile 的值（None 表示未指定）或環境變數啟用剖析，程式結束時（包含 sys.exit）印出結果"""
+    if option is None:
+        option = os.environ.get(PROFILE_ENV, '')
+        if option in ('', '0'):
+            return
+        if option == '1':
+            option = ''
+    PROFILER.start(option or None)
+    atexit.register(finish_profiling)
+
+
+def finish_profiling():
+    if not PROFILER.enabled:
+        return
+    total = PROFILER.stop()
+    print()
+    for line in PROFILER.report_lines(total):
+        print(line)
+    if PROFILER.pstats_file:
+        print(f"cProfile 結果已儲存至：{PROFILER.pstats_file}（python -m pstats {PROFILER.pstats_file}）")
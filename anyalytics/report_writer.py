@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+串流報告寫入
+
+逐期記錄產生時就寫入暫存檔（緩衝寫入），不必先把整份報告放在記憶體裡。
+摘要要等全部期數跑完才知道，因此在 finish() 時先寫摘要，再把暫存的逐期記錄接在後面。
+需要倒序輸出時只記錄每筆記錄在暫存檔中的位移，結束時依位移反向複製。
+"""
+
+import os
+import shutil
+from array import array
+
+BUFFER_SIZE = 1 << 16
+
+
+class ReportWriter:
+    def __init__(self, filename, buffer_size=BUFFER_SIZE):
+        self.filename = filename
+        self.body_filename = filename + '.body.tmp'
+        self.buffer_size = buffer_size
+        self.body = open(self.body_filename, 'w+b', buffering=buffer_size)
+        self.offsets = array('Q')  # 每筆記錄在暫存檔中的起始位移
+        self.line_count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if not self.body.closed:
+            self.body.close()
+        if os.path.exists(self.body_filename):
+            os.remove(self.body_filename)
+
+    def write_record(self, lines):
+        """寫入一期的記錄（多行）"""
+        self.offsets.append(self.body.tell())
+        self.body.write(''.join('\n' + line for line in lines).encode('utf-8'))
+        self.line_count += len(lines)
+
+    def finish(self, header_lines, reverse=False):
+        """寫入摘要，再接上逐期記錄；輸出內容等同 "\\n".join(摘要 + 記錄)"""
+        self.body.flush()
+        end = self.body.tell()
+        with open(self.filename, 'wb', buffering=self.buffer_size) as f:
+            f.write('\n'.join(header_lines).encode('utf-8'))
+            self.body.seek(0)
+            if not reverse:
+                shutil.copyfileobj(self.body, f, self.buffer_size)
+            else:
+                for index in range(len(self.offsets) - 1, -1, -1):
+                    start = self.offsets[index]
+                    self.body.seek(start)
+                    f.write(self.body.read(end - start))
+                    end = start
+        self.line_count += len(header_lines)
+        self.body.close()
+        os.remove(self.body_filename)
+
+    def preview(self, limit=50):
+        """讀回報告的前幾行"""
+        return self.read_lines(self.filename, limit)
+
+    @staticmethod
+    def read_lines(filename, limit=50):
+        lines = []
+        with open(filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                if len(lines) >= limit:
+                    break
+                lines.append(line.rstrip('\n'))
+        return lines
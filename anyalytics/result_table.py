@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+欄位式回測結果
+
+文字報告適合閱讀，但比較不同執行結果時還要再解析中文字串。
+這裡把逐期結果存成固定欄位的 CSV（全部為整數欄位），另外輸出一列摘要：
+- <name>.csv：每期一列，欄位見 COLUMNS，日期為 YYYYMMDD，未投注時投注號碼為 0
+- <name>.summary.csv：一列摘要，欄位見 SUMMARY_COLUMNS
+
+兩個檔案都可以直接以 numpy.loadtxt / pandas.read_csv / 前端 split(',') 讀取。
+"""
+
+import os
+import shutil
+from array import array
+
+import numpy as np
+
+BET_COLUMNS = [f'bet_{i}' for i in range(1, 6)]
+WIN_COLUMNS = [f'win_{i}' for i in range(1, 6)]
+COLUMNS = ['date'] + BET_COLUMNS + WIN_COLUMNS + ['matches', 'prize', 'cost', 'net_gain']
+SUMMARY_COLUMNS = ['periods', 'bets', 'wins', 'total_cost', 'total_winnings', 'net_gain', 'roi']
+
+
+class ResultTable:
+    def __init__(self):
+        self.columns = {name: array('q') for name in COLUMNS}
+
+    def __len__(self):
+        return len(self.columns['date'])
+
+    def add(self, date, bet_numbers, winning_numbers, matches, prize, cost):
+        """加入一期結果（date 為 YYYY/MM/DD，未投注時 bet_numbers 為 None）"""
+        bet_numbers = list(bet_numbers or [])
+        self.columns['date'].append(int(date.replace('/', '')))
+        for name, number in zip(BET_COLUMNS, bet_numbers + [0] * (5 - len(bet_numbers))):
+            self.columns[name].append(number)
+        for name, number in zip(WIN_COLUMNS, winning_numbers):
+            self.columns[name].append(number)
+        self.columns['matches'].append(matches or 0)
+        self.columns['prize'].append(prize)
+        self.columns['cost'].append(cost)
+        self.columns['net_gain'].append(prize - cost)
+
+    def collect(self, results):
+        """邊傳遞結果邊記錄，可串接在報告寫入之前"""
+        for result in results:
+            self.add(result['date'], result['bet_numbers'], result['winning_numbers'],
+                     result['matches'], result['prize'], result['cost'])
+            yield result
+
+    def column(self, name):
+        return np.frombuffer(self.columns[name], dtype=np.int64)
+
+    def to_matrix(self):
+        if not len(self):
+            return np.zeros((0, len(COLUMNS)), dtype=np.int64)
+        return np.column_stack([self.column(name) for name in COLUMNS])
+
+    def summary(self):
+        cost = self.column('cost')
+        prize = self.column('prize')
+        total_cost = int(cost.sum())
+        total_winnings = int(prize.sum())
+        return {
+            'periods': len(self),
+            'bets': int((cost > 0).sum()),
+            'wins': int((prize > 0).sum()),
+            'total_cost': total_cost,
+            'total_winnings': total_winnings,
+            'net_gain': total_winnings - total_cost,
+            'roi': round((total_winnings - total_cost) / total_cost * 100, 2) if total_cost > 0 else 0.0,
+        }
+
+    def write(self, filename, reverse=False):
+        """一次寫出逐期結果與摘要（filename 為 .csv 檔名；reverse 時依加入順序的反向寫出）"""
+        matrix = self.to_matrix()
+        np.savetxt(filename, matrix[::-1] if reverse else matrix, fmt='%d', delimiter=',',
+                   header=','.join(COLUMNS), comments='')
+        write_summary(filename, self.summary())
+
+    def prepend(self, filename, reverse=False):
+        """把本表的逐期結果插在既有 CSV 的表頭之後、舊結果之前，並把摘要累加到既有摘要
+
+        供增量回測使用（結果最新的在前面時，每日新增的期數都在最前面），舊結果直接以位元組複製；
+        reverse 同 write。
+        """
+        header = (','.join(COLUMNS) + '\n').encode('utf-8')
+        matrix = self.to_matrix()
+        rows = ''.join(','.join(map(str, row)) + '\n'
+                       for row in (matrix[::-1] if reverse else matrix).tolist()).encode('utf-8')
+        temp_file = filename + '.tmp'
+        with open(filename, 'rb') as old, open(temp_file, 'wb') as f:
+            f.write(header)
+            f.write(rows)
+            old.seek(len(header))
+            shutil.copyfileobj(old, f)
+        os.replace(temp_file, filename)
+
+        with open(summary_filename(filename), 'r', encoding='utf-8') as f:
+            previous = dict(zip(f.readline().strip().split(','), f.readline().strip().split(',')))
+        summary = self.summary()
+        for name in ('periods', 'bets', 'wins', 'total_cost', 'total_winnings', 'net_gain'):
+            summary[name] += int(previous[name])
+        total_cost = summary['total_cost']
+        summary['roi'] = round(summary['net_gain'] / total_cost * 100, 2) if total_cost > 0 else 0.0
+        write_summary(filename, summary)
+
+
+def write_summary(filename, summary):
+    with open(summary_filename(filename), 'w', encoding='utf-8') as f:
+        f.write(','.join(SUMMARY_COLUMNS) + '\n')
+        f.write(','.join(str(summary[name]) for name in SUMMARY_COLUMNS) + '\n')
+
+
+def summary_filename(filename):
+    base = filename[:-4] if filename.endswith('.csv') else filename
+    return base + '.summary.csv'
+
+
+def load_result_table(filename):
+    """讀回逐期結果，回傳 {欄位: ndarray}"""
+    matrix = np.loadtxt(filename, dtype=np.int64, delimiter=',', skiprows=1, ndmin=2)
+    return {name: matrix[:, index] for index, name in enumerate(COLUMNS)}
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+策略顯著性檢定（蒙地卡羅）
+
+報告裡的投資報酬率只是一個數字，看不出是否真的比隨便選號好。
+這裡以大量模擬建立「沒有選號能力」的基準分佈，計算 p 值與信賴區間：
+
+- random：隨機選號基準。在策略有投注的每一期，改成隨機選同樣數量的號碼；
+  隨機 k 個號碼對中 5 個開獎號碼的個數服從超幾何分佈 Hypergeometric(39, 5, k)，
+  各期互相獨立，所以 P 期裡「中 m 個」的期數服從多項分佈，
+  每次模擬只需抽一組多項分佈計數再乘上獎金表，不必逐期模擬。
+- permutation：打亂開獎順序後以回測驅動程式重跑同一個策略，
+  檢驗策略是否利用了歷史的先後順序（較慢，預設次數較少）。
+
+注意：legacy 視窗定義（ito_539_strategy_1/2、lotto_39_strategy_1）的統計範圍包含投注期本身，
+對隨機選號基準必然顯著；要判斷選號能力請看只使用投注期之前開獎的策略。
+
+模擬分成固定大小的區塊，每個區塊使用由 --seed 衍生的獨立亂數串流並分散到多個行程，
+結果與行程數無關，相同 seed 一定得到相同結果。
+
+用法：
+    python -m anyalytics.significance --strategies lotto_39_strategy_2 --replications 10000
+    python -m anyalytics.significance --method permutation --replications 500 --workers 8
+"""
+
+import argparse
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from math import comb
+
+import numpy as np
+
+from . import output_path
+from .backtest import run_backtest
+from .draw_store import DrawStore, add_data_arguments, load_store
+from .profiler import add_profile_argument, lap, start_profiling
+from .strategies import STRATEGY_NAMES, create_strategies
+
+CHUNK_SIZE = 1000  # 每個區塊的模擬次數（亂數串流以區塊為單位，與行程數無關）
+PERMUTATION_CHUNK_SIZE = 25
+RESULT_FIELDS = ['strategy', 'method', 'replications', 'bets', 'roi', 'roi_p_value', 'roi_null_low',
+                 'roi_null_high', 'roi_ci_low', 'roi_ci_high', 'hit_rate', 'hit_rate_p_value',
+                 'hit_rate_null_mean']
+
+
+def bet_arrays(results):
+    """取出有投注期數的 (號碼數, 獎金, 成本) 陣列"""
+    placed = [result for result in results if result['bet_numbers'] is not None]
+    sizes = np.array([len(result['bet_numbers']) for result in placed], dtype=np.int64)
+    prize = np.array([result['prize'] for result in placed], dtype=np.int64)
+    cost = np.array([result['cost'] for result in placed], dtype=np.int64)
+    return sizes, prize, cost
+
+
+def match_probabilities(k):
+    """隨機選 k 個號碼時，中 0~k 個開獎號碼的機率（超幾何分佈）"""
+    return np.array([comb(5, m) * comb(34, k - m) for m in range(k + 1)]) / comb(39, k)
+
+
+def random_bet_chunk(args):
+    """隨機選號基準的一個區塊，回傳每次模擬的 (總獎金, 中獎期數)"""
+    sizes, payouts, seed, replications = args
+    rng = np.random.default_rng(seed)
+    total_prize = np.zeros(replications, dtype=np.int64)
+    hits = np.zeros(replications, dtype=np.int64)
+    for k, payout in payouts.items():
+        periods = int((sizes == k).sum())
+        if periods == 0:
+            continue
+        # counts[r, m]：第 r 次模擬中，中 m 個號碼的期數
+        counts = rng.multinomial(periods, match_probabilities(k), size=replications)
+        payout = np.asarray(payout, dtype=np.int64)
+        total_prize += counts @ payout
+        hits += counts[:, payout > 0].sum(axis=1)
+    return total_prize, hits
+
+
+def bootstrap_chunk(args):
+    """逐期結果重抽樣（bootstrap）的一個區塊，回傳每次重抽的 (總獎金, 總成本)"""
+    prize, cost, seed, replications = args
+    rng = np.random.default_rng(seed)
+    index = rng.integers(0, len(prize), size=(replications, len(prize)))
+    return prize[index].sum(axis=1), cost[index].sum(axis=1)
+
+
+def permutation_chunk(args):
+    """打亂開獎順序重跑策略的一個區塊，回傳 {策略: (總獎金, 總成本, 中獎期數, 投注期數) 陣列}"""
+    ordinals, numbers, names, lookback, seed, replications = args
+    rng = np.random.default_rng(seed)
+    strategies = create_strategies(names, lookback)
+    totals = {name: np.zeros((4, replications), dtype=np.int64) for name in names}
+    for replication in range(replications):
+        store = DrawStore(ordinals, numbers[rng.permutation(len(numbers))])
+        for name, results in run_backtest(store, strategies).items():
+            _, prize, cost = bet_arrays(results)
+            totals[name][:, replication] = prize.sum(), cost.sum(), (prize > 0).sum(), len(prize)
+    return totals
+
+
+def chunk_seeds(seed, replications, chunk_size):
+    """把模擬次數切成區塊，每個區塊一個獨立的亂數串流"""
+    counts = [chunk_size] * (replications // chunk_size)
+    if replications % chunk_size:
+        counts.append(replications % chunk_size)
+    return list(zip(np.random.SeedSequence(seed).spawn(len(counts)), counts))
+
+
+def roi(total_prize, total_cost):
+    return (total_prize - total_cost) / np.maximum(total_cost, 1) * 100
+
+
+def p_value(null, observed):
+    """單尾 p 值：基準分佈中不小於觀察值的比例（含觀察值本身，浮點誤差內視為相等）"""
+    return (1 + int((null >= observed - 1e-9).sum())) / (len(null) + 1)
+
+
+def summarize(strategy, method, prize, cost, null_roi, null_hit_rate, boot_roi):
+    bets = len(prize)
+    observed_roi = float(roi(prize.sum(), cost.sum()))
+    observed_hit_rate = float((prize > 0).mean() * 100) if bets else 0.0
+    return {
+        'strategy': strategy.name,
+        'method': method,
+        'replications': len(null_roi),
+        'bets': bets,
+        'roi': round(observed_roi, 2),
+        'roi_p_value': round(p_value(null_roi, observed_roi), 4),
+        'roi_null_low': round(float(np.percentile(null_roi, 2.5)), 2),
+        'roi_null_high': round(float(np.percentile(null_roi, 97.5)), 2),
+        'roi_ci_low': round(float(np.percentile(boot_roi, 2.5)), 2),
+        'roi_ci_high': round(float(np.percentile(boot_roi, 97.5)), 2),
+        'hit_rate': round(observed_hit_rate, 2),
+        'hit_rate_p_value': round(p_value(null_hit_rate, observed_hit_rate), 4),
+        'hit_rate_null_mean': round(float(null_hit_rate.mean()), 2),
+    }
+
+
+def run_significance(store, strategies, method='random', replications=10000, seed=539, workers=None):
+    """計算各策略的顯著性，回傳結果列表（順序與 strategies 相同）"""
+    observed = run_backtest(store, strategies)
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        if method == 'permutation':
+            names = [strategy.name for strategy in strategies]
+            lookback = strategies[0].lookback
+            chunks = [(store.ordinals, store.numbers, names, lookback, chunk_seed, count)
+                      for chunk_seed, count in chunk_seeds(seed, replications, PERMUTATION_CHUNK_SIZE)]
+            permuted = list(executor.map(permutation_chunk, chunks))
+
+        for index, strategy in enumerate(strategies):
+            sizes, prize, cost = bet_arrays(observed[strategy.name])
+            if len(prize) == 0:
+                print(f"{strategy.name} 沒有投注任何一期，略過")
+                continue
+
+            if method == 'random':
+                payouts = {int(k): strategy.game.payout_table(int(k)) for k in np.unique(sizes)}
+                chunks = [(sizes, payouts, chunk_seed, count)
+                          for chunk_seed, count in chunk_seeds([seed, index], replications, CHUNK_SIZE)]
+                null_prize, null_hits = map(np.concatenate, zip(*executor.map(random_bet_chunk, chunks)))
+                null_roi = roi(null_prize, cost.sum())
+                null_hit_rate = null_hits / len(prize) * 100
+            else:
+                null_prize, null_cost, null_hits, null_bets = np.concatenate(
+                    [chunk[strategy.name] for chunk in permuted], axis=1)
+                null_roi = roi(null_prize, null_cost)
+                null_hit_rate = null_hits / np.maximum(null_bets, 1) * 100
+
+            chunks = [(prize, cost, chunk_seed, count)
+                      for chunk_seed, count in chunk_seeds([seed, index, 1], replications, CHUNK_SIZE)]
+            boot_prize, boot_cost = map(np.concatenate, zip(*executor.map(bootstrap_chunk, chunks)))
+            rows.append(summarize(strategy, method, prize, cost, null_roi, null_hit_rate, roi(boot_prize, boot_cost)))
+    return rows
+
+
+def write_results(rows, filename):
+    with open(filename, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='策略顯著性檢定（蒙地卡羅）')
+    parser.add_argument('--strategies', default=','.join(STRATEGY_NAMES), help='策略名稱，以逗號分隔')
+    parser.add_argument('--method', choices=['random', 'permutation'], default='random',
+                        help='random：隨機選號基準；permutation：打亂開獎順序重跑策略')
+    parser.add_argument('--replications', type=int, default=None,
+                        help='模擬次數（預設 random 10000 次、permutation 500 次）')
+    parser.add_argument('--seed', type=int, default=539, help='亂數種子')
+    parser.add_argument('--lookback', type=int, default=30, help='統計期數')
+    parser.add_argument('--workers', type=int, default=None, help='行程數（預設為 CPU 核心數）')
+    add_data_arguments(parser)
+    parser.add_argument('--output', default=output_path('significance.csv'), help='結果輸出檔案')
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    start_profiling(args.profile)
+
+    replications = args.replications or (10000 if args.method == 'random' else 500)
+    store = load_store(args)
+    lap('load')
+    strategies = create_strategies(args.strategies.split(','), args.lookback)
+    print(f"載入了 {len(store)} 期彩票數據，{len(strategies)} 個策略，每個策略模擬 {replications} 次（{args.method}）")
+
+    rows = run_significance(store, strategies, args.method, replications, args.seed, args.workers)
+    lap('simulate')
+    write_results(rows, args.output)
+    lap('report write')
+
+    print(f"\n{'策略':<26} {'報酬率':>9} {'p值':>7} {'基準95%區間':>20} {'報酬率95%信賴區間':>22} {'中獎率':>8} {'p值':>7}")
+    for row in rows:
+        null_range = f"{row['roi_null_low']:.2f}% ~ {row['roi_null_high']:.2f}%"
+        ci = f"{row['roi_ci_low']:.2f}% ~ {row['roi_ci_high']:.2f}%"
+        print(f"{row['strategy']:<26} {row['roi']:>8.2f}% {row['roi_p_value']:>7.4f} {null_range:>20} {ci:>22} "
+              f"{row['hit_rate']:>7.2f}% {row['hit_rate_p_value']:>7.4f}")
+    print(f"\n結果已儲存至：{args.output}")
+
+
+if __name__ == "__main__":
+    main()
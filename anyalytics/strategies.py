@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+策略外掛
+
+每個策略只負責「這一期要投注哪些號碼」：pick(state) 回傳投注號碼，None 表示跳過。
+載入資料、維護視窗、計算中獎與輸出報告都交給 backtest.py 的回測驅動程式，
+因此驅動程式的任何加速都會同時套用到所有策略。
+
+state 為 backtest.WindowState，可查詢：
+- state.numbers：號碼滑動視窗（NumberWindow，需宣告 uses_numbers）
+- state.top_k(k, newest_first)：號碼視窗的前 k 名，同一期內由共用視窗的策略共用
+- state.combos[k]：k 數組合滑動視窗（需在 combo_sizes 中宣告）
+- state.occurrences / state.position：號碼出現位置索引與投注期的時間序位置
+- state.overdue()：投注期之前各號碼的未開出期數與平均間隔，同一期內由冷門號碼策略共用
+
+alignment 決定視窗與投注期的對應方式（見 backtest.ALIGNMENTS），
+原有腳本的視窗定義不同，移植時保留原本的定義（包含同次數時的先後），結果才會與原本的報告相同。
+"""
+
+from .games import BET_TYPES
+
+# 冷門號碼的排序方式
+OVERDUE_MODES = {
+    'gap': '連續未開出期數最多',
+    'ratio': '連續未開出期數相對於平均開出間隔最長',
+}
+
+
+def rank_overdue(overdue, count=5, mode='gap'):
+    """依 OccurrenceIndex.overdue 的結果排出最久沒開出的 count 個號碼（同分時取較小號碼）"""
+    if mode == 'ratio':
+        scores = [(gap + 1) / interval if interval else gap + 1 for gap, interval in overdue]
+    else:
+        scores = [gap for gap, _ in overdue]
+    return sorted(range(1, 40), key=lambda number: (-scores[number - 1], number))[:count]
+
+
+class Strategy:
+    """策略外掛的基底類別"""
+
+    bet_type = '539'  # games.BET_TYPES 的鍵，決定每注成本與獎金
+    alignment = 'chronological'
+    uses_numbers = False  # 是否需要號碼視窗
+    combo_sizes = ()  # 需要的組合視窗大小
+
+    def __init__(self, name, description, lookback=30):
+        self.name = name
+        self.description = description
+        self.lookback = lookback
+
+    @property
+    def game(self):
+        return BET_TYPES[self.bet_type]
+
+    @property
+    def newest_first(self):
+        """同次數時是否以最近出現者優先（原本由新到舊統計的腳本）"""
+        return self.alignment == 'legacy'
+
+    def pick(self, state):
+        """回傳本期投注號碼（list），None 表示跳過本期"""
+        raise NotImplementedError
+
+    def skip_reason(self, state):
+        """跳過投注時記錄在報告中的原因"""
+        return "跳過投注"
+
+    def annotate(self, state, result):
+        """投注時在結果中加入報告需要的額外欄位（預設不加）"""
+
+
+class TopKStrategy(Strategy):
+    """視窗內出現次數最多的 k 個號碼（今彩539 Strategy 1、39樂合彩 Strategy 1）"""
+
+    alignment = 'legacy'
+    uses_numbers = True
+
+    def __init__(self, name, description, k=5, bet_type='539', lookback=30):
+        super().__init__(name, description, lookback)
+        self.k = k
+        self.bet_type = bet_type
+
+    def pick(self, state):
+        return state.top_k(self.k, self.newest_first)
+
+
+class ClearTopKStrategy(TopKStrategy):
+    """同 TopKStrategy，但前 k 名不唯一時跳過（今彩539 Strategy 2）"""
+
+    def pick(self, state):
+        if not state.numbers.is_clear_top_k(self.k):
+            return None
+        return state.top_k(self.k, self.newest_first)
+
+    def skip_reason(self, state):
+        window = state.numbers
+        return self.skip_message(window.kth_count(self.k) if window.distinct() >= self.k else 0)
+
+    def skip_message(self, kth_count):
+        """第 k 名出現 kth_count 次時跳過的原因，0 表示數字種類不足 k 個"""
+        if not kth_count:
+            return f"跳過投注 - 數字種類不足{self.k}個"
+        return f"跳過投注 - 第{self.k}名與其他號碼次數相同({kth_count}次)，無法確定唯一的前{self.k}名"
+
+
+class ComboStrategy(Strategy):
+    """視窗內出現次數最多的 k 數組合（39樂合彩 Strategy 2 / 3）"""
+
+    def __init__(self, name, description, k=2, bet_type='二合', lookback=30):
+        super().__init__(name, description, lookback)
+        self.k = k
+        self.bet_type = bet_type
+        self.combo_sizes = (k,)
+
+    def pick(self, state):
+        combo = state.combos[self.k].most_frequent(self.newest_first)
+        return list(combo) if combo else None
+
+    def annotate(self, state, result):
+        # 並列最高的組數與出現次數，報告中標註
+        window = state.combos[self.k]
+        result['tied'] = window.tied(1)
+        result['frequency'] = window.kth_count(1)
+
+
+class OverdueStrategy(Strategy):
+    """最久沒開出的 k 個號碼（今彩539 Strategy 3），只使用投注期之前的開獎"""
+
+    def __init__(self, name, description, mode='gap', k=5, bet_type='539', lookback=30):
+        super().__init__(name, description, lookback)
+        self.mode = mode
+        self.k = k
+        self.bet_type = bet_type
+
+    def pick(self, state):
+        return rank_overdue(state.overdue(), self.k, self.mode)
+
+
+def create_strategies(names=None, lookback=30):
+    """依名稱建立策略（names 為 None 時建立全部），順序與 STRATEGY_NAMES 相同"""
+    factories = {
+        'ito_539_strategy_1': lambda: TopKStrategy(
+            'ito_539_strategy_1', '使用上期前5名高頻數字作為投注號碼', 5, '539', lookback),
+        'ito_539_strategy_2': lambda: ClearTopKStrategy(
+            'ito_539_strategy_2', '只在有明確唯一前5名時才投注', 5, '539', lookback),
+        'ito_539_strategy_3': lambda: OverdueStrategy(
+            'ito_539_strategy_3', '投注連續未開出期數最多的5個號碼', 'gap', 5, '539', lookback),
+        'ito_539_strategy_3_ratio': lambda: OverdueStrategy(
+            'ito_539_strategy_3_ratio', '投注未開出期數相對於平均間隔最長的5個號碼', 'ratio', 5, '539', lookback),
+        'lotto_39_strategy_1': lambda: TopKStrategy(
+            'lotto_39_strategy_1', '使用上期前2名高頻數字投注二合', 2, '二合', lookback),
+        'lotto_39_strategy_2': lambda: ComboStrategy(
+            'lotto_39_strategy_2', '出現次數最多的兩數組合投注二合', 2, '二合', lookback),
+        'lotto_39_strategy_3_3': lambda: ComboStrategy(
+            'lotto_39_strategy_3_3', '出現次數最多的三數組合投注三合', 3, '三合', lookback),
+        'lotto_39_strategy_3_4': lambda: ComboStrategy(
+            'lotto_39_strategy_3_4', '出現次數最多的四數組合投注四合', 4, '四合', lookback),
+    }
+    if names is None:
+        names = list(factories)
+    unknown = [name for name in names if name not in factories]
+    if unknown:
+        raise ValueError(f"未知的策略：{', '.join(unknown)}（可用：{', '.join(factories)}）")
+    return [factories[name]() for name in names]
+
+
+STRATEGY_NAMES = [strategy.name for strategy in create_strategies()]
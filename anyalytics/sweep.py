@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+參數掃描
+
+把 (策略, 統計期數, 號碼數 k, 投注方式) 的所有組合分散到多個行程計算，
+開獎資料只放一份在共享記憶體中，各行程直接映射使用。
+結果彙整成一張表（投資報酬率、中獎率、最大回落），輸出為 CSV。
+
+策略：
+- top_k：過去 N 期出現次數最多的 k 個號碼（今彩539 Strategy 1、39樂合彩 Strategy 1）
+- clear_top_k：同上，但前 k 名不唯一時跳過（今彩539 Strategy 2）
+- combo：過去 N 期出現次數最多的 k 數組合（39樂合彩 Strategy 2 / 3，k=2~4）
+
+所有策略都只使用投注期之前的開獎（第 t 期使用 [t-N, t) 的統計，前 N 期不投注），
+視窗定義記錄在 alignment 欄位，只有相同視窗定義的列才會放在一起排名。
+視窗內出現的號碼不足 k 個時，包牌只以實際的號碼計算注數與獎金。
+
+combo 每個視窗選出的組合存在視窗快取（window_cache.py，預設為資料檔所在目錄的 .window_cache），
+之後每次執行都直接取用，每日更新後只計算新增的視窗。同一組 (策略, 期數, k) 的各投注方式
+交給同一個行程計算，combo 的視窗統計表只建立一次，不會有多個行程同時重算同一張表。
+
+用法：
+    python -m anyalytics.sweep --lookbacks 5-60 --k 2,3,4,5 --workers 8
+"""
+
+import argparse
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from . import output_path
+from .bitmask import draw_masks, popcount
+from .backtest import ALIGNMENTS
+from .draw_store import DrawStore, add_data_arguments, load_store
+from .games import BET_TYPES
+from .profiler import add_profile_argument, lap, start_profiling
+from .vectorized_backtest import VectorizedBacktest
+from .window_cache import open_cache
+from .window_engine import ComboWindow, slide_windows
+
+STRATEGIES = ('top_k', 'clear_top_k', 'combo')
+# 視窗定義（backtest.ALIGNMENTS 的鍵）：第 t 期只使用 [t-lookback, t) 的開獎
+ALIGNMENT = 'chronological'
+RESULT_FIELDS = ['strategy', 'alignment', 'lookback', 'k', 'bet_type', 'bets', 'total_cost', 'total_winnings',
+                 'net_gain', 'roi', 'hit_rate', 'max_drawdown']
+
+# 各工作行程共用的資料（由 _attach_store 初始化）
+_shared = {}
+
+
+def parse_int_list(text):
+    """解析 "5-60" 或 "10,20,30" 形式的整數列表"""
+    values = []
+    for part in text.split(','):
+        if '-' in part:
+            start, end = part.split('-')
+            values.extend(range(int(start), int(end) + 1))
+        else:
+            values.append(int(part))
+    return values
+
+
+def build_grid(strategies, lookbacks, ks, bet_types):
+    """列出所有有效的參數組合（k 不得少於每注號碼數，combo 只能選 2~4 個號碼）"""
+    grid = []
+    for strategy in strategies:
+        for lookback in lookbacks:
+            for k in ks:
+                for bet_type in bet_types:
+                    if k < BET_TYPES[bet_type].pick or (strategy == 'combo' and not 2 <= k <= 4):
+                        continue
+                    grid.append((strategy, lookback, k, bet_type))
+    return grid
+
+
+def combo_backtest(store, lookback, k=2, cache_dir=None):
+    """39樂合彩 Strategy 2 / 3：逐期以滑動視窗選出最常出現的 k 數組合，回傳 (投注組合, 開獎號碼遮罩) 陣列（從舊到新）
+
+    指定 cache_dir 時由視窗快取取得各視窗的組合（第 t 期的投注來自起點 t - lookback 的視窗）。
+    """
+    chronological = store.chronological()
+    if cache_dir is not None:
+        rows = open_cache(cache_dir).table(store, f'combo{k}', lookback)
+        bets = rows['combo'][:max(len(store) - lookback, 0)].astype(np.intp)
+        return bets, chronological.masks[lookback:]
+    draws = chronological.draws()
+    window = ComboWindow(k)
+    bets = []
+    for start in slide_windows(draws, window, lookback, len(draws) - lookback):
+        bets.append(window.most_frequent() or (0,) * k)
+    bets = np.array(bets, dtype=np.intp).reshape(-1, k)
+    return bets, chronological.masks[lookback:]
+
+
+def summarize(prize, cost):
+    """由逐期獎金與成本（從舊到新）計算彙總指標"""
+    placed = cost > 0
+    bets = int(placed.sum())
+    total_cost = int(cost.sum())
+    total_winnings = int(prize.sum())
+    cumulative = np.concatenate(([0], np.cumsum(prize - cost)))
+    drawdown = np.maximum.accumulate(cumulative) - cumulative
+    return {
+        'bets': bets,
+        'total_cost': total_cost,
+        'total_winnings': total_winnings,
+        'net_gain': total_winnings - total_cost,
+        'roi': round((total_winnings - total_cost) / total_cost * 100, 2) if total_cost > 0 else 0.0,
+        'hit_rate': round(int((prize[placed] > 0).sum()) / bets * 100, 2) if bets > 0 else 0.0,
+        'max_drawdown': int(drawdown.max()),
+    }
+
+
+def wheel_prize_cost(bet_type, k, bets, matches, placed):
+    """依每期實際的投注號碼數（不含補齊的 0）計算包牌的獎金與成本
+
+    視窗內出現的號碼不足 k 個時，只買得到 C(實際號碼數, pick) 注，獎金也依實際號碼數計算。
+    """
+    sizes = (bets > 0).sum(axis=1)
+    payouts = np.zeros((k + 1, k + 1), dtype=np.int64)
+    for size in range(k + 1):
+        payouts[size, :size + 1] = bet_type.payout_table(size)
+    tickets = np.array([bet_type.tickets(size) for size in range(k + 1)], dtype=np.int64)
+    prize = np.where(placed, payouts[sizes, matches], 0)
+    cost = np.where(placed, tickets[sizes] * bet_type.cost, 0)
+    return prize, cost
+
+
+def evaluate(store, backtest, strategy, lookback, k, bet_type_key, cache_dir=None):
+    """計算單一參數組合（從第 lookback 期起，每期只使用之前的 lookback 期）"""
+    bet_type = BET_TYPES[bet_type_key]
+    if strategy == 'combo':
+        bets, winning = combo_backtest(store, lookback, k, cache_dir)
+        # 未投注期的組合為 0，只有第 0 個位元，不會與開獎號碼重疊
+        matches = popcount(draw_masks(bets) & winning)
+        prize, cost = wheel_prize_cost(bet_type, k, bets, matches, bets[:, 0] > 0)
+    else:
+        result = backtest.run(lookback, k, bet_type.payout_table(k), bet_type.tickets(k) * bet_type.cost,
+                              clear_only=(strategy == 'clear_top_k'), exclude_target=True)
+        prize, cost = wheel_prize_cost(bet_type, k, result['bets'], result['matches'], result['placed'])
+        # 向量化回測的結果為最新到最舊，轉為從舊到新，並與 combo 一樣略過視窗不足 lookback 期的前幾期
+        prize, cost = prize[::-1][lookback:], cost[::-1][lookback:]
+
+    row = {'strategy': strategy, 'alignment': ALIGNMENT, 'lookback': lookback, 'k': k, 'bet_type': bet_type_key}
+    row.update(summarize(prize, cost))
+    return row
+
+
+def _attach_store(ordinals_name, numbers_name, total):
+    """工作行程初始化：映射共享記憶體中的開獎資料"""
+    ordinals_block = shared_memory.SharedMemory(name=ordinals_name)
+    numbers_block = shared_memory.SharedMemory(name=numbers_name)
+    ordinals = np.ndarray((total,), dtype=np.int32, buffer=ordinals_block.buf)
+    numbers = np.ndarray((total, 5), dtype=np.uint8, buffer=numbers_block.buf)
+    store = DrawStore(ordinals, numbers)
+    _shared.update(blocks=(ordinals_block, numbers_block), store=store, backtest=VectorizedBacktest(store))
+
+
+def _call_shared(task):
+    function, item = task
+    return function(_shared['store'], _shared['backtest'], item)
+
+
+def map_shared(store, function, items, workers=None):
+    """把 items 分散到行程池，回傳 [function(store, backtest, item)]（順序與 items 相同）
+
+    開獎資料只放一份在共享記憶體中，各行程映射後建立自己的 VectorizedBacktest；
+    function 必須是模組層級的函式（才能傳給其他行程）。
+    """
+    total = len(store)
+    ordinals_block = shared_memory.SharedMemory(create=True, size=max(store.ordinals.nbytes, 1))
+    numbers_block = shared_memory.SharedMemory(create=True, size=max(store.numbers.nbytes, 1))
+    try:
+        np.ndarray((total,), dtype=np.int32, buffer=ordinals_block.buf)[:] = store.ordinals
+        np.ndarray((total, 5), dtype=np.uint8, buffer=numbers_block.buf)[:] = store.numbers
+
+        workers = workers or os.cpu_count()
+        chunksize = max(1, len(items) // (workers * 4))
+        tasks = [(function, item) for item in items]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_store,
+                                 initargs=(ordinals_block.name, numbers_block.name, total)) as executor:
+            return list(executor.map(_call_shared, tasks, chunksize=chunksize))
+    finally:
+        ordinals_block.close()
+        ordinals_block.unlink()
+        numbers_block.close()
+        numbers_block.unlink()
+
+
+def evaluate_group(store, backtest, group):
+    """計算同一組 (策略, 期數, k) 的各投注方式"""
+    (strategy, lookback, k), bet_types, cache_dir = group
+    return [evaluate(store, backtest, strategy, lookback, k, bet_type, cache_dir) for bet_type in bet_types]
+
+
+def run_sweep(store, grid, workers=None, cache_dir=None):
+    """把參數組合依 (策略, 期數, k) 分組分散到行程池計算，回傳結果列表（順序與 grid 相同）"""
+    groups = {}
+    for strategy, lookback, k, bet_type in grid:
+        groups.setdefault((strategy, lookback, k), []).append(bet_type)
+    results = map_shared(store, evaluate_group, [(key, bet_types, cache_dir) for key, bet_types in groups.items()],
+                         workers)
+    rows = {}
+    for (key, bet_types), group_rows in zip(groups.items(), results):
+        rows.update(zip((key + (bet_type,) for bet_type in bet_types), group_rows))
+    return [rows[point] for point in grid]
+
+
+def write_results(rows, filename):
+    with open(filename, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='策略參數掃描')
+    add_data_arguments(parser)
+    parser.add_argument('--strategies', default=','.join(STRATEGIES), help='策略，以逗號分隔')
+    parser.add_argument('--lookbacks', default='5-60', help='統計期數，例如 5-60 或 10,20,30')
+    parser.add_argument('--k', default='2,3,4,5', help='選號數量，例如 2,3,4,5')
+    parser.add_argument('--bet-types', default=','.join(BET_TYPES), help='投注方式，以逗號分隔')
+    parser.add_argument('--workers', type=int, default=None, help='行程數（預設為 CPU 核心數）')
+    parser.add_argument('--output', default=output_path('sweep_results.csv'), help='結果輸出檔案')
+    parser.add_argument('--cache-dir', default=None,
+                        help='視窗快取目錄（預設為資料檔所在目錄的 .window_cache）')
+    parser.add_argument('--no-cache', action='store_true', help='不使用視窗快取，每次重新計算')
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    start_profiling(args.profile)
+
+    store = load_store(args)
+    lap('load')
+    grid = build_grid(args.strategies.split(','), parse_int_list(args.lookbacks),
+                      parse_int_list(args.k), args.bet_types.split(','))
+    print(f"載入了 {len(store)} 期彩票數據，共 {len(grid)} 組參數")
+
+    cache_dir = None
+    if not args.no_cache:
+        cache_dir = args.cache_dir or os.path.join(os.path.dirname(os.path.abspath(args.data)), '.window_cache')
+    rows = run_sweep(store, grid, args.workers, cache_dir)
+    lap('sweep')
+    write_results(rows, args.output)
+    lap('report write')
+    print(f"掃描結果已儲存至：{args.output}")
+
+    # 不同視窗定義的結果不可互相比較，各自排名
+    for alignment in sorted({row['alignment'] for row in rows}):
+        print(f"\n投資報酬率前10名（{ALIGNMENTS[alignment]}）：")
+        ranked = sorted((row for row in rows if row['alignment'] == alignment), key=lambda r: r['roi'], reverse=True)
+        for row in ranked[:10]:
+            print(f"  {row['strategy']:<12} 期數{row['lookback']:<4} k={row['k']} {row['bet_type']:<4} "
+                  f"投注{row['bets']}期 中獎率{row['hit_rate']:.2f}% 報酬率{row['roi']:.2f}% 最大回落{row['max_drawdown']:,}元")
+
+
+if __name__ == "__main__":
+    main()
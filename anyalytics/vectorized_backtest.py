@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+向量化回測
+
+一次計算整段歷史的所有期數，不再逐期以 Python 迴圈模擬：
+- 視窗次數：對 incidence 做累積和，任一視窗的次數只是兩列相減
+- 前 k 名：每列以 argpartition 取出，同次數時依視窗內首次出現的先後（與 Counter.most_common 相同）
+- 中獎數：投注號碼遮罩與開獎遮罩（DrawStore.masks）取交集後的 1 位元數
+
+視窗定義與 ito_539_strategy_1 等腳本相同：資料最新到最舊，
+第 i 期使用 [i-1, i-1+lookback) 這段期數的統計結果投注。
+exclude_target=True 時改為 [i+1, i+1+lookback)，只使用投注期之前的開獎（樣本外評估使用）。
+"""
+
+import numpy as np
+
+from .bitmask import draw_masks, popcount
+
+
+class VectorizedBacktest:
+    def __init__(self, store):
+        self.store = store
+        total = len(store)
+        rows = np.arange(total)
+
+        # prefix[i] = 前 i 期每個號碼的出現次數
+        self.prefix = np.zeros((total + 1, 39), dtype=np.int32)
+        np.cumsum(store.incidence, axis=0, out=self.prefix[1:])
+
+        # 從第 s 期往後第一次出現的期數與該期中的位置，作為同次數時的排序依據
+        occurrence = np.where(store.incidence, rows[:, None], total)
+        next_occurrence = np.minimum.accumulate(occurrence[::-1], axis=0)[::-1]
+        position = np.zeros((total + 1, 39), dtype=np.int64)
+        position[rows[:, None], store.numbers.astype(np.intp) - 1] = np.arange(5)
+        # 多一列作為空視窗（起點在資料尾端）使用
+        self.first_seen = np.zeros((total + 1, 39), dtype=np.int64)
+        self.first_seen[:total] = next_occurrence * 5 + position[next_occurrence, np.arange(39)]
+        self.first_seen[total] = total * 5
+
+    def layout(self, exclude_target=False):
+        """回傳 (投注期索引, 視窗起點)
+
+        預設第 i 期（i = 1 ~ N-1）使用 [i-1, i-1+lookback)；
+        exclude_target 時第 i 期（i = 0 ~ N-1）使用 [i+1, i+1+lookback)。
+        """
+        total = len(self.store)
+        if exclude_target:
+            targets = np.arange(total)
+            return targets, targets + 1
+        targets = np.arange(1, total)
+        return targets, targets - 1
+
+    def window_counts(self, lookback, exclude_target=False):
+        """每期投注所用視窗內各號碼的出現次數，形狀 (投注期數, 39)"""
+        _, starts = self.layout(exclude_target)
+        ends = np.minimum(starts + lookback, len(self.store))
+        return self.prefix[ends] - self.prefix[starts]
+
+    def top_k(self, counts, k, starts=None):
+        """每列次數最高的 k 個號碼（欄位索引 0~38），排序與 Counter.most_common(k) 相同"""
+        starts = np.arange(len(counts)) if starts is None else starts
+        keys = self.first_seen[starts] - counts.astype(np.int64) * (5 * len(self.store) + 5)
+        candidates = np.argpartition(keys, k - 1, axis=1)[:, :k]
+        order = np.take_along_axis(keys, candidates, axis=1).argsort(axis=1)
+        return np.take_along_axis(candidates, order, axis=1)
+
+    def run(self, lookback=30, k=5, prize_table=(0,), cost=50, clear_only=False, exclude_target=False):
+        """回測整段歷史，回傳逐期結果陣列（第 r 列為第 targets[r] 期，見 layout）
+
+        - targets：投注期在資料中的索引（最新到最舊）
+        - bets：(投注期數, k) 投注號碼，視窗內出現號碼不足 k 個時以 0 補齊
+        - placed：是否投注（clear_only 時只有前 k 名唯一才投注）
+        - kth_count：第 k 名的出現次數
+        - matches / prize / cost：中獎號碼數、獎金、成本（未投注期為 0）
+        prize_table[m] 為中 m 個號碼的獎金。
+        """
+        targets, starts = self.layout(exclude_target)
+        counts = self.window_counts(lookback, exclude_target)
+        top = self.top_k(counts, k, starts)
+        top_counts = np.take_along_axis(counts, top, axis=1)
+        bets = np.where(top_counts > 0, top + 1, 0).astype(np.uint8)
+
+        kth_count = top_counts[:, k - 1]
+        placed = np.ones(len(counts), dtype=bool)
+        if clear_only:
+            next_count = -np.partition(-counts, k, axis=1)[:, k] if k < 39 else np.zeros_like(kth_count)
+            placed = (kth_count > 0) & (kth_count > next_count)
+
+        # 未補滿的空位為 0，對應的第 0 個位元不會與開獎號碼重疊
+        matches = popcount(draw_masks(bets) & self.store.masks[targets])
+
+        prizes = np.zeros(max(len(prize_table), 6), dtype=np.int64)
+        prizes[:len(prize_table)] = prize_table
+        return {
+            'targets': targets,
+            'bets': bets,
+            'placed': placed,
+            'kth_count': kth_count,
+            'matches': np.where(placed, matches, 0),
+            'prize': np.where(placed, prizes[matches], 0),
+            'cost': np.where(placed, cost, 0),
+        }
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+滾動式樣本外評估（walk-forward）
+
+策略參數（統計期數、選號數量 k）若是看完整段歷史才挑出來的，報酬率一定偏高。
+這裡把歷史依時間切成多個 訓練 / 測試 區段：
+在每個訓練區段以向量化回測挑出報酬率最高的參數，再拿到緊接在後的測試區段計分，
+測試區段的成績才是參數「事先選定」時的表現。
+
+- 只使用投注期之前的開獎（VectorizedBacktest 的 exclude_target），不含投注期本身
+- rolling：訓練區段長度固定往後滑動；--expanding：訓練區段從頭開始逐漸變長
+- 每組參數只回測整段歷史一次，再依各區段切出獎金 / 成本；參數分散到多個行程計算
+  （與 sweep.py 共用共享記憶體的行程池）
+- 訓練區段內完全沒有投注的參數不參與挑選
+
+用法：
+    python -m anyalytics.walk_forward --train 300 --test 100 --lookbacks 5-60 --k 2,3,4,5 --bet-type 二合
+"""
+
+import argparse
+import csv
+
+import numpy as np
+
+from . import output_path
+from .draw_store import add_data_arguments, load_store
+from .games import BET_TYPES
+from .profiler import add_profile_argument, lap, start_profiling
+from .report_writer import ReportWriter
+from .sweep import map_shared, parse_int_list, wheel_prize_cost
+
+STRATEGIES = ('top_k', 'clear_top_k')
+RESULT_FIELDS = ['fold', 'train_start', 'train_end', 'test_start', 'test_end', 'strategy', 'lookback', 'k',
+                 'train_roi', 'test_bets', 'test_cost', 'test_winnings', 'test_net_gain', 'test_roi']
+
+
+def build_folds(total, warmup, train, test, expanding=False):
+    """切分訓練 / 測試區段，回傳 [(訓練起點, 訓練終點, 測試終點)]，位置為時間序（第 0 期最早）
+
+    第 warmup 期之前的視窗不完整，不納入任何區段。
+    """
+    folds = []
+    train_end = warmup + train
+    while train_end + test <= total:
+        train_start = warmup if expanding else train_end - train
+        folds.append((train_start, train_end, train_end + test))
+        train_end += test
+    return folds
+
+
+def chronological_results(backtest, bet_type, strategy, lookback, k):
+    """以只使用投注期之前開獎的視窗回測整段歷史，回傳依時間序排列的 (獎金, 成本)"""
+    result = backtest.run(lookback, k, bet_type.payout_table(k), bet_type.tickets(k) * bet_type.cost,
+                          clear_only=(strategy == 'clear_top_k'), exclude_target=True)
+    prize, cost = wheel_prize_cost(bet_type, k, result['bets'], result['matches'], result['placed'])
+    # exclude_target 時第 r 列為第 r 期（最新到最舊），反轉後第 t 列即時間序第 t 期
+    return prize[::-1], cost[::-1]
+
+
+def roi(prize, cost):
+    """報酬率（%），沒有投注時為 NaN"""
+    total_cost = int(cost.sum())
+    return (int(prize.sum()) - total_cost) / total_cost * 100 if total_cost > 0 else float('nan')
+
+
+def fold_results(store, backtest, point):
+    """回測一組參數一次，回傳各區段的 (訓練報酬率, 測試投注期數, 測試成本, 測試獎金)"""
+    (strategy, lookback, k), folds, bet_type_key = point
+    prize, cost = chronological_results(backtest, BET_TYPES[bet_type_key], strategy, lookback, k)
+    results = []
+    for train_start, train_end, test_end in folds:
+        test_prize, test_cost = prize[train_end:test_end], cost[train_end:test_end]
+        results.append((roi(prize[train_start:train_end], cost[train_start:train_end]),
+                        int((test_cost > 0).sum()), int(test_cost.sum()), int(test_prize.sum())))
+    return results
+
+
+def select_fold(index, fold, grid, results):
+    """在訓練區段挑出報酬率最高的參數（並列時取 grid 中較前者），回傳該區段的結果列；都沒有投注時回傳 None"""
+    train_start, train_end, test_end = fold
+    best = None
+    for point, point_results in zip(grid, results):
+        train_roi, test_bets, test_cost, test_winnings = point_results[index]
+        if np.isnan(train_roi):
+            continue
+        if best is None or train_roi > best[0][0]:
+            best = (point_results[index], point)
+    if best is None:
+        return None
+
+    (train_roi, test_bets, test_cost, test_winnings), (strategy, lookback, k) = best
+    return {
+        'fold': index + 1,
+        'train_start': train_start,
+        'train_end': train_end,
+        'test_start': train_end,
+        'test_end': test_end,
+        'strategy': strategy,
+        'lookback': lookback,
+        'k': k,
+        'train_roi': round(train_roi, 2),
+        'test_bets': test_bets,
+        'test_cost': test_cost,
+        'test_winnings': test_winnings,
+        'test_net_gain': test_winnings - test_cost,
+        'test_roi': round((test_winnings - test_cost) / test_cost * 100, 2) if test_cost > 0 else 0.0,
+    }
+
+
+def run_walk_forward(store, strategies, lookbacks, ks, bet_type_key, train, test, expanding=False, workers=None):
+    """每組參數回測一次（分散到行程池），再逐區段挑選參數，回傳逐區段結果
+
+    訓練區段內所有參數都沒有投注的區段不列入結果。
+    """
+    pick = BET_TYPES[bet_type_key].pick
+    grid = [(strategy, lookback, k) for strategy in strategies for lookback in lookbacks for k in ks if k >= pick]
+    folds = build_folds(len(store), max(lookbacks), train, test, expanding)
+    if not folds:
+        return []
+    results = map_shared(store, fold_results, [(point, folds, bet_type_key) for point in grid], workers)
+    rows = (select_fold(index, fold, grid, results) for index, fold in enumerate(folds))
+    return [row for row in rows if row is not None]
+
+
+def write_report(filename, store, rows, bet_type_key, expanding):
+    """寫出逐區段報告，回傳測試區段合計 (成本, 獎金)"""
+    chronological = store.chronological()
+    total_cost = sum(row['test_cost'] for row in rows)
+    total_winnings = sum(row['test_winnings'] for row in rows)
+
+    with ReportWriter(filename) as writer:
+        for row in rows:
+            writer.write_record([
+                f"第{row['fold']}段",
+                f"  訓練區段：{chronological.date(row['train_start'])} ~ {chronological.date(row['train_end'] - 1)}"
+                f"（{row['train_end'] - row['train_start']}期）",
+                f"  測試區段：{chronological.date(row['test_start'])} ~ {chronological.date(row['test_end'] - 1)}"
+                f"（{row['test_end'] - row['test_start']}期）",
+                f"  選出參數：{row['strategy']}，統計{row['lookback']}期，k={row['k']}",
+                f"  訓練報酬率：{row['train_roi']:.2f}%",
+                f"  測試投注：{row['test_bets']}期，成本{row['test_cost']:,}元，獎金{row['test_winnings']:,}元",
+                f"  測試報酬率：{row['test_roi']:.2f}%",
+                ""
+            ])
+
+        report_lines = []
+        report_lines.append(f"滾動式樣本外評估報告（{BET_TYPES[bet_type_key].name}）")
+        report_lines.append("=" * 60)
+        report_lines.append(f"訓練區段：{'從頭開始逐漸變長' if expanding else '固定長度往後滑動'}")
+        report_lines.append(f"區段數：{len(rows)}")
+        report_lines.append("")
+        report_lines.append("測試區段合計：")
+        report_lines.append(f"  總投注成本：{total_cost:,}元")
+        report_lines.append(f"  總獲得獎金：{total_winnings:,}元")
+        report_lines.append(f"  總淨損益：{total_winnings - total_cost:,}元")
+        if total_cost > 0:
+            report_lines.append(f"  投資報酬率：{(total_winnings - total_cost) / total_cost * 100:.2f}%")
+        if rows:
+            test_rois = np.array([row['test_roi'] for row in rows])
+            report_lines.append(f"  獲利區段：{int((test_rois > 0).sum())} / {len(rows)}")
+        report_lines.append("")
+        report_lines.append("各區段結果：")
+        report_lines.append("-" * 60)
+
+        writer.finish(report_lines)
+
+    return total_cost, total_winnings
+
+
+def write_results(rows, filename):
+    with open(filename, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='滾動式樣本外評估')
+    add_data_arguments(parser)
+    parser.add_argument('--strategies', default=','.join(STRATEGIES), help='策略，以逗號分隔')
+    parser.add_argument('--lookbacks', default='5-60', help='統計期數候選，例如 5-60 或 10,20,30')
+    parser.add_argument('--k', default='2,3,4,5', help='選號數量候選，例如 2,3,4,5')
+    parser.add_argument('--bet-type', default='二合', choices=list(BET_TYPES), help='投注方式')
+    parser.add_argument('--train', type=int, default=300, help='訓練區段期數')
+    parser.add_argument('--test', type=int, default=100, help='測試區段期數')
+    parser.add_argument('--expanding', action='store_true', help='訓練區段從頭開始逐漸變長')
+    parser.add_argument('--workers', type=int, default=None, help='行程數（預設為 CPU 核心數）')
+    parser.add_argument('--output', default=output_path('walk_forward'), help='輸出檔名（不含副檔名），產生 .txt 與 .csv')
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    start_profiling(args.profile)
+
+    store = load_store(args)
+    lap('load')
+    rows = run_walk_forward(store, args.strategies.split(','), parse_int_list(args.lookbacks),
+                            parse_int_list(args.k), args.bet_type, args.train, args.test,
+                            args.expanding, args.workers)
+    lap('walk forward')
+    if not rows:
+        print(f"資料不足：{len(store)} 期無法切出訓練 {args.train} 期 + 測試 {args.test} 期的區段")
+        return
+
+    total_cost, total_winnings = write_report(args.output + '.txt', store, rows, args.bet_type, args.expanding)
+    write_results(rows, args.output + '.csv')
+    lap('report write')
+
+    print(f"載入了 {len(store)} 期彩票數據，共 {len(rows)} 個區段")
+    for row in rows:
+        print(f"  第{row['fold']}段 {row['strategy']:<12} 期數{row['lookback']:<4} k={row['k']} "
+              f"訓練報酬率{row['train_roi']:>8.2f}% 測試報酬率{row['test_roi']:>8.2f}%")
+    if total_cost > 0:
+        print(f"測試區段合計報酬率：{(total_winnings - total_cost) / total_cost * 100:.2f}%")
+    print(f"報告已儲存至：{args.output}.txt、{args.output}.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+視窗統計快取
+
+開獎歷史除了最新的一端之外不會改變，同一個視窗（時間序 [start, start + length)）的統計
+不論第幾次執行都相同。這裡把每個視窗的統計存起來重複使用（目前只有 sweep.py 的 combo 策略使用；
+逐期回測的腳本由 backtest.walk 以滑動視窗更新，號碼視窗的次數由 vectorized_backtest 以累積和取得）：
+- 鍵：(資料前綴雜湊, 視窗起點, 視窗長度, 統計種類)
+- 記憶體：最近使用的表格（LRU），同一個行程內重複查詢（同一組 (期數, k) 的各投注方式）不必再讀檔
+- 磁碟：每個 (種類, 長度) 一個檔案，第 start 列為起點 start 的視窗；
+  檔頭記錄建立時涵蓋的期數 T 與前 T 期內容的雜湊，只要目前資料的前 T 期雜湊相同，
+  舊的視窗全部有效，只計算每日新增的視窗再附加；雜湊不同（歷史被修改）時整張表重算。
+
+統計種類：
+- combo2 / combo3 / combo4：出現最多的 k 數組合（並列時取視窗內最先出現者）與次數
+  （號碼的視窗次數由 vectorized_backtest 以累積和兩列相減取得，不需快取）
+
+只收錄完整的視窗（start = 0 ~ 期數 - length）。
+"""
+
+import hashlib
+import os
+import struct
+from collections import OrderedDict
+
+import numpy as np
+
+from .window_engine import ComboWindow, slide_windows
+
+CACHE_MAGIC = b'ITOWIN01'
+# 檔頭：magic、視窗長度、涵蓋期數、前綴 sha256，共 56 bytes
+CACHE_HEADER = struct.Struct('<8sqq32s')
+MEMORY_TABLES = 64
+
+
+def prefix_digest(store, count):
+    """時間序前 count 期（日期與號碼）的 sha256"""
+    chronological = store.chronological()
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(chronological.ordinals[:count]).tobytes())
+    digest.update(np.ascontiguousarray(chronological.numbers[:count]).tobytes())
+    return digest.digest()
+
+
+def row_dtype(kind, length):
+    """每個視窗一列的格式；次數不會超過視窗長度"""
+    count = 'u1' if length <= 255 else '<u2'
+    if kind in ('combo2', 'combo3', 'combo4'):
+        return np.dtype([('combo', 'u1', (int(kind[-1]),)), ('count', count)])
+    raise ValueError(f"未知的統計種類：{kind}")
+
+
+def compute_rows(store, kind, length, first, last):
+    """計算起點 first ~ last - 1 的視窗統計"""
+    rows = np.zeros(max(last - first, 0), dtype=row_dtype(kind, length))
+    if last <= first:
+        return rows
+    window = ComboWindow(int(kind[-1]))
+    draws = store.chronological().numbers[first:last - 1 + length].tolist()
+    for start in slide_windows(draws, window, length, last - first):
+        combo = window.most_frequent()
+        rows[start] = (combo, window.count(combo))
+    return rows
+
+
+class WindowCache:
+    def __init__(self, directory, capacity=MEMORY_TABLES):
+        self.directory = directory
+        self.capacity = capacity
+        self.tables = OrderedDict()  # (種類, 長度, 資料雜湊) -> 各視窗統計
+        self.hits = 0  # 直接取用的視窗數
+        self.computed = 0  # 重新計算的視窗數
+
+    def table(self, store, kind, length):
+        """所有完整視窗的統計（第 start 列為時間序 [start, start + length) 的視窗）"""
+        total = len(store)
+        digest = prefix_digest(store, total)
+        key = (kind, length, digest)
+        rows = self.tables.get(key)
+        if rows is not None:
+            self.tables.move_to_end(key)
+            self.hits += len(rows)
+            return rows
+
+        windows = max(total - length + 1, 0)
+        filename = os.path.join(self.directory, f'{kind}_{length}.bin')
+        cached = self._read(filename, store, kind, length)
+        if cached is not None and len(cached) <= windows:
+            rows = np.concatenate([cached, compute_rows(store, kind, length, len(cached), windows)])
+            self.hits += len(cached)
+            self.computed += windows - len(cached)
+        else:
+            rows = compute_rows(store, kind, length, 0, windows)
+            self.computed += windows
+        if cached is None or len(cached) != windows:
+            self._write(filename, length, total, digest, rows)
+
+        self.tables[key] = rows
+        if len(self.tables) > self.capacity:
+            self.tables.popitem(last=False)
+        return rows
+
+    def _read(self, filename, store, kind, length):
+        """讀取磁碟上的表格；檔案不存在、格式不符或前綴雜湊不同時回傳 None"""
+        dtype = row_dtype(kind, length)
+        try:
+            with open(filename, 'rb') as f:
+                magic, cached_length, covered, digest = CACHE_HEADER.unpack(f.read(CACHE_HEADER.size))
+                if magic != CACHE_MAGIC or cached_length != length or covered > len(store):
+                    return None
+                windows = max(covered - length + 1, 0)
+                if os.path.getsize(filename) != CACHE_HEADER.size + windows * dtype.itemsize:
+                    return None
+                if digest != prefix_digest(store, covered):
+                    return None
+                return np.fromfile(f, dtype=dtype, count=windows)
+        except (OSError, struct.error):
+            return None
+
+    def _write(self, filename, length, covered, digest, rows):
+        """寫入整張表格（先寫暫存檔再取代，多個行程同時寫入也不會讀到寫一半的檔案）"""
+        temp_file = f'{filename}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_file, 'wb') as f:
+                f.write(CACHE_HEADER.pack(CACHE_MAGIC, length, covered, digest))
+                f.write(rows.tobytes())
+            os.replace(temp_file, filename)
+        except OSError as e:
+            print(f"無法寫入視窗快取 {filename}: {e}")
+
+
+_caches = {}
+
+
+def open_cache(directory):
+    """同一個行程內共用同一個目錄的快取（記憶體 LRU 才能跨呼叫保留）"""
+    cache = _caches.get(directory)
+    if cache is None:
+        cache = _caches[directory] = WindowCache(directory)
+    return cache
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+滑動視窗頻率引擎
+
+各策略每期都要統計「最近 N 期」的號碼頻率。與其每期重新建立 Counter，
+這裡維護一個固定槽位的計數陣列：新的一期加入、最舊的一期移出，
+每個號碼只需 +1 / -1，並同步維持依次數排序的順序陣列。
+
+同次數時的先後順序與 Counter.most_common 一致（視窗內先出現者在前），
+因此改用本引擎後各策略的投注號碼與原本完全相同。
+"""
+
+import heapq
+from collections import deque
+from functools import lru_cache
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+# BINOMIAL[n][r] = C(n, r)，計算組合排名時查表
+BINOMIAL = [[comb(n, r) for r in range(6)] for n in range(40)]
+
+
+def pair_rank(a, b):
+    """兩數組合 (a < b) 的排名，使用組合數系統：C(a-1, 1) + C(b-1, 2)，範圍 0~740"""
+    return (a - 1) + (b - 1) * (b - 2) // 2
+
+
+def combination_rank(combo):
+    """k 數組合（由小到大）的排名，使用組合數系統：C(c1-1, 1) + C(c2-1, 2) + ... + C(ck-1, k)
+
+    k 個號碼的組合排名恰好是 0 ~ C(39, k)-1，可直接作為陣列索引。
+    """
+    return sum(BINOMIAL[number - 1][i] for i, number in enumerate(combo, 1))
+
+
+@lru_cache(maxsize=None)
+def combination_table(k):
+    """排名 -> k 數組合的對照表"""
+    return sorted(combinations(range(1, 40), k), key=combination_rank)
+
+
+PAIRS = combination_table(2)
+
+
+def combination_ranks(numbers, k):
+    """每期開獎號碼（(N, 5) 陣列）所有 k 數組合的排名，(N, C(5, k)) 陣列
+
+    每一列的順序與 combinations(sorted(該期號碼), k) 相同，等同逐期呼叫 combination_rank，
+    但整段歷史只需幾次陣列運算。
+    """
+    ordered = np.sort(np.asarray(numbers, dtype=np.intp).reshape(-1, 5), axis=1) - 1
+    binomial = np.array(BINOMIAL, dtype=np.int64)
+    columns = list(combinations(range(5), k))
+    ranks = np.zeros((len(ordered), len(columns)), dtype=np.int64)
+    for j, column in enumerate(columns):
+        for i, c in enumerate(column, 1):
+            ranks[:, j] += binomial[ordered[:, c], i]
+    return ranks
+
+
+class WindowCounter:
+    """固定槽位的滑動視窗計數器
+
+    - counts[s]：槽位 s 在視窗內的出現次數
+    - order：依次數由高到低排列的槽位，pos[s] 為槽位 s 在 order 中的位置
+    - at_least[c]：次數 >= c 的槽位數，也就是 order 中次數為 c 的區段終點
+
+    次數 +1 時把槽位與同次數區段的第一個交換，-1 時與最後一個交換，
+    因此每次更新都是 O(1)，不需要重新排序。
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.counts = [0] * size
+        self.order = list(range(size))
+        self.pos = list(range(size))
+        self.at_least = [size, 0, 0]
+        self.occurrences = [None] * size  # 槽位在視窗內每次出現的 (期序, 位置)
+        self.window = deque()
+        self.seq = 0
+
+    def __len__(self):
+        """視窗內的期數"""
+        return len(self.window)
+
+    def _swap(self, slot, target):
+        other = self.order[target]
+        current = self.pos[slot]
+        self.order[current], self.order[target] = other, slot
+        self.pos[other], self.pos[slot] = current, target
+
+    def _increment(self, slot):
+        count = self.counts[slot]
+        if count + 2 >= len(self.at_least):
+            self.at_least.append(0)
+        self._swap(slot, self.at_least[count + 1])
+        self.at_least[count + 1] += 1
+        self.counts[slot] = count + 1
+
+    def _decrement(self, slot):
+        count = self.counts[slot]
+        self._swap(slot, self.at_least[count] - 1)
+        self.at_least[count] -= 1
+        self.counts[slot] = count - 1
+
+    def push(self, slots):
+        """加入最新的一期（slots 為該期的槽位，依原本的順序）"""
+        for position, slot in enumerate(slots):
+            self._increment(slot)
+            if self.occurrences[slot] is None:
+                self.occurrences[slot] = deque()
+            self.occurrences[slot].append((self.seq, position))
+        self.window.append(slots)
+        self.seq += 1
+
+    # 子類別的 push 接受號碼或組合；已換算成槽位時（見 combination_ranks）直接以 push_slots 加入
+    push_slots = push
+
+    def pop(self):
+        """移出視窗內最早加入的一期"""
+        slots = self.window.popleft()
+        for slot in slots:
+            self._decrement(slot)
+            self.occurrences[slot].popleft()
+        return slots
+
+    def first_seen(self, slot):
+        """槽位在視窗內第一次出現的 (期序, 位置)，作為同次數時的排序依據"""
+        return self.occurrences[slot][0]
+
+    def last_seen(self, slot):
+        """槽位在視窗內最後一次出現的 (-期序, 位置)，視窗由舊到新加入時等同於由新到舊的 first_seen"""
+        seq, position = self.occurrences[slot][-1]
+        return -seq, position
+
+    def count(self, slot):
+        return self.counts[slot]
+
+    def distinct(self):
+        """視窗內出現過的槽位數"""
+        return self.at_least[1]
+
+    def kth_count(self, k):
+        """第 k 名的出現次數"""
+        return self.counts[self.order[k - 1]]
+
+    def top_k(self, k, newest_first=False):
+        """回傳出現次數最高的 k 個槽位，排序與 Counter.most_common(k) 相同
+
+        newest_first 為 True 時，同次數以視窗內最後出現者優先，
+        等同於把同一段期數由新到舊加入後的 Counter.most_common(k)。
+        """
+        k = min(k, self.distinct())
+        if k <= 0:
+            return []
+
+        seen = self.last_seen if newest_first else self.first_seen
+        boundary = self.kth_count(k)
+        above = self.at_least[boundary + 1]  # 次數高於第 k 名的槽位一定入選
+        tied = self.order[above:self.at_least[boundary]]
+
+        chosen = self.order[:above]
+        chosen += heapq.nsmallest(k - above, tied, key=seen)
+        chosen.sort(key=lambda slot: (-self.counts[slot], seen(slot)))
+        return chosen
+
+    def tied(self, k):
+        """與第 k 名次數相同的槽位數（包含第 k 名本身）"""
+        count = self.kth_count(k)
+        return self.at_least[count] - self.at_least[count + 1]
+
+    def is_clear_top_k(self, k):
+        """前 k 名是否唯一（第 k 名的次數嚴格高於第 k+1 名）"""
+        if self.distinct() < k:
+            return False
+        if k >= self.size:
+            return True
+        return self.counts[self.order[k]] < self.kth_count(k)
+
+
+class NumberWindow(WindowCounter):
+    """1~39 號碼的滑動視窗，槽位 s 對應號碼 s+1"""
+
+    def __init__(self):
+        super().__init__(39)
+
+    def push(self, numbers):
+        super().push([number - 1 for number in numbers])
+
+    def count(self, number):
+        return self.counts[number - 1]
+
+    def top_k(self, k, newest_first=False):
+        return [slot + 1 for slot in super().top_k(k, newest_first)]
+
+
+class ComboWindow(WindowCounter):
+    """k 數組合（k = 2~4）的滑動視窗，槽位為組合排名
+
+    每期 5 個號碼產生 C(5, k) 組組合（二合、三合 10 組，四合 5 組），
+    加入或移出一期只需更新這幾個計數，不需要每期重新建立以 tuple 為鍵的 Counter；
+    四合共 82,251 組也只是一個固定長度的計數陣列。
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self.combos = combination_table(k)
+        super().__init__(len(self.combos))
+
+    def push(self, numbers):
+        super().push([combination_rank(combo) for combo in combinations(sorted(numbers), self.k)])
+
+    def count(self, combo):
+        return self.counts[combination_rank(sorted(combo))]
+
+    def top_k(self, k, newest_first=False):
+        return [self.combos[slot] for slot in super().top_k(k, newest_first)]
+
+    def most_frequent(self, newest_first=False):
+        """出現次數最多的組合，並列時取視窗內最先出現者"""
+        top = self.top_k(1, newest_first)
+        return top[0] if top else None
+
+
+class PairWindow(ComboWindow):
+    """741 組兩數組合的滑動視窗"""
+
+    def __init__(self):
+        super().__init__(2)
+
+    def push(self, numbers):
+        WindowCounter.push(self, [pair_rank(a, b) for a, b in combinations(sorted(numbers), 2)])
+
+
+def slide_windows(draws, window, lookback=30, stop=None):
+    """依序把視窗移到 [start, start + lookback)（超出資料尾端時截短）
+
+    draws 為每期要加入視窗的內容（號碼或槽位），每移動一次 yield 一次 start，
+    呼叫端在迴圈內直接查詢 window 即可。
+    """
+    total = len(draws)
+    stop = total if stop is None else stop
+    end = 0
+    for start in range(stop):
+        while end < min(start + lookback, total):
+            window.push(draws[end])
+            end += 1
+        while len(window) > end - start:
+            window.pop()
+        yield start
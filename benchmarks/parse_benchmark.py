@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+開獎頁面解析效能比較
+
+以 benchmarks/pages/ 下保存的範例頁面（新格式「開獎日期:2025/10/15(三)」與舊格式「2025/09/29」）
+比較 lxml 表格解析與 BeautifulSoup + 正規表示式全文解析的速度，並確認兩者結果相同；
+parse 欄為爬蟲實際使用的 parse_lottery_data。
+
+範例頁面依爬蟲支援的兩種格式重建；可用 --fetch 從網站抓取最新頁面取代：
+    python benchmarks/parse_benchmark.py --fetch 1 2
+"""
+
+import argparse
+import glob
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper import LTO539Scraper
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages')
+
+
+def fetch_pages(scraper, pages):
+    """從網站抓取頁面存成範例"""
+    for page, html_content in zip(pages, scraper.fetch_pages(pages)):
+        if not html_content:
+            print(f"Failed to fetch page {page}")
+            continue
+        filename = os.path.join(PAGES_DIR, f'list539_page{page}.html')
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        print(f"Saved {filename}")
+
+
+def benchmark(scraper, filename, repeat):
+    with open(filename, 'r', encoding='utf-8') as f:
+        html_content = f.read()
+
+    table_records = scraper.parse_lottery_table(html_content)
+    text_records = scraper.parse_lottery_text(html_content)
+    if table_records != text_records:
+        print(f"  警告：lxml 與正規表示式解析結果不同（{len(table_records)} / {len(text_records)} 筆）")
+
+    table_time = min(timeit.repeat(lambda: scraper.parse_lottery_table(html_content), number=1, repeat=repeat))
+    text_time = min(timeit.repeat(lambda: scraper.parse_lottery_text(html_content), number=1, repeat=repeat))
+    # parse_lottery_data 是爬蟲實際呼叫的入口：正常頁面只用 lxml 加上日期計數
+    data_time = min(timeit.repeat(lambda: scraper.parse_lottery_data(html_content), number=1, repeat=repeat))
+    return len(table_records), table_time, text_time, data_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description='開獎頁面解析效能比較')
+    parser.add_argument('--fetch', type=int, nargs='*', help='先從網站抓取指定頁碼存成範例頁面')
+    parser.add_argument('--repeat', type=int, default=20, help='每種解析方式重複次數（取最快）')
+    args = parser.parse_args()
+
+    scraper = LTO539Scraper()
+    if args.fetch:
+        fetch_pages(scraper, args.fetch)
+
+    print(f"{'頁面':<32} {'筆數':>6} {'lxml(ms)':>10} {'regex(ms)':>10} {'倍數':>6} {'parse(ms)':>10}")
+    for filename in sorted(glob.glob(os.path.join(PAGES_DIR, '*.html'))):
+        records, table_time, text_time, data_time = benchmark(scraper, filename, args.repeat)
+        print(f"{os.path.basename(filename):<32} {records:>6} {table_time * 1000:>10.2f} "
+              f"{text_time * 1000:>10.2f} {text_time / table_time:>6.1f}x {data_time * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
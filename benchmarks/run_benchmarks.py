@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬蟲解析、資料載入與各策略回測的效能基準
+
+以固定亂數種子產生 1k / 10k / 100k 期的模擬開獎歷史與對應的開獎頁面（每頁 100 期，與網站相同），
+分別計時：
+- parse：解析所有頁面（scraper.parse_lottery_data）
+- load_json / load_cache：載入 lottery_data.json（不使用快取 / 使用二進位快取）
+- simulate:<策略>：各策略的模擬函式（含向量化版本與 backtest.py 一次跑完全部策略）
+- report:<策略>：以模擬結果產生文字報告與 CSV
+
+每個項目重複 --repeat 次取最快的一次，結果寫成 JSON；
+以 --compare 指定先前的結果檔時，比 --threshold 倍還慢的項目列為退步，並以結束碼 1 結束。
+
+用法：
+    python benchmarks/run_benchmarks.py --output baseline.json
+    python benchmarks/run_benchmarks.py --sizes 1000,10000 --compare baseline.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from scraper import LTO539Scraper
+from anyalytics.draw_store import DrawStore
+from anyalytics.backtest import iter_strategy, iter_vectorized, run_backtest
+from anyalytics.strategies import create_strategies
+from anyalytics.result_table import ResultTable
+from anyalytics.ito_539_strategy_1 import write_winnings_report
+from anyalytics.ito_539_strategy_2 import write_winnings_report_best
+from anyalytics.ito_539_strategy_3 import write_overdue_report
+from anyalytics.lotto_39_strategy_1 import write_39_winnings_report
+from anyalytics.lotto_39_strategy_2 import Lotto39Strategy2Analyzer
+from anyalytics.lotto_39_strategy_3 import write_combo_report
+
+DEFAULT_SIZES = '1000,10000,100000'
+ROWS_PER_PAGE = 100
+LATEST_DATE = date(2026, 1, 1)
+
+
+def synthetic_records(count, seed=539):
+    """產生 count 期模擬開獎記錄（最新到最舊，每天一期）"""
+    rng = random.Random(seed)
+    records = []
+    for offset in range(count):
+        draw_date = LATEST_DATE - timedelta(days=offset)
+        records.append({
+            'date': draw_date.strftime('%Y/%m/%d'),
+            'numbers': sorted(rng.sample(range(1, 40), 5)),
+            'timestamp': datetime(draw_date.year, draw_date.month, draw_date.day).isoformat()
+        })
+    return records
+
+
+def synthetic_page(records):
+    """產生與網站相同格式（新格式日期欄位）的開獎頁面"""
+    weekdays = '一二三四五六日'
+    rows = []
+    for record in records:
+        draw_date = datetime.strptime(record['date'], '%Y/%m/%d')
+        numbers = ',&nbsp;'.join(f'{number:02d}' for number in record['numbers'])
+        rows.append(f'<tr>\n<td class="date">\n開獎日期:{record["date"]}({weekdays[draw_date.weekday()]})\n</td>\n\n'
+                    f'<td class="num">\n{numbers}\n</td>\n</tr>')
+    return ('<html><head><meta charset="utf-8"><title>今彩539</title></head><body><table class="auto-style1">\n'
+            '<tr><td>開獎日期</td><td>號碼</td></tr>\n' + '\n'.join(rows) + '\n</table></body></html>\n')
+
+
+def write_fixtures(directory, records):
+    """寫出 lottery_data.json 與開獎頁面，回傳 (資料檔, 頁面檔列表)"""
+    data_file = os.path.join(directory, 'lottery_data.json')
+    with open(data_file, 'w', encoding='utf-8') as f:
+        json.dump({'last_updated': LATEST_DATE.isoformat(), 'total_records': len(records), 'data': records},
+                  f, ensure_ascii=False, indent=2)
+
+    pages = []
+    for page, start in enumerate(range(0, len(records), ROWS_PER_PAGE), 1):
+        filename = os.path.join(directory, f'list539_page{page}.html')
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(synthetic_page(records[start:start + ROWS_PER_PAGE]))
+        pages.append(filename)
+    return data_file, pages
+
+
+def best_time(function, repeat):
+    """重複執行 repeat 次，回傳 (最快秒數, 最後一次的回傳值)"""
+    best = None
+    value = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, value
+
+
+def write_lotto_39_strategy_2(directory, results):
+    # 分析器邊累計統計邊串流寫入報告，只用到驅動程式的結果，不需要 store
+    analyzer = Lotto39Strategy2Analyzer(None, os.path.join(directory, 'lotto_39_strategy_2.txt'),
+                                        os.path.join(directory, 'lotto_39_strategy_2.csv'))
+    analyzer.write_report(results)
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer.write_result_table()
+
+
+def write_with_table(report, filename, results, *args):
+    # 驅動程式的結果由舊到新，與各腳本相同以 reverse=True 寫出
+    table = ResultTable()
+    report(filename, table.collect(results), *args, reverse=True)
+    table.write(filename[:-4] + '.csv', reverse=True)
+
+
+def strategy_cases():
+    """(名稱, 模擬函式(store) -> 結果, 報告函式(目錄, 結果) 或 None)"""
+    def simulate(name, driver=iter_strategy):
+        return lambda store: list(driver(store, create_strategies([name])[0]))
+
+    def report(function, name, *args):
+        return lambda directory, results: write_with_table(function, os.path.join(directory, name + '.txt'),
+                                                           results, *args)
+
+    return [
+        ('ito_539_strategy_1', simulate('ito_539_strategy_1'),
+         report(write_winnings_report, 'ito_539_strategy_1')),
+        ('ito_539_strategy_1_vectorized', simulate('ito_539_strategy_1', iter_vectorized), None),
+        ('ito_539_strategy_2', simulate('ito_539_strategy_2'),
+         report(write_winnings_report_best, 'ito_539_strategy_2')),
+        ('ito_539_strategy_2_vectorized', simulate('ito_539_strategy_2', iter_vectorized), None),
+        ('ito_539_strategy_3', simulate('ito_539_strategy_3'),
+         report(write_overdue_report, 'ito_539_strategy_3', 'gap')),
+        ('ito_539_strategy_3_ratio', simulate('ito_539_strategy_3_ratio'),
+         report(write_overdue_report, 'ito_539_strategy_3_ratio', 'ratio')),
+        ('lotto_39_strategy_1', simulate('lotto_39_strategy_1'),
+         report(write_39_winnings_report, 'lotto_39_strategy_1')),
+        ('lotto_39_strategy_1_vectorized', simulate('lotto_39_strategy_1', iter_vectorized), None),
+        ('lotto_39_strategy_2', simulate('lotto_39_strategy_2'), write_lotto_39_strategy_2),
+        ('lotto_39_strategy_3_3', simulate('lotto_39_strategy_3_3'),
+         report(write_combo_report, 'lotto_39_strategy_3_3', 3)),
+        ('lotto_39_strategy_3_4', simulate('lotto_39_strategy_3_4'),
+         report(write_combo_report, 'lotto_39_strategy_3_4', 4)),
+        ('backtest', lambda store: run_backtest(store, create_strategies()), None),
+    ]
+
+
+def benchmark_size(size, repeat, seed):
+    """對 size 期的模擬歷史執行所有項目，回傳 {項目: 秒數}"""
+    timings = {}
+    records = synthetic_records(size, seed)
+    with tempfile.TemporaryDirectory() as directory:
+        data_file, pages = write_fixtures(directory, records)
+
+        scraper = LTO539Scraper()
+        html_pages = []
+        for filename in pages:
+            with open(filename, 'r', encoding='utf-8') as f:
+                html_pages.append(f.read())
+        timings['parse'], parsed = best_time(
+            lambda: [record for html_content in html_pages for record in scraper.parse_lottery_data(html_content)],
+            repeat)
+        if parsed != records:
+            raise ValueError(f"解析結果與模擬資料不同（{len(parsed)} / {len(records)} 筆）")
+
+        timings['load_json'], store = best_time(lambda: DrawStore.load(data_file, use_cache=False), repeat)
+        DrawStore.load(data_file)  # 建立快取
+        timings['load_cache'], _ = best_time(lambda: DrawStore.load(data_file), repeat)
+        for name in ('parse', 'load_json', 'load_cache'):
+            print(f"  {name:<32} {timings[name] * 1000:>19.1f} ms")
+
+        for name, simulate, report in strategy_cases():
+            timings[f'simulate:{name}'], results = best_time(lambda: simulate(store), repeat)
+            if report is not None:
+                timings[f'report:{name}'], _ = best_time(lambda: report(directory, results), repeat)
+            print(f"  {name:<32} simulate {timings[f'simulate:{name}'] * 1000:>10.1f} ms"
+                  + (f"  report {timings[f'report:{name}'] * 1000:>10.1f} ms" if report is not None else ""))
+    return timings
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """列出與先前結果的比較，回傳退步的項目 [(期數, 項目, 先前秒數, 本次秒數)]"""
+    regressions = []
+    print(f"\n{'期數':>8} {'項目':<42} {'先前(ms)':>10} {'本次(ms)':>10} {'倍數':>7}")
+    for size, timings in results['timings'].items():
+        previous = baseline.get('timings', {}).get(size, {})
+        for name, seconds in timings.items():
+            if name not in previous:
+                continue
+            ratio = seconds / previous[name] if previous[name] > 0 else float('inf')
+            flag = '  退步' if ratio > threshold else ''
+            print(f"{size:>8} {name:<42} {previous[name] * 1000:>10.1f} {seconds * 1000:>10.1f} {ratio:>6.2f}x{flag}")
+            if ratio > threshold:
+                regressions.append((size, name, previous[name], seconds))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='爬蟲解析、資料載入與策略回測的效能基準')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='模擬歷史的期數，以逗號分隔')
+    parser.add_argument('--repeat', type=int, default=3, help='每個項目重複次數（取最快）')
+    parser.add_argument('--seed', type=int, default=539, help='模擬資料的亂數種子')
+    parser.add_argument('--output', default='benchmark_results.json', help='結果輸出檔案（JSON）')
+    parser.add_argument('--compare', help='與先前的結果檔比較')
+    parser.add_argument('--threshold', type=float, default=1.25, help='比先前慢超過幾倍視為退步')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'timings': {},
+    }
+    for size in sizes:
+        print(f"{size} 期：")
+        results['timings'][str(size)] = benchmark_size(size, args.repeat, args.seed)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n結果已儲存至：{args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('environment') != results['environment']:
+            print("注意：先前結果的執行環境不同，比較僅供參考")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} 個項目比先前慢超過 {args.threshold:.2f} 倍")
+            sys.exit(1)
+        print("\n沒有退步的項目")
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,10 @@ pip3 install -r requirements.txt
 echo "🕷️ 執行爬蟲抓取最新資料..."
 python3 scraper.py
 
+# 產生前端統計用的前綴和表
+echo "📊 產生統計表..."
+python3 draw_statistics.py
+
 # 進入前端目錄
 cd frontend
 
@@ -36,6 +40,7 @@ npm install
 # 複製開獎資料到前端
 echo "📄 複製開獎資料..."
 cp ../lottery_data.json public/
+cp ../lottery_statistics.json public/
 
 # 建置前端應用
 echo "🔨 建置前端應用..."
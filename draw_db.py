@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite 開獎資料庫（選用）
+
+資料表：
+- draws(date, timestamp)：每期一列，以開獎日期（YYYY/MM/DD，字串排序即日期排序）為主鍵
+- draw_numbers(date, position, number)：每期 5 列
+
+分析腳本的 --start / --end / --limit 由 DrawStore.from_database 以主鍵查詢，不必載入整份歷史。
+合併新資料使用 INSERT OR IGNORE，已存在的日期直接略過。
+前端仍使用 lottery_data.json，由 export_json() 產生。
+
+用法：
+    python draw_db.py import     # 由 lottery_data.json 建立 / 更新資料庫
+    python draw_db.py export     # 由資料庫輸出 lottery_data.json
+"""
+
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+from itertools import groupby
+from typing import List, Dict, Optional
+
+from draw_log import atomic_write
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS draws (
+    date TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS draw_numbers (
+    date TEXT NOT NULL REFERENCES draws(date),
+    position INTEGER NOT NULL,
+    number INTEGER NOT NULL,
+    PRIMARY KEY (date, position)
+) WITHOUT ROWID;
+"""
+
+
+class DrawDatabase:
+    def __init__(self, filename: str = "lottery_data.db"):
+        self.filename = filename
+        self._connection = None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.filename)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.filename)
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def append(self, records: List[Dict], known_dates: Optional[set] = None) -> int:
+        """以 INSERT OR IGNORE 合併開獎記錄，回傳新增的期數
+
+        known_dates 為呼叫端已載入的日期，其中的記錄直接略過，新增的日期會加入其中。
+        """
+        inserted = 0
+        with self.connection as connection:
+            for record in records:
+                if known_dates is not None:
+                    if record['date'] in known_dates:
+                        continue
+                    known_dates.add(record['date'])
+                cursor = connection.execute(
+                    "INSERT OR IGNORE INTO draws (date, timestamp) VALUES (?, ?)",
+                    (record['date'], record['timestamp']))
+                if cursor.rowcount == 0:
+                    continue
+                connection.executemany(
+                    "INSERT INTO draw_numbers (date, position, number) VALUES (?, ?, ?)",
+                    [(record['date'], position, number) for position, number in enumerate(record['numbers'])])
+                inserted += 1
+        return inserted
+
+    def load(self) -> List[Dict]:
+        """所有開獎記錄（最新到最舊）"""
+        rows = self.connection.execute(
+            "SELECT d.date, d.timestamp, n.number FROM draws d JOIN draw_numbers n ON n.date = d.date "
+            "ORDER BY d.date DESC, n.position")
+        return [{'date': date_str, 'numbers': [row[2] for row in group], 'timestamp': timestamp}
+                for (date_str, timestamp), group in groupby(rows, key=lambda row: (row[0], row[1]))]
+
+    def export_json(self, json_filename: str = "lottery_data.json", records: Optional[List[Dict]] = None) -> int:
+        """輸出 data-format.md 格式的 JSON（最新到最舊）；records 為呼叫端已合併的記錄，省略時查詢資料庫"""
+        if records is None:
+            records = self.load()
+        atomic_write(json_filename, json.dumps({
+            'last_updated': datetime.now().isoformat(),
+            'total_records': len(records),
+            'data': records
+        }, ensure_ascii=False, indent=2))
+        return len(records)
+
+    def import_json(self, json_filename: str = "lottery_data.json") -> int:
+        """把 lottery_data.json 的記錄合併進資料庫"""
+        with open(json_filename, 'r', encoding='utf-8') as f:
+            return self.append(json.load(f).get('data', []))
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'import'
+    database = DrawDatabase()
+
+    if command == 'import':
+        print(f"Imported {database.import_json()} new records into {database.filename}")
+    elif command == 'export':
+        print(f"Exported {database.export_json()} records to lottery_data.json")
+    else:
+        print(f"Unknown command: {command} (use import or export)")
+        sys.exit(1)
+    database.close()
+
+
+if __name__ == "__main__":
+    main()
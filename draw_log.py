@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+只附加的開獎紀錄檔
+
+lottery_data.json 每次更新都要整份重新序列化；改用 JSON Lines（每行一期）後，
+每日更新只需把新的開獎附加到檔尾，寫入量與歷史長度無關。
+前端與分析程式仍使用 data-format.md 規定的 JSON，由 export_json() 產生。
+
+用法：
+    python draw_log.py compact    # 去除重複並依日期重寫紀錄檔
+    python draw_log.py export     # 由紀錄檔輸出 lottery_data.json
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+from typing import List, Dict, Optional
+
+
+class DrawLog:
+    def __init__(self, filename: str = "lottery_data.jsonl"):
+        self.filename = filename
+
+    def exists(self) -> bool:
+        return os.path.exists(self.filename)
+
+    def load(self) -> List[Dict]:
+        """讀取所有開獎記錄（最新到最舊，重複日期以最早寫入的為準）"""
+        records = {}
+        if not self.exists():
+            return []
+        with open(self.filename, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.endswith('\n'):
+                    # 寫到一半中斷的最後一行，下次附加前會被截掉
+                    print(f"Ignoring incomplete record at line {line_number} of {self.filename}")
+                    break
+                record = json.loads(line)
+                records.setdefault(record['date'], record)
+        return sorted(records.values(), key=lambda x: x['timestamp'], reverse=True)
+
+    def dates(self) -> set:
+        return {record['date'] for record in self.load()}
+
+    def append(self, records: List[Dict], known_dates: Optional[set] = None) -> int:
+        """把新的開獎記錄附加到檔尾（只寫入尚未存在的日期），回傳寫入筆數
+
+        known_dates 為呼叫端已載入的日期（省略時讀取紀錄檔），寫入的日期會加入其中。
+        所有新記錄以一次 write 寫入並 fsync；若上次寫入中斷留下不完整的一行，先截掉再附加。
+        """
+        if known_dates is None:
+            known_dates = self.dates()
+        new_records = []
+        for record in sorted(records, key=lambda x: x['timestamp']):
+            if record['date'] not in known_dates:
+                known_dates.add(record['date'])
+                new_records.append(record)
+        if not new_records:
+            return 0
+
+        self._truncate_incomplete_line()
+        payload = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in new_records)
+        fd = os.open(self.filename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, payload.encode('utf-8'))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        return len(new_records)
+
+    def _truncate_incomplete_line(self):
+        if not self.exists():
+            return
+        with open(self.filename, 'r+b') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            f.seek(0)
+            content = f.read()
+            f.truncate(content.rfind(b'\n') + 1)
+
+    def compact(self):
+        """去除重複與不完整的記錄，依日期（從舊到新）重寫紀錄檔"""
+        records = list(reversed(self.load()))
+        atomic_write(self.filename, ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records))
+        return len(records)
+
+    def export_json(self, json_filename: str = "lottery_data.json", records: Optional[List[Dict]] = None) -> int:
+        """輸出 data-format.md 格式的 JSON（最新到最舊）；records 為呼叫端已合併的記錄，省略時讀取紀錄檔"""
+        if records is None:
+            records = self.load()
+        atomic_write(json_filename, json.dumps({
+            'last_updated': datetime.now().isoformat(),
+            'total_records': len(records),
+            'data': records
+        }, ensure_ascii=False, indent=2))
+        return len(records)
+
+    def import_json(self, json_filename: str = "lottery_data.json") -> int:
+        """由既有的 lottery_data.json 建立紀錄檔"""
+        with open(json_filename, 'r', encoding='utf-8') as f:
+            return self.append(json.load(f).get('data', []))
+
+
+def atomic_write(filename: str, content: str):
+    """先寫暫存檔再取代，避免留下寫一半的檔案"""
+    temp_filename = filename + '.tmp'
+    with open(temp_filename, 'w', encoding='utf-8') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_filename, filename)
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'export'
+    log = DrawLog()
+    if not log.exists() and os.path.exists("lottery_data.json"):
+        print(f"Imported {log.import_json()} records from lottery_data.json")
+
+    if command == 'compact':
+        print(f"Compacted {log.filename}: {log.compact()} records")
+    elif command == 'export':
+        print(f"Exported {log.export_json()} records to lottery_data.json")
+    else:
+        print(f"Unknown command: {command} (use compact or export)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
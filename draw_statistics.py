@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+前端統計用的逐期號碼與兩數組合排名
+
+前端原本每次切換日期都要把整份 lottery_data.json 重新統計一次號碼與兩數組合的出現次數。
+這裡在部署時（deploy-pages 工作流程）預先算好每期的號碼（由小到大）與 10 組兩數組合的排名，
+前端載入時一次建立前綴和（累計出現次數），之後任何「最近 N 期」或日期區間的統計都只需一次相減：
+    區間 [start, end) 的出現次數 = counts[end] - counts[start]
+檔案大小只隨期數線性成長（每期 15 個數字），不必輸出 741 組組合 × 期數的完整前綴和。
+
+用法：
+    python draw_statistics.py     # 由 lottery_data.json 輸出 lottery_statistics.json（建置產物，不納入版本控制）
+"""
+
+import json
+from typing import Dict
+
+import numpy as np
+
+from anyalytics.draw_store import DrawStore
+from anyalytics.window_engine import combination_ranks
+from draw_log import atomic_write
+
+
+def build_statistics(store: DrawStore) -> Dict:
+    """由開獎資料建立逐期統計表，位置為時間序（第 0 期最早）
+
+    numbers[t]：第 t 期的 5 個號碼（由小到大）
+    pairs[t]：第 t 期 10 組兩數組合的排名（window_engine.PAIRS 的順序）
+    """
+    chronological = store.chronological()
+    total = len(chronological)
+
+    return {
+        'total_records': total,
+        'dates': [chronological.date(index) for index in range(total)],
+        'numbers': np.sort(chronological.numbers, axis=1).tolist(),
+        'pairs': combination_ranks(chronological.numbers, 2).tolist(),
+    }
+
+
+def write_statistics(store: DrawStore, filename: str = "lottery_statistics.json") -> int:
+    """輸出逐期統計表，回傳期數"""
+    statistics = build_statistics(store)
+    atomic_write(filename, json.dumps(statistics, separators=(',', ':')))
+    return statistics['total_records']
+
+
+def main():
+    store = DrawStore.load("lottery_data.json", use_cache=False)
+    print(f"Wrote statistics for {write_statistics(store)} records to lottery_statistics.json")
+
+
+if __name__ == "__main__":
+    main()
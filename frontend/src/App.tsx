@@ -5,7 +5,7 @@ import LatestResult from './components/LatestResult';
 import TabStatistics from './components/TabStatistics';
 
 function App() {
-  const { data, loading, error } = useLotteryData();
+  const { data, statistics, loading, error } = useLotteryData();
   const [selectedDate, setSelectedDate] = useState<string>('');
 
   // Debug information
@@ -63,6 +63,7 @@ function App() {
         
         <TabStatistics
           records={data.data}
+          statistics={statistics}
           selectedDate={selectedDate}
         />
       </main>
@@ -1,16 +1,25 @@
 import {
   calculateNumberStatistics,
   calculateCombinationStatistics,
+  calculateNumberStatisticsFromPrefix,
+  calculateCombinationStatisticsFromPrefix,
+  buildPrefixStatistics,
+  calculateNumberStatisticsForRange,
+  calculateCombinationStatisticsForRange,
+  isMatchingStatistics,
   filterRecordsByDate,
   getTopNumbers,
   getTopCombination,
   isValidNumber,
-  isValidLotteryRecord
+  isValidLotteryRecord,
+  PAIRS,
+  pairRank
 } from '../../utils/statisticsUtils';
 import {
   mockLotteryData,
   emptyLotteryData,
-  singleLotteryData
+  singleLotteryData,
+  buildMockStatistics
 } from '../../test-helpers/testData.mock';
 
 describe('statisticsUtils', () => {
@@ -119,6 +128,62 @@ describe('statisticsUtils', () => {
     });
   });
 
+  describe('前綴和統計表', () => {
+    const statistics = buildPrefixStatistics(buildMockStatistics(mockLotteryData));
+
+    test('載入時應該由逐期統計表建立前綴和表', () => {
+      expect(statistics.numbers).toHaveLength((mockLotteryData.length + 1) * 39);
+      expect(statistics.pairs).toHaveLength((mockLotteryData.length + 1) * 741);
+      // 號碼1出現在最舊的5期中的第3~5期
+      expect(Array.from({ length: 6 }, (_, t) => statistics.numbers[t * 39])).toEqual([0, 0, 0, 1, 2, 3]);
+      // 組合 (1,2) 的排名為0，出現在第4、5期
+      expect(Array.from({ length: 6 }, (_, t) => statistics.pairs[t * 741])).toEqual([0, 0, 0, 0, 1, 2]);
+    });
+
+    test('組合順序應該與 window_engine.PAIRS 相同（組合數系統排名）', () => {
+      expect(PAIRS).toHaveLength(741);
+      expect(PAIRS.slice(0, 4)).toEqual([[1, 2], [1, 3], [2, 3], [1, 4]]);
+      expect(PAIRS[740]).toEqual([38, 39]);
+      PAIRS.forEach(([a, b], index) => {
+        expect(a).toBeLessThan(b);
+        expect(pairRank(a, b)).toBe(index);
+      });
+    });
+
+    test('號碼統計應該與逐期統計相同', () => {
+      for (let start = 0; start <= mockLotteryData.length; start++) {
+        for (let end = start; end <= mockLotteryData.length; end++) {
+          expect(calculateNumberStatisticsFromPrefix(statistics, start, end))
+            .toEqual(calculateNumberStatistics(mockLotteryData.slice(start, end)));
+        }
+      }
+    });
+
+    test('組合統計應該與逐期統計相同', () => {
+      for (let start = 0; start <= mockLotteryData.length; start++) {
+        for (let end = start; end <= mockLotteryData.length; end++) {
+          expect(calculateCombinationStatisticsFromPrefix(statistics, start, end))
+            .toEqual(calculateCombinationStatistics(mockLotteryData.slice(start, end)));
+        }
+      }
+    });
+
+    test('應該檢查統計表與開獎資料是否為同一版本', () => {
+      expect(isMatchingStatistics(statistics, mockLotteryData)).toBe(true);
+      expect(isMatchingStatistics(statistics, mockLotteryData.slice(1))).toBe(false);
+      expect(isMatchingStatistics(buildPrefixStatistics(buildMockStatistics(emptyLotteryData)), emptyLotteryData)).toBe(true);
+    });
+
+    test('統計表版本不符或不存在時應該改為逐期統計', () => {
+      const outdated = buildPrefixStatistics(buildMockStatistics(mockLotteryData.slice(1)));
+
+      expect(calculateNumberStatisticsForRange(mockLotteryData, 0, 3, outdated))
+        .toEqual(calculateNumberStatistics(mockLotteryData.slice(0, 3)));
+      expect(calculateCombinationStatisticsForRange(mockLotteryData, 1, 4, null))
+        .toEqual(calculateCombinationStatistics(mockLotteryData.slice(1, 4)));
+    });
+  });
+
   describe('filterRecordsByDate', () => {
     test('沒有選擇日期時應該返回前30期', () => {
       const { filteredRecords, title } = filterRecordsByDate(mockLotteryData);
@@ -1,93 +1,41 @@
 import React, { useMemo, useState } from 'react';
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts';
-import { LotteryRecord, CombinationStats } from '../types';
+import { LotteryRecord, PrefixStatistics } from '../types';
+import { calculateCombinationStatisticsForRange } from '../utils/statisticsUtils';
 import './CombinationStatistics.css';
 
 interface CombinationStatisticsProps {
   records: LotteryRecord[];
+  statistics?: PrefixStatistics | null;
   selectedDate?: string;
   hideTitle?: boolean;
 }
 
-const CombinationStatistics: React.FC<CombinationStatisticsProps> = ({ records, selectedDate, hideTitle = false }) => {
+const CombinationStatistics: React.FC<CombinationStatisticsProps> = ({ records, statistics, selectedDate, hideTitle = false }) => {
   const [showCount, setShowCount] = useState<number>(20); // 顯示前20組合
 
-  const { filteredRecords, statsTitle } = useMemo(() => {
-    let filtered: LotteryRecord[];
-    let title: string;
-
-    if (selectedDate) {
-      // 找到選擇日期的索引位置
-      const selectedIndex = records.findIndex(record => record.date === selectedDate);
-
-      if (selectedIndex !== -1) {
-        // 從選擇的日期開始往前取30期（包含選擇的日期）
-        const startIndex = selectedIndex;
-        const endIndex = Math.min(selectedIndex + 30, records.length);
-        filtered = records.slice(startIndex, endIndex);
-        title = `數字組合統計 (${selectedDate} 往前30期)`;
-      } else {
-        // 如果找不到選擇的日期，使用前30期
-        filtered = records.slice(0, 30);
-        title = '數字組合統計 (最近30期)';
-      }
-    } else {
-      // 沒有選擇日期時，使用前30期
-      filtered = records.slice(0, 30);
-      title = '數字組合統計 (最近30期)';
+  const { startIndex, endIndex, statsTitle } = useMemo(() => {
+    // 找到選擇日期的索引位置，找不到或沒有選擇日期時使用最近30期
+    const selectedIndex = selectedDate ? records.findIndex(record => record.date === selectedDate) : -1;
+
+    if (selectedIndex !== -1) {
+      // 從選擇的日期開始往前取30期（包含選擇的日期）
+      return {
+        startIndex: selectedIndex,
+        endIndex: Math.min(selectedIndex + 30, records.length),
+        statsTitle: `數字組合統計 (${selectedDate} 往前30期)`
+      };
     }
-
-    return { filteredRecords: filtered, statsTitle: title };
+    return { startIndex: 0, endIndex: Math.min(30, records.length), statsTitle: '數字組合統計 (最近30期)' };
   }, [records, selectedDate]);
 
-  const combinationStats = useMemo(() => {
-    // 生成所有可能的兩兩組合 (1-39)
-    const allCombinations: [number, number][] = [];
-    for (let i = 1; i <= 39; i++) {
-      for (let j = i + 1; j <= 39; j++) {
-        allCombinations.push([i, j]);
-      }
-    }
-
-    // 統計每個組合出現次數
-    const combinationCounts: { [key: string]: number } = {};
+  const periods = endIndex - startIndex;
 
-    // 初始化所有組合計數為0
-    allCombinations.forEach(([a, b]) => {
-      const key = `${a}-${b}`;
-      combinationCounts[key] = 0;
-    });
-
-    // 計算每期開獎號碼中的兩兩組合
-    filteredRecords.forEach(record => {
-      const numbers = record.numbers.sort((a, b) => a - b);
-
-      // 生成該期的所有兩兩組合
-      for (let i = 0; i < numbers.length; i++) {
-        for (let j = i + 1; j < numbers.length; j++) {
-          const combination = [numbers[i], numbers[j]].sort((a, b) => a - b);
-          const key = `${combination[0]}-${combination[1]}`;
-          if (combinationCounts.hasOwnProperty(key)) {
-            combinationCounts[key]++;
-          }
-        }
-      }
-    });
-
-    // 轉換為統計格式並排序
-    const statsArray: CombinationStats[] = Object.entries(combinationCounts)
-      .map(([key, count]) => {
-        const [a, b] = key.split('-').map(Number);
-        return {
-          combination: [a, b] as [number, number],
-          count,
-          percentage: Math.round((count / filteredRecords.length) * 100 * 100) / 100
-        };
-      })
-      .sort((a, b) => b.count - a.count);
-
-    return statsArray;
-  }, [filteredRecords]);
+  // 有同版本的前綴和表（由 lottery_statistics.json 建立）時直接相減，否則逐期統計
+  const combinationStats = useMemo(
+    () => calculateCombinationStatisticsForRange(records, startIndex, endIndex, statistics),
+    [records, startIndex, endIndex, statistics]
+  );
 
   const chartData = combinationStats.slice(0, showCount).map(stat => ({
     ...stat,
@@ -105,7 +53,7 @@ const CombinationStatistics: React.FC<CombinationStatisticsProps> = ({ records,
       <div className="stats-summary">
         <div className="summary-item">
           <span className="summary-label">統計期數</span>
-          <span className="summary-value">{filteredRecords.length}</span>
+          <span className="summary-value">{periods}</span>
         </div>
         <div className="summary-item">
           <span className="summary-label">總組合數</span>
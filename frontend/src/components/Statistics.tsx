@@ -1,72 +1,39 @@
 import React, { useMemo } from 'react';
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts';
-import { LotteryRecord, NumberStats } from '../types';
+import { LotteryRecord, PrefixStatistics } from '../types';
+import { calculateNumberStatisticsForRange } from '../utils/statisticsUtils';
 import './Statistics.css';
 
 interface StatisticsProps {
   records: LotteryRecord[];
+  statistics?: PrefixStatistics | null;
   selectedDate?: string;
   hideTitle?: boolean;
 }
 
-const Statistics: React.FC<StatisticsProps> = ({ records, selectedDate, hideTitle = false }) => {
-  const { filteredRecords, statsTitle } = useMemo(() => {
-    let filtered: LotteryRecord[];
-    let title: string;
-    
-    if (selectedDate) {
-      // 找到選擇日期的索引位置
-      const selectedIndex = records.findIndex(record => record.date === selectedDate);
-      
-      if (selectedIndex !== -1) {
-        // 從選擇的日期開始往前取30期（包含選擇的日期）
-        const startIndex = selectedIndex;
-        const endIndex = Math.min(selectedIndex + 30, records.length);
-        filtered = records.slice(startIndex, endIndex);
-        title = `號碼統計 (${selectedDate} 往前30期)`;
-      } else {
-        // 如果找不到選擇的日期，使用前30期
-        filtered = records.slice(0, 30);
-        title = '號碼統計 (最近30期)';
-      }
-    } else {
-      // 沒有選擇日期時，使用前30期
-      filtered = records.slice(0, 30);
-      title = '號碼統計 (最近30期)';
+const Statistics: React.FC<StatisticsProps> = ({ records, statistics, selectedDate, hideTitle = false }) => {
+  const { startIndex, endIndex, statsTitle } = useMemo(() => {
+    // 找到選擇日期的索引位置，找不到或沒有選擇日期時使用最近30期
+    const selectedIndex = selectedDate ? records.findIndex(record => record.date === selectedDate) : -1;
+
+    if (selectedIndex !== -1) {
+      // 從選擇的日期開始往前取30期（包含選擇的日期）
+      return {
+        startIndex: selectedIndex,
+        endIndex: Math.min(selectedIndex + 30, records.length),
+        statsTitle: `號碼統計 (${selectedDate} 往前30期)`
+      };
     }
-    
-    return { filteredRecords: filtered, statsTitle: title };
+    return { startIndex: 0, endIndex: Math.min(30, records.length), statsTitle: '號碼統計 (最近30期)' };
   }, [records, selectedDate]);
 
-  const stats = useMemo(() => {
-    const recentRecords = filteredRecords;
-    
-    // 統計每個號碼出現次數
-    const numberCounts: { [key: number]: number } = {};
-    
-    // 初始化1-39的計數
-    for (let i = 1; i <= 39; i++) {
-      numberCounts[i] = 0;
-    }
-    
-    // 計算出現次數
-    recentRecords.forEach(record => {
-      record.numbers.forEach(number => {
-        numberCounts[number]++;
-      });
-    });
-    
-    // 轉換為統計格式並排序
-    const statsArray: NumberStats[] = Object.entries(numberCounts)
-      .map(([number, count]) => ({
-        number: parseInt(number),
-        count,
-        percentage: Math.round((count / recentRecords.length) * 100 * 100) / 100
-      }))
-      .sort((a, b) => b.count - a.count);
-    
-    return statsArray;
-  }, [filteredRecords]);
+  const periods = endIndex - startIndex;
+
+  // 有同版本的前綴和表（由 lottery_statistics.json 建立）時直接相減，否則逐期統計
+  const stats = useMemo(
+    () => calculateNumberStatisticsForRange(records, startIndex, endIndex, statistics),
+    [records, startIndex, endIndex, statistics]
+  );
 
   const chartData = stats.slice(0, 10); // 顯示前10名
 
@@ -77,7 +44,7 @@ const Statistics: React.FC<StatisticsProps> = ({ records, selectedDate, hideTitl
       <div className="stats-summary">
         <div className="summary-item">
           <span className="summary-label">統計期數</span>
-          <span className="summary-value">{filteredRecords.length}</span>
+          <span className="summary-value">{periods}</span>
         </div>
         <div className="summary-item">
           <span className="summary-label">最熱門號碼</span>
@@ -1,17 +1,18 @@
 import React, { useState, useMemo } from 'react';
-import { LotteryRecord } from '../types';
+import { LotteryRecord, PrefixStatistics } from '../types';
 import Statistics from './Statistics';
 import CombinationStatistics from './CombinationStatistics';
 import './TabStatistics.css';
 
 interface TabStatisticsProps {
   records: LotteryRecord[];
+  statistics?: PrefixStatistics | null;
   selectedDate?: string;
 }
 
 type TabType = 'numbers' | 'combinations';
 
-const TabStatistics: React.FC<TabStatisticsProps> = ({ records, selectedDate }) => {
+const TabStatistics: React.FC<TabStatisticsProps> = ({ records, statistics, selectedDate }) => {
   const [activeTab, setActiveTab] = useState<TabType>('numbers');
 
   const statsTitle = useMemo(() => {
@@ -58,6 +59,7 @@ const TabStatistics: React.FC<TabStatisticsProps> = ({ records, selectedDate })
           <div className="tab-panel">
             <Statistics
               records={records}
+              statistics={statistics}
               selectedDate={selectedDate}
               hideTitle={true}
             />
@@ -68,6 +70,7 @@ const TabStatistics: React.FC<TabStatisticsProps> = ({ records, selectedDate })
           <div className="tab-panel">
             <CombinationStatistics
               records={records}
+              statistics={statistics}
               selectedDate={selectedDate}
               hideTitle={true}
             />
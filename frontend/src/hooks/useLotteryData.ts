@@ -1,8 +1,20 @@
 import { useState, useEffect } from 'react';
-import { LotteryData } from '../types';
+import { LotteryData, LotteryStatistics, PrefixStatistics } from '../types';
+import { buildPrefixStatistics } from '../utils/statisticsUtils';
+
+// 逐期統計表只是加速用（載入後建立前綴和表），取得失敗時前端改為逐期統計
+const fetchStatistics = async (url: string): Promise<LotteryStatistics | null> => {
+  try {
+    const response = await fetch(url);
+    return response.ok ? await response.json() : null;
+  } catch {
+    return null;
+  }
+};
 
 export const useLotteryData = () => {
   const [data, setData] = useState<LotteryData | null>(null);
+  const [statistics, setStatistics] = useState<PrefixStatistics | null>(null);
   const [loading, setLoading] = useState<boolean>(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -12,8 +24,11 @@ export const useLotteryData = () => {
         setLoading(true);
         // Use different paths for development and production
         const isDev = process.env.NODE_ENV === 'development';
-        const dataUrl = isDev ? '/ito539_analytics/lottery_data.json' : './lottery_data.json';
-        const response = await fetch(dataUrl);
+        const baseUrl = isDev ? '/ito539_analytics/' : './';
+        const [response, lotteryStatistics] = await Promise.all([
+          fetch(`${baseUrl}lottery_data.json`),
+          fetchStatistics(`${baseUrl}lottery_statistics.json`)
+        ]);
         
         if (!response.ok) {
           throw new Error(`HTTP error! status: ${response.status}`);
@@ -21,10 +36,12 @@ export const useLotteryData = () => {
         
         const lotteryData: LotteryData = await response.json();
         setData(lotteryData);
+        setStatistics(lotteryStatistics && buildPrefixStatistics(lotteryStatistics));
         setError(null);
       } catch (err) {
         setError(err instanceof Error ? err.message : 'Unknown error occurred');
         setData(null);
+        setStatistics(null);
       } finally {
         setLoading(false);
       }
@@ -33,5 +50,5 @@ export const useLotteryData = () => {
     fetchData();
   }, []);
 
-  return { data, loading, error };
+  return { data, statistics, loading, error };
 };
\ No newline at end of file
@@ -1,4 +1,4 @@
-import { LotteryRecord } from '../types';
+import { LotteryRecord, LotteryStatistics } from '../types';
 
 /**
  * 測試用的開獎資料
@@ -97,4 +97,30 @@ export const singleLotteryData: LotteryRecord[] = [
     numbers: [5, 10, 15, 20, 25],
     timestamp: '2025-01-10T00:00:00'
   }
-];
\ No newline at end of file
+];
+
+/**
+ * 依開獎資料建立逐期統計表（與 draw_statistics.py 輸出的格式相同）
+ */
+export function buildMockStatistics(records: LotteryRecord[]): LotteryStatistics {
+  const chronological = [...records].reverse();
+  // 組合依 PAIRS（組合數系統排名）的順序
+  const pairIndex = (a: number, b: number) => (a - 1) + ((b - 1) * (b - 2)) / 2;
+  const numbers = chronological.map(record => [...record.numbers].sort((a, b) => a - b));
+  const pairs = numbers.map(drawn => {
+    const ranks: number[] = [];
+    for (let i = 0; i < drawn.length; i++) {
+      for (let j = i + 1; j < drawn.length; j++) {
+        ranks.push(pairIndex(drawn[i], drawn[j]));
+      }
+    }
+    return ranks;
+  });
+
+  return {
+    total_records: records.length,
+    dates: chronological.map(record => record.date),
+    numbers,
+    pairs
+  };
+}
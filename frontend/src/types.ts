@@ -22,3 +22,26 @@ export interface CombinationStats {
   percentage: number;
 }
 
+
+/**
+ * 逐期統計表（lottery_statistics.json，由 draw_statistics.py 產生），位置為時間序（第 0 期最早）
+ * numbers[t] 為第 t 期的號碼（由小到大），pairs[t] 為第 t 期 10 組兩數組合在 PAIRS 中的排名
+ */
+export interface LotteryStatistics {
+  total_records: number;
+  dates: string[];
+  numbers: number[][];
+  pairs: number[][];
+}
+
+/**
+ * 載入時由逐期統計表建立的前綴和表（buildPrefixStatistics）
+ * numbers[t * 39 + n - 1]：號碼 n 在最早 t 期中的出現次數；pairs[t * 741 + i]：排名 i 的兩數組合在最早 t 期中的出現次數
+ * 區間 [start, end) 的出現次數 = counts[end] - counts[start]
+ */
+export interface PrefixStatistics {
+  total_records: number;
+  dates: string[];
+  numbers: Int32Array;
+  pairs: Int32Array;
+}
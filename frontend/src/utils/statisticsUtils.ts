@@ -1,4 +1,20 @@
-import { LotteryRecord, NumberStats, CombinationStats } from '../types';
+import { LotteryRecord, LotteryStatistics, PrefixStatistics, NumberStats, CombinationStats } from '../types';
+
+// 兩數組合的順序，與 lottery_statistics.json 的 pairs 排名、anyalytics/window_engine.PAIRS 相同（組合數系統排名）：
+// (1,2), (1,3), (2,3), (1,4), ..., (38,39)，組合 (a, b) 的排名為 pairRank(a, b)
+export const PAIRS: [number, number][] = [];
+for (let b = 2; b <= 39; b++) {
+  for (let a = 1; a < b; a++) {
+    PAIRS.push([a, b]);
+  }
+}
+
+/**
+ * 兩數組合 (a < b) 在 PAIRS 中的排名：C(a-1, 1) + C(b-1, 2)，範圍 0~740
+ */
+export function pairRank(a: number, b: number): number {
+  return (a - 1) + ((b - 1) * (b - 2)) / 2;
+}
 
 /**
  * 計算號碼統計 - 統計每個號碼在指定期數內的出現次數
@@ -35,19 +51,11 @@ export function calculateNumberStatistics(records: LotteryRecord[]): NumberStats
  * 計算組合統計 - 統計所有可能的兩兩組合在指定期數內的出現次數
  */
 export function calculateCombinationStatistics(records: LotteryRecord[]): CombinationStats[] {
-  // 生成所有可能的兩兩組合 (1-39)
-  const allCombinations: [number, number][] = [];
-  for (let i = 1; i <= 39; i++) {
-    for (let j = i + 1; j <= 39; j++) {
-      allCombinations.push([i, j]);
-    }
-  }
-
   // 統計每個組合出現次數
   const combinationCounts: { [key: string]: number } = {};
 
-  // 初始化所有組合計數為0
-  allCombinations.forEach(([a, b]) => {
+  // 初始化所有組合計數為0（依 PAIRS 的順序，次數相同時與前綴和表的結果順序一致）
+  PAIRS.forEach(([a, b]) => {
     const key = `${a}-${b}`;
     combinationCounts[key] = 0;
   });
@@ -83,6 +91,125 @@ export function calculateCombinationStatistics(records: LotteryRecord[]): Combin
   return statsArray;
 }
 
+/**
+ * 逐列累加：rows[t] 為第 t 期出現的項目（slot(項目) 為其位置），回傳 (期數 + 1) × size 的前綴和
+ */
+function prefixSums(rows: number[][], size: number, slot: (item: number) => number): Int32Array {
+  const counts = new Int32Array((rows.length + 1) * size);
+  rows.forEach((row, t) => {
+    const offset = (t + 1) * size;
+    counts.copyWithin(offset, t * size, offset);
+    row.forEach(item => {
+      counts[offset + slot(item)]++;
+    });
+  });
+  return counts;
+}
+
+/**
+ * 由逐期統計表建立前綴和表（載入時執行一次），之後任一區間的統計只需相減
+ */
+export function buildPrefixStatistics(statistics: LotteryStatistics): PrefixStatistics {
+  return {
+    total_records: statistics.total_records,
+    dates: statistics.dates,
+    numbers: prefixSums(statistics.numbers, 39, number => number - 1),
+    pairs: prefixSums(statistics.pairs, PAIRS.length, rank => rank)
+  };
+}
+
+/**
+ * 檢查前綴和統計表與開獎記錄（最新到最舊）是否為同一版本的資料
+ */
+export function isMatchingStatistics(statistics: PrefixStatistics, records: LotteryRecord[]): boolean {
+  const dates = statistics.dates;
+  return (
+    dates.length === records.length &&
+    (records.length === 0 ||
+      (dates[dates.length - 1] === records[0].date && dates[0] === records[records.length - 1].date))
+  );
+}
+
+/**
+ * 以前綴和表計算號碼統計 - 對應 records.slice(startIndex, endIndex)，每個號碼只需一次相減
+ */
+export function calculateNumberStatisticsFromPrefix(
+  statistics: PrefixStatistics,
+  startIndex: number,
+  endIndex: number
+): NumberStats[] {
+  // records 為最新到最舊，換成時間序的 [from, to)
+  const from = statistics.total_records - endIndex;
+  const to = statistics.total_records - startIndex;
+  const periods = to - from;
+
+  return Array.from({ length: 39 }, (_, index) => index)
+    .map(index => {
+      const count = statistics.numbers[to * 39 + index] - statistics.numbers[from * 39 + index];
+      return {
+        number: index + 1,
+        count,
+        percentage: periods > 0 ? Math.round((count / periods) * 100 * 100) / 100 : 0
+      };
+    })
+    .sort((a, b) => b.count - a.count);
+}
+
+/**
+ * 以前綴和表計算組合統計 - 對應 records.slice(startIndex, endIndex)，每個組合只需一次相減
+ */
+export function calculateCombinationStatisticsFromPrefix(
+  statistics: PrefixStatistics,
+  startIndex: number,
+  endIndex: number
+): CombinationStats[] {
+  const from = statistics.total_records - endIndex;
+  const to = statistics.total_records - startIndex;
+  const periods = to - from;
+  const size = PAIRS.length;
+
+  return PAIRS
+    .map((combination, index) => {
+      const count = statistics.pairs[to * size + index] - statistics.pairs[from * size + index];
+      return {
+        combination,
+        count,
+        percentage: periods > 0 ? Math.round((count / periods) * 100 * 100) / 100 : 0
+      };
+    })
+    .sort((a, b) => b.count - a.count);
+}
+
+/**
+ * 計算 records.slice(startIndex, endIndex) 的號碼統計，有同版本的前綴和表時直接相減
+ */
+export function calculateNumberStatisticsForRange(
+  records: LotteryRecord[],
+  startIndex: number,
+  endIndex: number,
+  statistics?: PrefixStatistics | null
+): NumberStats[] {
+  if (statistics && isMatchingStatistics(statistics, records)) {
+    return calculateNumberStatisticsFromPrefix(statistics, startIndex, endIndex);
+  }
+  return calculateNumberStatistics(records.slice(startIndex, endIndex));
+}
+
+/**
+ * 計算 records.slice(startIndex, endIndex) 的組合統計，有同版本的前綴和表時直接相減
+ */
+export function calculateCombinationStatisticsForRange(
+  records: LotteryRecord[],
+  startIndex: number,
+  endIndex: number,
+  statistics?: PrefixStatistics | null
+): CombinationStats[] {
+  if (statistics && isMatchingStatistics(statistics, records)) {
+    return calculateCombinationStatisticsFromPrefix(statistics, startIndex, endIndex);
+  }
+  return calculateCombinationStatistics(records.slice(startIndex, endIndex));
+}
+
 /**
  * 根據選擇的日期篩選記錄
  */
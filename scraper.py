@@ -1,39 +1,160 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import argparse
 import requests
 import re
 import json
 import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict
 from bs4 import BeautifulSoup
+from anyalytics.profiler import add_profile_argument, lap, start_profiling
+from draw_db import DrawDatabase
+from draw_log import DrawLog
+from requests.adapters import HTTPAdapter
+
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:  # 沒有 lxml 時只使用正規表示式解析
+    etree = None
+    lxml_html = None
+
+BASE_URL = "https://www.pilio.idv.tw/lto539/list539BIG.asp"
+
+# 表格解析：日期欄位（新舊格式皆可）與 5 個號碼的欄位（已移除空白）
+TABLE_DATE_PATTERN = re.compile(r'(\d{4}/\d{2}/\d{2})')
+TABLE_NUMBERS_PATTERN = re.compile(r'\d{1,2}(?:,\d{1,2}){4}')
+
+class FetchError(Exception):
+    """頁面重試後仍抓取失敗（與「網站沒有更多資料」區分，避免把部分結果當成完整更新）"""
+
+class RateLimiter:
+    """限制每秒請求數（多個執行緒共用）"""
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_time = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if delay > 0:
+            time.sleep(delay)
 
 class LTO539Scraper:
-    def __init__(self):
-        self.base_url = "https://www.pilio.idv.tw/lto539/list539BIG.asp"
+    def __init__(self, base_url: str = BASE_URL, max_workers: int = 4, requests_per_second: float = 1.0,
+                 max_retries: int = 3, backoff: float = 1.0, timeout: float = 10):
+        self.base_url = base_url
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(requests_per_second)
+
+        # 共用連線池，避免每頁都重新建立 TLS 連線
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
     
     def fetch_page(self, page: int = 1, order_by: str = "new") -> str:
-        """抓取指定頁面的內容"""
+        """抓取指定頁面的內容，連線錯誤或 5xx/429 時以指數退避重試"""
         params = {
             'indexpage': page,
             'orderby': order_by
         }
         
-        try:
-            response = requests.get(self.base_url, params=params, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            response.encoding = 'utf-8'
-            return response.text
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching page {page}: {e}")
-            return ""
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.wait()
+            try:
+                response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+                response.raise_for_status()
+                response.encoding = 'utf-8'
+                return response.text
+            except requests.exceptions.RequestException as e:
+                status = e.response.status_code if e.response is not None else None
+                retryable = status is None or status >= 500 or status == 429
+                if not retryable or attempt == self.max_retries:
+                    print(f"Error fetching page {page}: {e}")
+                    return ""
+                delay = self.backoff * (2 ** attempt)
+                print(f"Error fetching page {page}: {e}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+        return ""
+
+    def fetch_pages(self, pages: List[int]) -> List[str]:
+        """以有限的並行數抓取多個頁面，回傳順序與 pages 相同"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self.fetch_page, pages))
     
     def parse_lottery_data(self, html_content: str) -> List[Dict]:
-        """解析開獎資料"""
+        """解析開獎資料：以 lxml 走訪表格列，lxml 無法解析或漏掉資料時改用全文正規表示式
+
+        網站改版時表格結構可能與 lxml 預期的不同而漏掉部分列。以原始 HTML 中日期的個數
+        （一次正規表示式計數，不需建立文件樹）核對 lxml 的筆數，不同或解析不到資料時才以全文正規表示式重新解析，
+        兩者筆數不同時印出警告，採用解析到較多筆的結果。
+        """
+        if lxml_html is None:
+            return self.parse_lottery_text(html_content)
+        try:
+            table_data = self.parse_lottery_table(html_content)
+        except (etree.ParserError, ValueError) as e:
+            print(f"Error parsing table with lxml: {e}")
+            return self.parse_lottery_text(html_content)
+        if table_data and len(table_data) == len(TABLE_DATE_PATTERN.findall(html_content)):
+            return table_data
+        text_data = self.parse_lottery_text(html_content)
+        if len(table_data) != len(text_data):
+            print(f"Warning: lxml parsed {len(table_data)} records but regex parsed {len(text_data)}, "
+                  f"using the {'regex' if len(text_data) > len(table_data) else 'lxml'} result")
+            if len(text_data) > len(table_data):
+                return text_data
+        return table_data
+    
+    def parse_lottery_table(self, html_content: str) -> List[Dict]:
+        """以 lxml 逐列解析開獎表格，每列找出日期欄位與其後的號碼欄位
+
+        只看 <tr> 底下直接的儲存格文字，不需要建立 BeautifulSoup 樹或攤平整份文件，
+        新格式（開獎日期:2025/10/15(三)）與舊格式（2025/09/29）都只是日期欄位的文字不同。
+        """
+        tree = lxml_html.fromstring(html_content)
+        lottery_data = []
+        
+        for row in tree.iter('tr'):
+            date_str = None
+            for cell in row.iterchildren('td', 'th'):
+                text = cell.text_content()
+                if date_str is None:
+                    match = TABLE_DATE_PATTERN.search(text)
+                    if match:
+                        date_str = match.group(1)
+                    continue
+                
+                numbers_str = re.sub(r'[\s\xa0]+', '', text)
+                if TABLE_NUMBERS_PATTERN.fullmatch(numbers_str):
+                    record = self._make_record(date_str, numbers_str)
+                    if record:
+                        lottery_data.append(record)
+                    break
+        
+        return lottery_data
+    
+    def parse_lottery_text(self, html_content: str) -> List[Dict]:
+        """將整份文件攤平成文字後以正規表示式解析（lxml 無法解析時的備援）"""
         soup = BeautifulSoup(html_content, 'html.parser')
         text_content = soup.get_text()
 
@@ -46,24 +167,30 @@ class LTO539Scraper:
         lottery_data = []
         
         for date_str, numbers_str in matches:
-            try:
-                # 清理號碼字串，移除所有空格和特殊字符
-                numbers_str = re.sub(r'[\s\xa0]+', '', numbers_str)  # 移除所有空格和\xa0
-                numbers = [int(num.strip()) for num in numbers_str.split(',') if num.strip()]
-                
-                if len(numbers) == 5:  # 確保有5個號碼
-                    lottery_data.append({
-                        'date': date_str,
-                        'numbers': numbers,
-                        'timestamp': datetime.strptime(date_str, '%Y/%m/%d').isoformat()
-                    })
-                    
-            except Exception as e:
-                print(f"Error parsing date {date_str} or numbers {numbers_str}: {e}")
-                continue
+            # 清理號碼字串，移除所有空格和特殊字符
+            numbers_str = re.sub(r'[\s\xa0]+', '', numbers_str)  # 移除所有空格和\xa0
+            record = self._make_record(date_str, numbers_str)
+            if record:
+                lottery_data.append(record)
         
         return lottery_data
     
+    def _make_record(self, date_str: str, numbers_str: str):
+        """由日期與已清理的號碼字串（逗號分隔）建立一筆記錄，格式不符時回傳 None"""
+        try:
+            numbers = [int(num.strip()) for num in numbers_str.split(',') if num.strip()]
+            
+            if len(numbers) == 5:  # 確保有5個號碼
+                return {
+                    'date': date_str,
+                    'numbers': numbers,
+                    'timestamp': datetime.strptime(date_str, '%Y/%m/%d').isoformat()
+                }
+                
+        except Exception as e:
+            print(f"Error parsing date {date_str} or numbers {numbers_str}: {e}")
+        return None
+    
     def load_existing_data(self, filename: str = "lottery_data.json") -> List[Dict]:
         """載入現有的資料"""
         if os.path.exists(filename):
@@ -78,27 +205,93 @@ class LTO539Scraper:
     def scrape_recent_data(self, pages: int = 3) -> List[Dict]:
         """只抓取最近的資料"""
         all_data = []
+        page_numbers = list(range(1, pages + 1))
         
-        for page in range(1, pages + 1):
-            print(f"Scraping page {page}/{pages}...")
-            html_content = self.fetch_page(page)
-            
+        print(f"Scraping {pages} pages with up to {self.max_workers} concurrent requests...")
+        html_pages = self.fetch_pages(page_numbers)
+        lap('fetch')
+        for page, html_content in zip(page_numbers, html_pages):
             if not html_content:
-                print(f"Failed to fetch page {page}")
-                continue
+                raise FetchError(f"Failed to fetch page {page}")
             
             page_data = self.parse_lottery_data(html_content)
+            lap('parse')
+            print(f"Parsed page {page}/{pages}: {len(page_data)} records")
             all_data.extend(page_data)
-            
-            # 避免過度頻繁請求
-            import time
-            time.sleep(2)
         
         # 按日期排序（最新的在前）
         all_data.sort(key=lambda x: x['timestamp'], reverse=True)
         
         return all_data
     
+    def scrape_incremental(self, known_dates: set, max_pages: int = 50) -> List[Dict]:
+        """增量抓取：從第1頁往後翻，遇到已存在的日期就停止
+
+        頁面由新到舊排列，一旦某頁出現已有的日期，之後的頁面都已經抓過，
+        因此平常每日更新只需要抓第1頁。
+        """
+        all_data = []
+        
+        for page in range(1, max_pages + 1):
+            print(f"Scraping page {page} (incremental)...")
+            html_content = self.fetch_page(page)
+            lap('fetch')
+            if not html_content:
+                raise FetchError(f"Failed to fetch page {page}")
+            
+            page_data = self.parse_lottery_data(html_content)
+            lap('parse')
+            new_records = [item for item in page_data if item['date'] not in known_dates]
+            all_data.extend(new_records)
+            print(f"Page {page}: {len(page_data)} records, {len(new_records)} new")
+            
+            if not page_data or len(new_records) < len(page_data):
+                break
+        
+        all_data.sort(key=lambda x: x['timestamp'], reverse=True)
+        return all_data
+    
+    def scrape_backfill(self, max_pages: int = 1000) -> List[Dict]:
+        """完整回補：每批並行抓取 max_workers 頁，直到網站沒有更多資料
+
+        只有解析後沒有資料（空白表格）或只有重複內容（超出範圍時網站回傳最後一頁）的頁面代表已經到底；
+        頁面重試後仍抓取失敗時拋出 FetchError，不把到目前為止的部分結果當成完整回補。
+        """
+        all_data = []
+        seen_dates = set()
+        page = 1
+        
+        while page <= max_pages:
+            batch = list(range(page, min(page + self.max_workers, max_pages + 1)))
+            print(f"Scraping pages {batch[0]}-{batch[-1]} (backfill)...")
+            exhausted = False
+            
+            html_pages = self.fetch_pages(batch)
+            lap('fetch')
+            for batch_page, html_content in zip(batch, html_pages):
+                if not html_content:
+                    raise FetchError(f"Failed to fetch page {batch_page}")
+                
+                page_data = self.parse_lottery_data(html_content)
+                lap('parse')
+                new_records = [item for item in page_data if item['date'] not in seen_dates]
+                
+                # 空白頁或重複前面的內容（超出範圍時網站可能回傳最後一頁）代表已經到底
+                if not new_records:
+                    print(f"No more data after page {batch_page - 1}")
+                    exhausted = True
+                    break
+                
+                seen_dates.update(item['date'] for item in new_records)
+                all_data.extend(new_records)
+            
+            if exhausted:
+                break
+            page += len(batch)
+        
+        all_data.sort(key=lambda x: x['timestamp'], reverse=True)
+        return all_data
+    
     def merge_and_deduplicate(self, existing_data: List[Dict], new_data: List[Dict]) -> List[Dict]:
         """合併並去重資料"""
         # 建立日期索引來快速查找
@@ -106,12 +299,12 @@ class LTO539Scraper:
         
         # 只保留新的資料
         truly_new_data = [item for item in new_data if item['date'] not in existing_dates]
+        truly_new_data.sort(key=lambda x: x['timestamp'], reverse=True)
         
-        # 合併資料
+        # 合併資料：新資料都比現有資料新時（每日更新的常態）直接接在前面，不必整份重新排序
         merged_data = truly_new_data + existing_data
-        
-        # 按日期排序
-        merged_data.sort(key=lambda x: x['timestamp'], reverse=True)
+        if truly_new_data and existing_data and truly_new_data[-1]['timestamp'] < existing_data[0]['timestamp']:
+            merged_data.sort(key=lambda x: x['timestamp'], reverse=True)
         
         return merged_data
     
@@ -169,27 +362,76 @@ class LTO539Scraper:
             print(f"Error sending Discord notification: {e}")
 
 def main():
-    scraper = LTO539Scraper()
+    parser = argparse.ArgumentParser(description='今彩539開獎資料爬蟲')
+    parser.add_argument('--mode', choices=['incremental', 'backfill', 'recent'], default='incremental',
+                        help='incremental：抓到已有資料為止（預設）；backfill：抓取全部歷史；recent：抓取固定頁數')
+    parser.add_argument('--pages', type=int, default=3, help='recent 模式抓取的頁數')
+    parser.add_argument('--workers', type=int, default=4, help='並行請求數')
+    parser.add_argument('--rate', type=float, default=1.0, help='每秒最多請求數')
+    parser.add_argument('--storage', choices=['json', 'log', 'sqlite'], default='json',
+                        help='json：整份重寫 lottery_data.json；log：只附加新開獎到 lottery_data.jsonl；'
+                             'sqlite：合併到 lottery_data.db。log / sqlite 會再輸出 JSON')
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    start_profiling(args.profile)
+
+    scraper = LTO539Scraper(max_workers=args.workers, requests_per_second=args.rate)
 
     # 載入現有資料
     print("Loading existing data...")
-    existing_data = scraper.load_existing_data()
+    if args.storage in ('log', 'sqlite'):
+        storage = DrawLog() if args.storage == 'log' else DrawDatabase()
+        if not storage.exists() and os.path.exists("lottery_data.json"):
+            print(f"Imported {storage.import_json()} records into {storage.filename}")
+        existing_data = storage.load()
+        if args.storage == 'sqlite':
+            storage.close()  # 抓取期間不佔用資料庫連線，寫入時再開啟
+    else:
+        existing_data = scraper.load_existing_data()
     print(f"Found {len(existing_data)} existing records")
+    # 整次執行共用同一份已知日期，增量抓取與附加紀錄都不必再讀檔
+    known_dates = {item['date'] for item in existing_data}
+    lap('load')
 
-    # 抓取最近的資料
-    print("Scraping recent data...")
-    new_data = scraper.scrape_recent_data(pages=3)
-    print(f"Scraped {len(new_data)} records from recent pages")
+    # 抓取資料（有頁面抓取失敗時不儲存部分結果，以非零結束碼結束）
+    try:
+        if args.mode == 'incremental':
+            print("Scraping new data...")
+            new_data = scraper.scrape_incremental(known_dates)
+        elif args.mode == 'backfill':
+            print("Scraping full history...")
+            new_data = scraper.scrape_backfill()
+        else:
+            print("Scraping recent data...")
+            new_data = scraper.scrape_recent_data(pages=args.pages)
+    except FetchError as e:
+        print(f"Error: {e}, nothing was saved")
+        sys.exit(1)
+    print(f"Scraped {len(new_data)} records")
+    lap('parse')
 
-    # 合併並去重
-    print("Merging and deduplicating...")
-    merged_data = scraper.merge_and_deduplicate(existing_data, new_data)
+    if args.storage in ('log', 'sqlite'):
+        # 只把新的開獎寫入紀錄檔 / 資料庫，有新資料時才重新輸出前端使用的 JSON（由記憶體中的資料合併，不再讀檔）
+        merged_data = scraper.merge_and_deduplicate(existing_data, new_data)
+        new_records_count = storage.append(new_data, known_dates)
+        print(f"Appended {new_records_count} records to {storage.filename}")
+        if new_records_count or not os.path.exists("lottery_data.json"):
+            storage.export_json(records=merged_data)
+        if args.storage == 'sqlite':
+            storage.close()
+        lap('save')
+    else:
+        # 合併並去重
+        print("Merging and deduplicating...")
+        merged_data = scraper.merge_and_deduplicate(existing_data, new_data)
+        lap('merge')
 
-    # 計算新增的資料筆數
-    new_records_count = len(merged_data) - len(existing_data)
+        # 計算新增的資料筆數
+        new_records_count = len(merged_data) - len(existing_data)
 
-    # 儲存更新後的資料
-    scraper.save_to_json(merged_data)
+        # 儲存更新後的資料
+        scraper.save_to_json(merged_data)
+        lap('save')
 
     print(f"Update complete. Total records: {len(merged_data)}")
 
@@ -204,6 +446,7 @@ def main():
             total_records=len(merged_data),
             new_records=new_records_count
         )
+        lap('notify')
     else:
         print("⚠️  No data available to send notification")
 
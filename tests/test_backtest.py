@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+回測驅動程式的測試
+
+號碼視窗前 k 名的策略以 VectorizedBacktest 一次算完（iter_vectorized）時，
+逐期結果必須與逐期滑動視窗的 iter_strategy 完全相同（投注號碼、中獎數、獎金、跳過原因）。
+"""
+
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from anyalytics import DATA_FILE
+from anyalytics.backtest import iter_strategy, iter_vectorized
+from anyalytics.draw_store import DrawStore
+from anyalytics.strategies import ClearTopKStrategy, ComboStrategy, TopKStrategy, create_strategies
+
+
+class VectorizedBacktestTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.store = DrawStore.load(DATA_FILE, use_cache=False)
+
+    def assertSameResults(self, strategy):
+        expected = list(iter_strategy(self.store, strategy))
+        self.assertTrue(expected)
+        self.assertEqual(list(iter_vectorized(self.store, strategy)), expected)
+
+    def test_bundled_strategies(self):
+        for strategy in create_strategies(['ito_539_strategy_1', 'ito_539_strategy_2', 'lotto_39_strategy_1']):
+            with self.subTest(strategy=strategy.name):
+                self.assertSameResults(strategy)
+
+    def test_other_parameters(self):
+        for lookback in (5, 12, 60):
+            for k in (2, 3, 6):
+                for cls, bet_type in ((TopKStrategy, '二合'), (ClearTopKStrategy, '三合')):
+                    if cls is ClearTopKStrategy and k < 3:
+                        continue
+                    with self.subTest(strategy=cls.__name__, lookback=lookback, k=k):
+                        self.assertSameResults(cls('test', '', k, bet_type, lookback))
+
+    def test_unsupported_strategy(self):
+        with self.assertRaises(ValueError):
+            list(iter_vectorized(self.store, ComboStrategy('test', '')))
+
+
+if __name__ == '__main__':
+    unittest.main()
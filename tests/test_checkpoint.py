@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量回測檢查點的測試
+
+先寫出前 T 期的報告與 CSV，再以 patch_report / ResultTable.prepend 加上之後的期數，
+結果必須與一次寫出全部期數（最新的在前面）的檔案逐位元組相同；
+歷史被修改或輸出檔案被改動時檢查點失效。
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from anyalytics.checkpoint import load_checkpoint, patch_report, save_checkpoint
+from anyalytics.draw_store import DrawStore
+from anyalytics.report_writer import ReportWriter
+from anyalytics.result_table import ResultTable, summary_filename
+
+# 由舊到新的逐期結果：(日期, 投注號碼, 開獎號碼, 中獎號碼數, 獎金, 成本)
+RESULTS = [
+    ('2025/01/06', [1, 2, 3, 4, 5], [4, 5, 15, 16, 17], 2, 0, 50),
+    ('2025/01/07', None, [2, 3, 12, 13, 14], None, 0, 0),
+    ('2025/01/08', [1, 3, 9, 10, 11], [1, 3, 9, 10, 11], 5, 8000000, 50),
+    ('2025/01/09', [1, 2], [1, 2, 6, 7, 8], 2, 53, 25),
+    ('2025/01/10', [6, 7, 8, 9, 10], [1, 2, 3, 4, 5], 0, 0, 50),
+]
+COVERED = 3
+
+
+def record_lines(result):
+    date, bet_numbers, winning_numbers, matches, prize, cost = result
+    return [f"日期: {date}", f"投注號碼: {bet_numbers or '跳過'}", f"中獎號碼: {winning_numbers}",
+            f"獎金: {prize:,}元", ""]
+
+
+def header_lines(results):
+    return ["測試報告", f"期數：{len(results)}", f"總獎金：{sum(result[4] for result in results):,}元", ""]
+
+
+def draw_store(results):
+    """結果對應的開獎資料（最新到最舊）"""
+    return DrawStore.from_records([{'date': result[0], 'numbers': result[2]} for result in reversed(results)])
+
+
+class IncrementalOutputTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def read(self, filename):
+        with open(filename, 'rb') as f:
+            return f.read()
+
+    def write_report(self, filename, results):
+        """與各腳本相同：由舊到新寫入，反向輸出，回傳摘要的位元組數"""
+        header = header_lines(results)
+        with ReportWriter(filename) as writer:
+            for result in results:
+                writer.write_record(record_lines(result))
+            writer.finish(header, reverse=True)
+        return len('\n'.join(header).encode('utf-8'))
+
+    def write_table(self, filename, results):
+        table = ResultTable()
+        for result in results:
+            table.add(*result)
+        table.write(filename, reverse=True)
+
+    def test_patch_report_matches_full_report(self):
+        full = self.path('full.txt')
+        self.write_report(full, RESULTS)
+
+        patched = self.path('patched.txt')
+        header_size = self.write_report(patched, RESULTS[:COVERED])
+        new_size = patch_report(patched, header_lines(RESULTS),
+                                [record_lines(result) for result in reversed(RESULTS[COVERED:])], header_size)
+
+        self.assertEqual(self.read(patched), self.read(full))
+        self.assertEqual(new_size, len('\n'.join(header_lines(RESULTS)).encode('utf-8')))
+        self.assertFalse(os.path.exists(patched + '.tmp'))
+
+    def test_prepend_matches_full_table(self):
+        full = self.path('full.csv')
+        self.write_table(full, RESULTS)
+
+        patched = self.path('patched.csv')
+        self.write_table(patched, RESULTS[:COVERED])
+        table = ResultTable()
+        for result in RESULTS[COVERED:]:
+            table.add(*result)
+        table.prepend(patched, reverse=True)
+
+        self.assertEqual(self.read(patched), self.read(full))
+        self.assertEqual(self.read(summary_filename(patched)), self.read(summary_filename(full)))
+
+    def test_checkpoint_validity(self):
+        report = self.path('report.txt')
+        self.write_report(report, RESULTS[:COVERED])
+        checkpoint = self.path('report.checkpoint.json')
+        save_checkpoint(checkpoint, draw_store(RESULTS[:COVERED]), {'total': 1}, [report])
+
+        # 之後新增的期數不影響檢查點
+        loaded = load_checkpoint(checkpoint, draw_store(RESULTS), [report])
+        self.assertEqual((loaded['covered'], loaded['state']), (COVERED, {'total': 1}))
+
+        # 已處理的期數被修改
+        changed = list(RESULTS)
+        changed[0] = ('2025/01/06', None, [4, 5, 15, 16, 18], None, 0, 0)
+        self.assertIsNone(load_checkpoint(checkpoint, draw_store(changed), [report]))
+
+        # 期數比檢查點少
+        self.assertIsNone(load_checkpoint(checkpoint, draw_store(RESULTS[:COVERED - 1]), [report]))
+
+        # 報告被改動或刪除
+        with open(report, 'a', encoding='utf-8') as f:
+            f.write('\n')
+        self.assertIsNone(load_checkpoint(checkpoint, draw_store(RESULTS), [report]))
+        os.remove(report)
+        self.assertIsNone(load_checkpoint(checkpoint, draw_store(RESULTS), [report]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DrawStore 二進位快取的測試
+
+快取只在 JSON 的修改時間與大小都沒變時直接使用；任一項改變時比對內容雜湊，
+內容相同只更新檔頭，內容不同（包括大小不變、只改了號碼）才重新解析 JSON。
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from anyalytics.draw_store import CACHE_HEADER, CACHE_SUFFIX, DrawStore, _read_cache_header
+
+RECORDS = [
+    {'date': '2025/01/10', 'numbers': [1, 2, 3, 4, 5], 'timestamp': '2025-01-10T00:00:00'},
+    {'date': '2025/01/09', 'numbers': [11, 22, 33, 4, 5], 'timestamp': '2025-01-09T00:00:00'},
+    {'date': '2025/01/08', 'numbers': [39, 38, 37, 36, 35], 'timestamp': '2025-01-08T00:00:00'},
+]
+
+
+class DrawStoreCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.directory, 'lottery_data.json')
+        self.cache_file = self.data_file + CACHE_SUFFIX
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_data(self, records, mtime_ns=1_700_000_000_000_000_000):
+        with open(self.data_file, 'w', encoding='utf-8') as f:
+            json.dump({'data': records}, f, ensure_ascii=False)
+        os.utime(self.data_file, ns=(mtime_ns, mtime_ns))
+
+    def load(self):
+        return DrawStore.load(self.data_file)
+
+    def load_without_parsing(self):
+        """載入時不得重新解析 JSON"""
+        with mock.patch.object(DrawStore, 'from_records', side_effect=AssertionError('重新解析了 JSON')):
+            return self.load()
+
+    def assertStore(self, store, records):
+        self.assertEqual([store.date(index) for index in range(len(store))], [record['date'] for record in records])
+        self.assertEqual(store.numbers.tolist(), [record['numbers'] for record in records])
+
+    def test_cache_reused_when_unchanged(self):
+        self.write_data(RECORDS)
+        self.assertStore(self.load(), RECORDS)
+        self.assertTrue(os.path.exists(self.cache_file))
+        self.assertStore(self.load_without_parsing(), RECORDS)
+
+    def test_mtime_change_with_same_content_only_updates_header(self):
+        self.write_data(RECORDS)
+        self.load()
+        self.write_data(RECORDS, mtime_ns=1_800_000_000_000_000_000)
+        self.assertStore(self.load_without_parsing(), RECORDS)
+        self.assertEqual(_read_cache_header(self.cache_file)[1], 1_800_000_000_000_000_000)
+
+    def test_size_change_reparses(self):
+        self.write_data(RECORDS)
+        self.load()
+        self.write_data(RECORDS[1:])
+        self.assertStore(self.load(), RECORDS[1:])
+        self.assertStore(self.load_without_parsing(), RECORDS[1:])
+
+    def test_same_size_different_content_reparses(self):
+        self.write_data(RECORDS)
+        self.load()
+        changed = [dict(record) for record in RECORDS]
+        changed[0]['numbers'] = [6, 7, 8, 9, 1]
+        self.write_data(changed, mtime_ns=1_800_000_000_000_000_000)
+        # 大小與快取記錄的相同，只能由內容雜湊發現改變
+        self.assertEqual(os.path.getsize(self.data_file), _read_cache_header(self.cache_file)[2])
+        self.assertStore(self.load(), changed)
+
+    def test_truncated_cache_is_rebuilt(self):
+        self.write_data(RECORDS)
+        self.load()
+        with open(self.cache_file, 'r+b') as f:
+            f.truncate(CACHE_HEADER.size + 3)
+        self.assertStore(self.load(), RECORDS)
+        self.assertStore(self.load_without_parsing(), RECORDS)
+
+    def test_empty_history(self):
+        self.write_data([])
+        self.assertEqual(len(self.load()), 0)
+        self.assertEqual(len(self.load_without_parsing()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+開獎頁面解析測試
+
+benchmarks/pages/ 的範例頁面依網站的新舊兩種格式排版，開獎號碼取自 lottery_data.json；
+解析結果必須與資料檔相同，且 lxml 與正規表示式兩種解析的筆數一致。
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from scraper import LTO539Scraper
+
+PAGES_DIR = os.path.join(ROOT, 'benchmarks', 'pages')
+PAGES = ['list539_new_format.html', 'list539_old_format.html']
+
+
+def read_page(name):
+    with open(os.path.join(PAGES_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class ParseLotteryDataTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(os.path.join(ROOT, 'lottery_data.json'), 'r', encoding='utf-8') as f:
+            cls.draws = {item['date']: item for item in json.load(f)['data']}
+        cls.scraper = LTO539Scraper()
+
+    def parse(self, html_content):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            records = self.scraper.parse_lottery_data(html_content)
+        return records, output.getvalue()
+
+    def test_sample_pages_match_data(self):
+        for name in PAGES:
+            with self.subTest(page=name):
+                records, output = self.parse(read_page(name))
+                self.assertEqual(len(records), 100)
+                self.assertNotIn('Warning', output)
+                for record in records:
+                    self.assertEqual(record, {key: self.draws[record['date']][key]
+                                              for key in ('date', 'numbers', 'timestamp')})
+
+    def test_table_and_text_parsers_agree(self):
+        for name in PAGES:
+            with self.subTest(page=name):
+                html_content = read_page(name)
+                self.assertEqual(self.scraper.parse_lottery_table(html_content),
+                                 self.scraper.parse_lottery_text(html_content))
+
+    def test_regex_parser_skipped_when_table_complete(self):
+        for name in PAGES:
+            with self.subTest(page=name):
+                with mock.patch.object(self.scraper, 'parse_lottery_text') as parse_text:
+                    records, _ = self.parse(read_page(name))
+                self.assertEqual(len(records), 100)
+                parse_text.assert_not_called()
+
+    def test_fallback_when_table_rows_missing(self):
+        # 第一期的號碼移到另一列：lxml 逐列解析會漏掉，全文正規表示式仍找得到
+        html_content = read_page(PAGES[0]).replace('</td>\n\n<td class="num">', '</td></tr>\n\n<tr><td class="num">', 1)
+        self.assertEqual(len(self.scraper.parse_lottery_table(html_content)), 99)
+        records, output = self.parse(html_content)
+        self.assertEqual(len(records), 100)
+        self.assertIn('Warning: lxml parsed 99 records but regex parsed 100', output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+串流報告寫入的測試
+
+finish() 的輸出必須等同 "\\n".join(摘要 + 記錄)，reverse=True 時記錄依寫入順序的反向排列，
+結束（或中途發生例外）後不留下暫存檔。
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from anyalytics.report_writer import ReportWriter
+
+HEADER = ['今彩539 測試報告', '=' * 20, '總投注期數：3期', '']
+RECORDS = [
+    ['期數: 1 (2025/01/08)', '投注號碼: [1, 2, 3, 4, 5]', '中獎號碼數: 0', ''],
+    ['期數: 2 (2025/01/09)', '投注號碼: 跳過', ''],
+    ['期數: 3 (2025/01/10)', '投注號碼: [6, 7, 8, 9, 10]', '中獎號碼數: 2', '獎金: 50元', ''],
+]
+
+
+def expected_report(records):
+    return '\n'.join(HEADER + [line for lines in records for line in lines])
+
+
+class ReportWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'report.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, reverse, buffer_size=None):
+        kwargs = {} if buffer_size is None else {'buffer_size': buffer_size}
+        with ReportWriter(self.filename, **kwargs) as writer:
+            for lines in RECORDS:
+                writer.write_record(lines)
+            writer.finish(HEADER, reverse=reverse)
+        self.assertEqual(writer.line_count, len(HEADER) + sum(len(lines) for lines in RECORDS))
+        self.assertEqual(os.listdir(self.directory), ['report.txt'])
+        with open(self.filename, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def test_finish(self):
+        self.assertEqual(self.write(reverse=False), expected_report(RECORDS))
+
+    def test_finish_reverse(self):
+        self.assertEqual(self.write(reverse=True), expected_report(RECORDS[::-1]))
+        # 緩衝區比單筆記錄還小時結果相同
+        self.assertEqual(self.write(reverse=True, buffer_size=8), expected_report(RECORDS[::-1]))
+
+    def test_no_records(self):
+        with ReportWriter(self.filename) as writer:
+            writer.finish(HEADER, reverse=True)
+        # 摘要最後一行為空字串，檔案以換行結尾
+        self.assertEqual(writer.preview(), HEADER[:-1])
+        with open(self.filename, 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), '\n'.join(HEADER))
+
+    def test_temporary_file_removed_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with ReportWriter(self.filename) as writer:
+                writer.write_record(RECORDS[0])
+                raise RuntimeError
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬蟲抓取流程測試
+
+以 http.server 在本機提供 benchmarks/pages/ 的範例頁面（第 1 頁為新格式、第 2 頁為舊格式，
+日期前後相接），不連線到網站即可測試重試與退避、增量抓取遇到已有日期即停止、完整回補抓到最後一頁為止，
+以及頁面重試後仍失敗時拋出 FetchError 而不是當成已經到底。
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from scraper import FetchError, LTO539Scraper
+
+PAGES_DIR = os.path.join(ROOT, 'benchmarks', 'pages')
+
+
+def read_page(name):
+    with open(os.path.join(PAGES_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class LotteryHandler(BaseHTTPRequestHandler):
+    """依 indexpage 回傳範例頁面；超出範圍時與網站相同，重複回傳最後一頁"""
+
+    def do_GET(self):
+        server = self.server
+        page = int(parse_qs(urlparse(self.path).query)['indexpage'][0])
+        with server.lock:
+            server.requests.append(page)
+            failures = server.failures.get(page, 0)
+            if failures:
+                server.failures[page] = failures - 1
+        if failures:
+            self.send_error(server.failure_status)
+            return
+        body = server.pages[min(page, len(server.pages)) - 1].encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ScraperFetchTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pages = [read_page('list539_new_format.html'), read_page('list539_old_format.html')]
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), LotteryHandler)
+        cls.server.lock = threading.Lock()
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.pages = self.pages
+        self.server.requests = []
+        self.server.failures = {}
+        self.server.failure_status = 503
+        host, port = self.server.server_address
+        self.scraper = LTO539Scraper(base_url=f'http://{host}:{port}/list539BIG.asp', max_workers=2,
+                                     requests_per_second=0, max_retries=3, backoff=0.01, timeout=5)
+        self.page_records = [self.scraper.parse_lottery_data(html) for html in self.pages]
+
+    def tearDown(self):
+        self.scraper.session.close()
+
+    def test_retry_on_503(self):
+        self.server.failures = {1: 2}
+        self.assertEqual(self.scraper.fetch_page(1), self.pages[0])
+        self.assertEqual(self.server.requests, [1, 1, 1])
+
+    def test_give_up_after_max_retries(self):
+        self.server.failures = {1: 10}
+        self.assertEqual(self.scraper.fetch_page(1), "")
+        self.assertEqual(len(self.server.requests), self.scraper.max_retries + 1)
+
+    def test_no_retry_on_client_error(self):
+        self.server.failures = {1: 1}
+        self.server.failure_status = 404
+        self.assertEqual(self.scraper.fetch_page(1), "")
+        self.assertEqual(self.server.requests, [1])
+
+    def test_incremental_stops_at_known_date_on_first_page(self):
+        known_dates = {record['date'] for record in self.page_records[0][3:]}
+        new_data = self.scraper.scrape_incremental(known_dates)
+        self.assertEqual(new_data, self.page_records[0][:3])
+        self.assertEqual(self.server.requests, [1])
+
+    def test_incremental_continues_until_known_date(self):
+        known_dates = {record['date'] for record in self.page_records[1][10:]}
+        new_data = self.scraper.scrape_incremental(known_dates)
+        self.assertEqual(new_data, self.page_records[0] + self.page_records[1][:10])
+        self.assertEqual(self.server.requests, [1, 2])
+
+    def test_incremental_retries_failed_page(self):
+        self.server.failures = {1: 1}
+        known_dates = {record['date'] for record in self.page_records[0]}
+        self.assertEqual(self.scraper.scrape_incremental(known_dates), [])
+        self.assertEqual(self.server.requests, [1, 1])
+
+    def test_backfill_stops_when_last_page_repeats(self):
+        new_data = self.scraper.scrape_backfill()
+        self.assertEqual(new_data, self.page_records[0] + self.page_records[1])
+        # 每批 2 頁：第 3 頁重複第 2 頁的內容即停止
+        self.assertEqual(sorted(self.server.requests), [1, 2, 3, 4])
+
+    def test_backfill_stops_at_empty_page(self):
+        self.server.pages = self.pages + ['<html><body><table></table></body></html>']
+        new_data = self.scraper.scrape_backfill()
+        self.assertEqual(new_data, self.page_records[0] + self.page_records[1])
+        self.assertEqual(sorted(self.server.requests), [1, 2, 3, 4])
+
+    def test_backfill_raises_when_page_keeps_failing(self):
+        # 第 1 頁失敗不代表沒有資料：不可回傳同一批已抓到的第 2 頁或當成回補完成
+        self.server.failures = {1: 10}
+        with self.assertRaises(FetchError):
+            self.scraper.scrape_backfill()
+        self.assertEqual(self.server.requests.count(1), self.scraper.max_retries + 1)
+
+    def test_incremental_raises_when_page_keeps_failing(self):
+        self.server.failures = {1: 10}
+        with self.assertRaises(FetchError):
+            self.scraper.scrape_incremental(set())
+
+
+if __name__ == '__main__':
+    unittest.main()
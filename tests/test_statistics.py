@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+前端統計用逐期統計表的測試
+
+每期的號碼與兩數組合排名必須與開獎資料相同，由排名建立的前綴和在任一區間相減的結果必須與逐期統計相同，
+兩數組合的順序與 window_engine.PAIRS 相同。
+"""
+
+import json
+import os
+import sys
+import unittest
+from itertools import combinations
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from draw_statistics import build_statistics
+from anyalytics.draw_store import DrawStore
+from anyalytics.window_engine import PAIRS
+
+
+def prefix_sums(rows, size):
+    """與前端載入時相同：counts[t][i] 為項目 i 在最早 t 期中的出現次數"""
+    counts = np.zeros((len(rows) + 1, size), dtype=np.int32)
+    for t, row in enumerate(rows):
+        counts[t + 1] = counts[t]
+        counts[t + 1, row] += 1
+    return counts
+
+
+class BuildStatisticsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        data_file = os.path.join(ROOT, 'lottery_data.json')
+        with open(data_file, 'r', encoding='utf-8') as f:
+            cls.chronological = list(reversed(json.load(f)['data']))
+        cls.statistics = build_statistics(DrawStore.load(data_file, use_cache=False))
+
+    def test_dates_in_chronological_order(self):
+        self.assertEqual(self.statistics['total_records'], len(self.chronological))
+        self.assertEqual(self.statistics['dates'], [record['date'] for record in self.chronological])
+
+    def test_rows_match_draws(self):
+        for record, numbers, pairs in zip(self.chronological, self.statistics['numbers'], self.statistics['pairs']):
+            self.assertEqual(numbers, sorted(record['numbers']))
+            self.assertEqual([PAIRS[rank] for rank in pairs], list(combinations(sorted(record['numbers']), 2)))
+
+    def test_range_counts_match_direct_counts(self):
+        numbers = prefix_sums([[number - 1 for number in row] for row in self.statistics['numbers']], 39)
+        pairs = prefix_sums(self.statistics['pairs'], len(PAIRS))
+        total = len(self.chronological)
+        for start, end in [(0, total), (0, 30), (total - 30, total), (100, 237)]:
+            with self.subTest(start=start, end=end):
+                records = self.chronological[start:end]
+                for number in range(1, 40):
+                    expected = sum(number in record['numbers'] for record in records)
+                    self.assertEqual(numbers[end, number - 1] - numbers[start, number - 1], expected)
+                drawn = [set(combinations(sorted(record['numbers']), 2)) for record in records]
+                for index, pair in enumerate(PAIRS):
+                    expected = sum(pair in draw for draw in drawn)
+                    self.assertEqual(pairs[end, index] - pairs[start, index], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+滑動視窗頻率引擎的測試
+
+視窗滑過一段隨機開獎後，每個位置的 top_k 都必須與該視窗重新建立的 Counter.most_common(k) 相同，
+包括同次數時的先後順序（newest_first 時 Counter 由新到舊建立）。視窗短、號碼多，並列的情況很常見。
+組合排名與 combination_table 必須互為反函數，向量化的 combination_ranks 與逐期計算相同。
+"""
+
+import os
+import random
+import sys
+import unittest
+from collections import Counter
+from itertools import combinations
+from math import comb
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from anyalytics.window_engine import (PAIRS, ComboWindow, NumberWindow, PairWindow, combination_rank,
+                                      combination_ranks, combination_table, pair_rank)
+
+
+def random_draws(count, seed=539):
+    rng = random.Random(seed)
+    return [rng.sample(range(1, 40), 5) for _ in range(count)]
+
+
+def most_common(draws, k, newest_first=False, size=1):
+    """原本各策略的寫法：每期重新建立 Counter（size 為 1 時統計號碼，否則統計由小到大的 size 數組合）"""
+    counter = Counter()
+    for numbers in (reversed(draws) if newest_first else draws):
+        counter.update(numbers if size == 1 else combinations(sorted(numbers), size))
+    return [item for item, _ in counter.most_common(k)]
+
+
+class NumberWindowTest(unittest.TestCase):
+    def test_top_k_matches_counter(self):
+        draws = random_draws(200)
+        for lookback in (1, 3, 10, 30):
+            window = NumberWindow()
+            for end, numbers in enumerate(draws, 1):
+                window.push(numbers)
+                if len(window) > lookback:
+                    window.pop()
+                current = draws[max(end - lookback, 0):end]
+                for k in (1, 2, 5, 8):
+                    for newest_first in (False, True):
+                        self.assertEqual(window.top_k(k, newest_first), most_common(current, k, newest_first),
+                                         f"lookback={lookback} end={end} k={k} newest_first={newest_first}")
+
+    def test_k_larger_than_distinct_numbers(self):
+        window = NumberWindow()
+        window.push([7, 3, 21, 9, 14])
+        self.assertEqual(window.top_k(10), [7, 3, 21, 9, 14])
+        self.assertEqual(window.top_k(0), [])
+
+    def test_clear_top_k(self):
+        window = NumberWindow()
+        window.push([1, 2, 3, 4, 5])
+        window.push([1, 2, 6, 7, 8])
+        self.assertTrue(window.is_clear_top_k(2))
+        self.assertFalse(window.is_clear_top_k(3))
+        self.assertEqual(window.tied(3), 6)
+
+
+class PairWindowTest(unittest.TestCase):
+    def test_top_k_matches_counter(self):
+        draws = random_draws(150, seed=39)
+        for lookback in (2, 10, 30):
+            window = PairWindow()
+            for end, numbers in enumerate(draws, 1):
+                window.push(numbers)
+                if len(window) > lookback:
+                    window.pop()
+                current = draws[max(end - lookback, 0):end]
+                expected = most_common(current, 3, size=2)
+                self.assertEqual(window.top_k(3), expected, f"lookback={lookback} end={end}")
+                self.assertEqual(window.most_frequent(), expected[0], f"lookback={lookback} end={end}")
+                self.assertEqual(window.count(reversed(expected[0])),
+                                 sum(set(expected[0]) <= set(numbers) for numbers in current))
+
+    def test_empty_window(self):
+        window = PairWindow()
+        self.assertIsNone(window.most_frequent())
+        window.push([5, 1, 9, 3, 7])
+        window.pop()
+        self.assertIsNone(window.most_frequent())
+
+
+class CombinationRankTest(unittest.TestCase):
+    def test_table_round_trip(self):
+        for k in (1, 2, 3, 4):
+            with self.subTest(k=k):
+                table = combination_table(k)
+                self.assertEqual(len(table), comb(39, k))
+                self.assertEqual(sorted(table), list(combinations(range(1, 40), k)))
+                for rank, combo in enumerate(table):
+                    self.assertEqual(combination_rank(combo), rank)
+
+    def test_pair_rank(self):
+        self.assertEqual(PAIRS[:4], [(1, 2), (1, 3), (2, 3), (1, 4)])
+        self.assertEqual(PAIRS[-1], (38, 39))
+        for rank, (a, b) in enumerate(PAIRS):
+            self.assertEqual(pair_rank(a, b), rank)
+
+    def test_vectorized_ranks(self):
+        draws = random_draws(300, seed=15)
+        for k in (1, 2, 3, 4):
+            with self.subTest(k=k):
+                expected = [[combination_rank(combo) for combo in combinations(sorted(numbers), k)]
+                            for numbers in draws]
+                self.assertEqual(combination_ranks(draws, k).tolist(), expected)
+
+    def test_combo_window_matches_counter(self):
+        draws = random_draws(120, seed=4)
+        for k in (3, 4):
+            for lookback in (5, 20):
+                window = ComboWindow(k)
+                for end, numbers in enumerate(draws, 1):
+                    window.push(numbers)
+                    if len(window) > lookback:
+                        window.pop()
+                    current = draws[max(end - lookback, 0):end]
+                    for newest_first in (False, True):
+                        self.assertEqual(window.top_k(3, newest_first), most_common(current, 3, newest_first, k),
+                                         f"k={k} lookback={lookback} end={end} newest_first={newest_first}")
+
+
+if __name__ == '__main__':
+    unittest.main()